@@ -40,19 +40,9 @@ df = df.drop_duplicates(subset=['Text']) # Aynı metinleri sil
 print(f"Temizlik sonrası satır sayısı: {len(df)}")
 
 # 2. Metin Temizleme Fonksiyonu
-def clean_text(text):
-    # Küçük harfe çevir
-    text = text.lower()
-    # URL'leri kaldır
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-    # HTML etiketlerini kaldır
-    text = re.sub(r'<.*?>', '', text)
-    # Rakamları ve özel karakterleri kaldır (Opsiyonel: Sayılar bazen AI tespitinde ipucu olabilir)
-    # Sadece harfleri ve boşlukları tutalım:
-    text = re.sub(r'[^a-z\s]', '', text)
-    # Fazla boşlukları temizle
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+# clean_text ve lemmatization servis tarafıyla ortak: preprocessing.py (repo kök dizini)
+# notebook'un yanına kopyalanmalı
+from preprocessing import LEMMA_TABLE_FILE, TextPreprocessor, build_lemma_table, clean_text
 
 # Temizliği uygula
 df['Clean_Text'] = df['Text'].apply(clean_text)
@@ -69,20 +59,11 @@ from nltk.stem import WordNetLemmatizer
 nltk.download('wordnet')
 nltk.download('omw-1.4')
 
-lemmatizer = WordNetLemmatizer()
+# Korpustaki her kelimenin lemması bir kez hesaplanır; servis aynı tabloyu kullanır
+preprocessor = TextPreprocessor(build_lemma_table(df['Clean_Text']))
 
-def preprocess_nlp(text):
-    # Kelimelere ayır (Tokenization)
-    tokens = text.split()
-
-    # SADECE Lemmatization uygula (Stopwords temizliği kaldırıldı)
-    cleaned_tokens = [
-        lemmatizer.lemmatize(word)
-        for word in tokens
-    ]
-
-    # Tekrar metne dönüştür
-    return " ".join(cleaned_tokens)
+# SADECE Lemmatization uygula (Stopwords temizliği kaldırıldı)
+preprocess_nlp = preprocessor.lemmatize
 
 # Ön işlemeyi yeni haliyle uygula
 df['Processed_Text'] = df['Clean_Text'].apply(preprocess_nlp)
@@ -255,6 +236,10 @@ for model_id in top_3_ids:
 joblib.dump(tfidf, os.path.join(save_dir, 'tfidf_vectorizer.pkl'))
 print(f"\nÖNEMLİ: TF-IDF vektörleştirici de '{save_dir}' klasörüne kaydedildi.")
 
+# 5. Lemma tablosu: servis tarafı ön işlemesi bununla eğitimle birebir aynı olur
+preprocessor.save_table(os.path.join(save_dir, LEMMA_TABLE_FILE))
+print(f"Lemma tablosu ({len(preprocessor.lemmas)} kelime) '{save_dir}' klasörüne kaydedildi.")
+
 from transformers import AutoTokenizer
 
 # RoBERTa için tokenizer yükleme
@@ -271,6 +256,7 @@ model = AutoModelForSequenceClassification.from_pretrained("roberta-base", num_l
 !pip install evaluate
 from datasets import Dataset
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, TrainingArguments, Trainer
+from transformers import DataCollatorWithPadding
 import torch
 import numpy as np
 import evaluate
@@ -296,8 +282,9 @@ bert_tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
 # RoBERTa için hazırlık
 roberta_tokenizer = AutoTokenizer.from_pretrained("roberta-base")
 
+# Padding burada yapılmaz: DataCollatorWithPadding her batch'i kendi en uzun metnine göre doldurur
 def tokenize_function(examples, tokenizer):
-    return tokenizer(examples["text"], padding="max_length", truncation=True, max_length=512)
+    return tokenizer(examples["text"], truncation=True, max_length=512)
 
 # Tokenize işlemlerini uygulayalım
 tokenized_train_bert = train_dataset.map(lambda x: tokenize_function(x, bert_tokenizer), batched=True)
@@ -324,6 +311,7 @@ training_args = TrainingArguments(
     weight_decay=0.01,
     logging_dir='./logs',
     logging_steps=10,
+    group_by_length=True, # Benzer uzunluktaki metinler aynı batch'e düşer, padding azalır
 )
 
 # 1. BERT MODELİNİ EĞİTELİM
@@ -334,6 +322,7 @@ bert_trainer = Trainer(
     args=training_args,
     train_dataset=tokenized_train_bert,
     eval_dataset=tokenized_test_bert,
+    data_collator=DataCollatorWithPadding(bert_tokenizer),
     compute_metrics=compute_metrics,
 )
 
@@ -348,6 +337,7 @@ roberta_trainer = Trainer(
     args=training_args,
     train_dataset=tokenized_train_roberta,
     eval_dataset=tokenized_test_roberta,
+    data_collator=DataCollatorWithPadding(roberta_tokenizer),
     compute_metrics=compute_metrics,
 )
 
@@ -429,4 +419,13 @@ from google.colab import files
 shutil.make_archive('transformer_models_archive', 'zip', './saved_transformer_models')
 
 # 2. Oluşturulan zip dosyasını indir
-files.download('transformer_models_archive.zip')
\ No newline at end of file
+files.download('transformer_models_archive.zip')
+# --- HIZLI KATMAN (DISTILLATION) ---
+# 5 modelli ensemble'ın yumuşak etiketleri (5 modelin ortalama HUMAN olasılığı) ile
+# küçük bir öğrenci model (DistilBERT) eğitilir. Kaydedilen modeller models/ altına
+# kopyalandıktan sonra repo kök dizininde çalıştırılır:
+!python distillation.py label --data ai_human.csv --output soft_labels.csv
+!python distillation.py train --soft-labels soft_labels.csv --output models/student_model
+
+# Öğrencinin ensemble ile uyumu (held-out veri üzerinde)
+!python distillation.py report --data heldout.csv --output agreement.json
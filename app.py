@@ -1,250 +1,315 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
 import os
+import json
 import torch
-import pickle
-import h2o
-from transformers import BertForSequenceClassification, BertTokenizer
-from transformers import RobertaForSequenceClassification, RobertaTokenizer
-import numpy as np
-import pandas as pd
 import logging
-import joblib
+import threading
+import time
+import gc
+from collections import namedtuple
+from concurrent.futures import Future, wait
+from functools import partial
+from batching import MicroBatcher, QueueFullError
+from ensemble import TIERS, HumanOrAIPredictor
+from prediction_cache import PredictionCache, text_hash
+from encoding_cache import EncodingCache
+from metrics import REGISTRY, REQUEST_SECONDS, CallbackMetric
+from singleflight import SingleFlight
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
+# Micro-batching: requests arriving within BATCH_WAIT_MS are scored together
+# (0 disables batching and the serving queue: requests are scored on their own thread)
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('HUMANORAI_MAX_BATCH_SIZE', 8))
+app.config['BATCH_WAIT_MS'] = float(os.environ.get('HUMANORAI_BATCH_WAIT_MS', 5))
+app.config['MAX_BATCH_DOCUMENTS'] = int(os.environ.get('HUMANORAI_MAX_BATCH_DOCUMENTS', 64))
+
+# Serving queue (used whenever batching is on): request threads only wait,
+# INFERENCE_WORKERS threads run the models. Once MAX_QUEUE_SIZE texts are
+# waiting, new requests get 503 + Retry-After; a request that is not answered
+# within REQUEST_TIMEOUT_SECONDS gives up its queued texts (0 waits forever)
+app.config['INFERENCE_WORKERS'] = int(os.environ.get('HUMANORAI_INFERENCE_WORKERS', 1))
+app.config['MAX_QUEUE_SIZE'] = int(os.environ.get('HUMANORAI_MAX_QUEUE_SIZE', 256))
+app.config['REQUEST_TIMEOUT_SECONDS'] = float(os.environ.get('HUMANORAI_REQUEST_TIMEOUT_SECONDS', 60))
+app.config['RETRY_AFTER_SECONDS'] = int(os.environ.get('HUMANORAI_RETRY_AFTER_SECONDS', 5))
+
+# Single-flight: concurrent requests for the same text (and tier) share one model
+# run. With COALESCE_LOCK_DIR the workers of a pre-fork server coalesce too;
+# that needs the shared SQLite prediction cache (HUMANORAI_CACHE_PATH)
+app.config['COALESCE'] = os.environ.get('HUMANORAI_COALESCE', '1') == '1'
+app.config['COALESCE_LOCK_DIR'] = os.environ.get('HUMANORAI_COALESCE_LOCK_DIR')
+
+# Length buckets: a transformer batch is sorted by token length and split so
+# padding stays under MAX_PADDING of the real tokens (at most MAX_BUCKET_SIZE per pass)
+app.config['MAX_BUCKET_SIZE'] = int(os.environ.get('HUMANORAI_MAX_BUCKET_SIZE', 16))
+app.config['MAX_PADDING'] = float(os.environ.get('HUMANORAI_MAX_PADDING', 0.25))
+
+# 'cluster' scores DRF/GBM/GLM on the H2O JVM, 'native' scores them in-process
+app.config['H2O_BACKEND'] = os.environ.get('HUMANORAI_H2O_BACKEND', 'cluster')
+
+# Run the transformer and TF-IDF/H2O branches concurrently, with thread limits
+app.config['PARALLEL_BRANCHES'] = os.environ.get('HUMANORAI_PARALLEL', '0') == '1'
+app.config['TORCH_THREADS'] = int(os.environ.get('HUMANORAI_TORCH_THREADS', 0)) or None
+app.config['H2O_THREADS'] = int(os.environ.get('HUMANORAI_H2O_THREADS', 0)) or None
+
+# Long-document mode: BERT/RoBERTa score every 512-token window of a text
+# (at most LONG_DOCUMENT_MAX_WINDOWS) instead of only the first 512 tokens
+app.config['LONG_DOCUMENT'] = os.environ.get('HUMANORAI_LONG_DOCUMENT', '0') == '1'
+app.config['LONG_DOCUMENT_MAX_WINDOWS'] = int(os.environ.get('HUMANORAI_MAX_WINDOWS', 8))
+app.config['LONG_DOCUMENT_OVERLAP'] = int(os.environ.get('HUMANORAI_WINDOW_OVERLAP', 128))
+
+# 'torch' runs BERT/RoBERTa in eager PyTorch, 'onnx' in ONNX Runtime (CPU, fused kernels)
+app.config['TRANSFORMER_BACKEND'] = os.environ.get('HUMANORAI_TRANSFORMER_BACKEND', 'torch')
+
+# CPU-only nodes: load BERT/RoBERTa with dynamically quantized INT8 Linear layers
+# (check the accuracy impact first with `python quantization.py --data heldout.csv`)
+app.config['QUANTIZE'] = os.environ.get('HUMANORAI_QUANTIZE', '0') == '1'
+
+# Model tiers to load, comma separated; the first is the default for requests
+# without a 'tier'. 'full': the 5-model ensemble, 'fast': the distilled student
+# (models/student_model, trained with distillation.py)
+app.config['TIERS'] = tuple(os.environ.get('HUMANORAI_TIERS', 'full').split(','))
+
+# Early exit: run the models cheapest first and skip the rest once the
+# majority vote can no longer change
+app.config['EARLY_EXIT'] = os.environ.get('HUMANORAI_EARLY_EXIT', '0') == '1'
+
+# Cascade: the TF-IDF models answer alone when their mean probability is at least
+# this confident (0.5-1.0); other texts escalate to BERT and RoBERTa. Pick the
+# threshold with `python cascade.py --data heldout.csv` (0 disables the cascade)
+app.config['CASCADE_THRESHOLD'] = float(os.environ.get('HUMANORAI_CASCADE_THRESHOLD', 0)) or None
+
+# Eager startup: load every model in the background at start instead of on
+# the first /predict call; /readyz reports when serving can begin
+app.config['EAGER_LOAD'] = os.environ.get('HUMANORAI_EAGER_LOAD', '0') == '1'
+app.config['PARALLEL_LOAD'] = os.environ.get('HUMANORAI_PARALLEL_LOAD', '1') == '1'
+
+# Pre-fork serving (set by gunicorn.conf.py): the master loads the models once
+# and forked workers share them. MMAP_WEIGHTS maps the transformer safetensors
+# read-only so every worker reads the same page-cache copy of the weights
+app.config['PREFORK'] = os.environ.get('HUMANORAI_PREFORK', '0') == '1'
+app.config['MMAP_WEIGHTS'] = os.environ.get('HUMANORAI_MMAP_WEIGHTS', '0') == '1'
+
+# Prediction cache: entry = one model's result for one text (0 entries disables it)
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('HUMANORAI_CACHE_MAX_ENTRIES', 5000))
+app.config['CACHE_TTL_SECONDS'] = int(os.environ.get('HUMANORAI_CACHE_TTL_SECONDS', 3600))
+app.config['CACHE_PATH'] = os.environ.get('HUMANORAI_CACHE_PATH')  # SQLite file, shared by workers
+# Tokenizer output per text, reused by retries and long-document windows (0 disables it)
+app.config['ENCODING_CACHE_ENTRIES'] = int(os.environ.get('HUMANORAI_ENCODING_CACHE_ENTRIES', 1024))
+
 # Disable Flask logging for cleaner output
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
-class HumanOrAIPredictor:
-    def __init__(self, models_dir='models'):
-        self.models_dir = models_dir
-        self.models = {}
-        self.is_initialized = False
-        self.h2o_column_names = None  # Store H2O expected column names
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-
-    def initialize(self):
-        if self.is_initialized:
-            return
-
-        print("Initializing models...")
-        print(f"Using device: {self.device}")
-
-        # Load BERT model
-        print("Loading BERT...")
-        bert_path = os.path.join(self.models_dir, 'bert_model')
-        self.models['BERT'] = {
-            'model': BertForSequenceClassification.from_pretrained(bert_path),
-            'tokenizer': BertTokenizer.from_pretrained(bert_path)
-        }
-        self.models['BERT']['model'].to(self.device)
-        self.models['BERT']['model'].eval()
-
-        # Load RoBERTa model
-        print("Loading RoBERTa...")
-        roberta_path = os.path.join(self.models_dir, 'roberta_model')
-        self.models['RoBERTa'] = {
-            'model': RobertaForSequenceClassification.from_pretrained(roberta_path),
-            'tokenizer': RobertaTokenizer.from_pretrained(roberta_path)
-        }
-        self.models['RoBERTa']['model'].to(self.device)
-        self.models['RoBERTa']['model'].eval()
-
-        # Load TF-IDF vectorizer
-        print("Loading TF-IDF...")
-        tfidf_path = os.path.join(self.models_dir, 'tfidf_vectorizer.pkl')
-        try:
-            with open(tfidf_path, 'rb') as f:
-                self.tfidf_vectorizer = pickle.load(f)
-        except Exception as e:
-            print(f"Error loading with pickle: {e}")
-            print("Trying with joblib...")
-            import joblib
-            self.tfidf_vectorizer = joblib.load(tfidf_path)
-
-        # Initialize H2O
-        print("Initializing H2O...")
-        h2o.init(verbose=False)
-
-        # Load H2O models
-        print("Loading H2O models...")
-        drf_path = os.path.join(self.models_dir, 'DRF_1_AutoML_4_20251221_72446')
-        self.models['DRF'] = h2o.load_model(drf_path)
-
-        gbm_path = os.path.join(self.models_dir, 'GBM_1_AutoML_4_20251221_72446')
-        self.models['GBM'] = h2o.load_model(gbm_path)
-
-        glm_path = os.path.join(self.models_dir, 'GLM_1_AutoML_4_20251221_72446')
-        self.models['GLM'] = h2o.load_model(glm_path)
-
-        # Get expected column names from one of the models
-        try:
-            varimp = self.models['DRF'].varimp(use_pandas=True)
-            if varimp is not None and len(varimp) > 0:
-                self.h2o_column_names = varimp['variable'].tolist()
-                print(f"Model expects {len(self.h2o_column_names)} features")
-        except Exception as e:
-            print(f"Could not get column names: {e}")
-
-        self.is_initialized = True
-        print("All models loaded successfully!\n")
-
-    def predict_bert(self, text):
-        tokenizer = self.models['BERT']['tokenizer']
-        model = self.models['BERT']['model']
-
-        inputs = tokenizer(text, return_tensors='pt', truncation=True,
-                          max_length=512, padding=True)
-
-        # Move inputs to device
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
-        with torch.no_grad():
-            outputs = model(**inputs)
-            probs = torch.softmax(outputs.logits, dim=1)
-            prediction = torch.argmax(probs, dim=1).item()
-            confidence = probs[0][prediction].item()
-
-        return prediction, confidence
 
-    def predict_roberta(self, text):
-        tokenizer = self.models['RoBERTa']['tokenizer']
-        model = self.models['RoBERTa']['model']
+def _validate_text(text):
+    """Return an error message for unusable input, None if the text is fine"""
+    if not isinstance(text, str) or not text.strip():
+        return 'Please provide text to analyze'
 
-        inputs = tokenizer(text, return_tensors='pt', truncation=True,
-                          max_length=512, padding=True)
+    # Validate minimum word count (50 words required)
+    word_count = len(text.split())
+    if word_count < 50:
+        return f'Text must contain at least 50 words. Current: {word_count} words.'
 
-        # Move inputs to device
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+    return None
 
-        with torch.no_grad():
-            outputs = model(**inputs)
-            probs = torch.softmax(outputs.logits, dim=1)
-            prediction = torch.argmax(probs, dim=1).item()
-            confidence = probs[0][prediction].item()
 
-        return prediction, confidence
+def _validate_tier(tier):
+    """Return an error message unless tier is one of the loaded tiers"""
+    if tier not in predictor.tiers:
+        return f"Unknown or disabled tier '{tier}'. Available: {', '.join(predictor.tiers)}."
+    return None
 
-    def predict_h2o_model(self, text, model_name):
-        """Predict using H2O models (DRF, GBM, GLM)"""
-        # Transform text using TF-IDF
-        tfidf_features = self.tfidf_vectorizer.transform([text]).toarray()
-        n_features = tfidf_features.shape[1]
 
-        # Use stored column names if available
-        if self.h2o_column_names and len(self.h2o_column_names) >= n_features:
-            # Use the expected column names from model training
-            df = pd.DataFrame(tfidf_features, columns=self.h2o_column_names[:n_features])
+# Initialize predictor
+prediction_cache = None
+if app.config['CACHE_MAX_ENTRIES'] > 0:
+    prediction_cache = PredictionCache(
+        max_entries=app.config['CACHE_MAX_ENTRIES'],
+        ttl_seconds=app.config['CACHE_TTL_SECONDS'],
+        disk_path=app.config['CACHE_PATH']
+    )
+
+encoding_cache = None
+if app.config['ENCODING_CACHE_ENTRIES'] > 0:
+    encoding_cache = EncodingCache(max_entries=app.config['ENCODING_CACHE_ENTRIES'])
+
+predictor = HumanOrAIPredictor(
+    h2o_backend=app.config['H2O_BACKEND'],
+    parallel=app.config['PARALLEL_BRANCHES'],
+    torch_threads=app.config['TORCH_THREADS'],
+    h2o_threads=app.config['H2O_THREADS'],
+    cache=prediction_cache,
+    parallel_load=app.config['PARALLEL_LOAD'],
+    long_document=app.config['LONG_DOCUMENT'],
+    max_windows=app.config['LONG_DOCUMENT_MAX_WINDOWS'],
+    window_overlap=app.config['LONG_DOCUMENT_OVERLAP'],
+    early_exit=app.config['EARLY_EXIT'],
+    quantize=app.config['QUANTIZE'],
+    transformer_backend=app.config['TRANSFORMER_BACKEND'],
+    encoding_cache=encoding_cache,
+    max_bucket_size=app.config['MAX_BUCKET_SIZE'],
+    max_padding=app.config['MAX_PADDING'],
+    mmap_weights=app.config['MMAP_WEIGHTS'],
+    tiers=app.config['TIERS'],
+    cascade_threshold=app.config['CASCADE_THRESHOLD']
+)
+
+# One stage of a /predict_stream text, queued and batched like a /predict text
+StageRequest = namedtuple('StageRequest', ['text', 'model_names'])
+
+def _run_batch(items, tier):
+    """Batcher entry point: texts get full predictions, StageRequests the scores of one stage"""
+    groups = {}
+    for i, item in enumerate(items):
+        groups.setdefault(item.model_names if isinstance(item, StageRequest) else None, []).append(i)
+
+    results = [None] * len(items)
+    for model_names, indices in groups.items():
+        if model_names is None:
+            scored = predictor.predict_all_batch([items[i] for i in indices], tier=tier)
         else:
-            # Fallback: let pandas auto-generate column names
-            df = pd.DataFrame(tfidf_features)
-
-        # Convert to H2O frame with optimizations
-        h2o_frame = h2o.H2OFrame(df, column_types=['numeric'] * n_features)
-
-        # Get prediction
-        model = self.models[model_name]
-        predictions = model.predict(h2o_frame)
-
-        pred_df = predictions.as_data_frame()
-        prediction = int(pred_df['predict'][0])
-        confidence = float(pred_df['p1'][0]) if prediction == 1 else float(pred_df['p0'][0])
-
-        return prediction, confidence
-
-    def predict_all(self, text):
-        results = {}
-
-        # BERT
-        print("Running BERT...")
-        pred, conf = self.predict_bert(text)
-        results['BERT'] = {
-            'prediction': pred,
-            'confidence': round(conf * 100, 2),
-            'label': 'HUMAN' if pred == 1 else 'AI'
-        }
-
-        # RoBERTa
-        print("Running RoBERTa...")
-        pred, conf = self.predict_roberta(text)
-        results['RoBERTa'] = {
-            'prediction': pred,
-            'confidence': round(conf * 100, 2),
-            'label': 'HUMAN' if pred == 1 else 'AI'
-        }
-
-        # H2O models - optimize by creating H2O frame once
-        print("Running H2O models...")
-        tfidf_features = self.tfidf_vectorizer.transform([text]).toarray()
-        n_features = tfidf_features.shape[1]
-
-        # Create H2O frame once for all H2O models
-        if self.h2o_column_names and len(self.h2o_column_names) >= n_features:
-            df = pd.DataFrame(tfidf_features, columns=self.h2o_column_names[:n_features])
+            scores = predictor.score_stage([items[i].text for i in indices], model_names)
+            scored = [{name: scores[name][row] for name in model_names} for row in range(len(indices))]
+        for i, result in zip(indices, scored):
+            results[i] = result
+    return results
+
+# Concurrent /predict, /predict_batch and /predict_stream calls are grouped into
+# one batched run; each tier has its own queue so fast-tier traffic never waits
+# behind the ensemble
+batcher, fast_batcher = (
+    MicroBatcher(
+        partial(_run_batch, tier=tier),
+        max_batch_size=app.config['MAX_BATCH_SIZE'],
+        max_wait_ms=app.config['BATCH_WAIT_MS'],
+        workers=app.config['INFERENCE_WORKERS'],
+        max_queue_size=app.config['MAX_QUEUE_SIZE']
+    )
+    for tier in TIERS
+)
+
+coalesce_lock_dir = app.config['COALESCE_LOCK_DIR']
+if coalesce_lock_dir and not app.config['CACHE_PATH']:
+    print("HUMANORAI_COALESCE_LOCK_DIR needs HUMANORAI_CACHE_PATH, coalescing within this worker only")
+    coalesce_lock_dir = None
+single_flight = SingleFlight(
+    lock_dir=coalesce_lock_dir,
+    lock_timeout=app.config['REQUEST_TIMEOUT_SECONDS'] or 60
+) if app.config['COALESCE'] else None
+
+def _cache_stat(cache, key):
+    return cache.stats()[key] if cache is not None else None
+
+
+# Live values read on every /metrics scrape
+for metric in (
+    CallbackMetric('humanorai_ready', 'All models are loaded (1) or not (0)',
+                   lambda: int(predictor.is_initialized)),
+    CallbackMetric('humanorai_batch_queue_depth', 'Requests waiting in the micro-batcher',
+                   lambda: batcher.queue_depth() + fast_batcher.queue_depth()),
+    CallbackMetric('humanorai_rejected_total', 'Texts refused because the inference queue was full',
+                   lambda: batcher.rejected + fast_batcher.rejected, 'counter'),
+    CallbackMetric('humanorai_coalesced_total', 'Texts that joined an identical prediction already in flight',
+                   lambda: single_flight.coalesced if single_flight is not None else None, 'counter'),
+    CallbackMetric('humanorai_cascade_escalated_total', 'Texts the cascade sent on to the transformers',
+                   lambda: predictor.cascade_counts['escalated'], 'counter'),
+    CallbackMetric('humanorai_cascade_answered_total', 'Texts answered by the TF-IDF models alone',
+                   lambda: predictor.cascade_counts['answered'], 'counter'),
+    CallbackMetric('humanorai_cache_hit_rate', 'Prediction cache hit rate since start',
+                   lambda: _cache_stat(predictor.cache, 'hit_rate')),
+    CallbackMetric('humanorai_cache_hits_total', 'Prediction cache hits',
+                   lambda: _cache_stat(predictor.cache, 'hits'), 'counter'),
+    CallbackMetric('humanorai_cache_misses_total', 'Prediction cache misses',
+                   lambda: _cache_stat(predictor.cache, 'misses'), 'counter'),
+    CallbackMetric('humanorai_encoding_cache_hit_rate', 'Tokenization cache hit rate since start',
+                   lambda: _cache_stat(predictor.encoding_cache, 'hit_rate')),
+):
+    REGISTRY.register(metric)
+
+# End-to-end latency of the prediction endpoints
+TIMED_ENDPOINTS = ('predict', 'predict_batch', 'predict_stream')
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def observe_request_latency(response):
+    if request.endpoint in TIMED_ENDPOINTS and 'request_start' in g:
+        observe = partial(_observe_latency, request.endpoint, g.request_start)
+        if response.is_streamed:
+            # The body is still to be produced: time the stream until its last event
+            response.call_on_close(observe)
         else:
-            df = pd.DataFrame(tfidf_features)
-
-        h2o_frame = h2o.H2OFrame(df, column_types=['numeric'] * n_features)
-
-        # DRF
-        print("  - DRF...")
-        predictions = self.models['DRF'].predict(h2o_frame)
-        pred_df = predictions.as_data_frame()
-        pred = int(pred_df['predict'][0])
-        conf = float(pred_df['p1'][0]) if pred == 1 else float(pred_df['p0'][0])
-        results['DRF'] = {
-            'prediction': pred,
-            'confidence': round(conf * 100, 2),
-            'label': 'HUMAN' if pred == 1 else 'AI'
-        }
-
-        # GBM
-        print("  - GBM...")
-        predictions = self.models['GBM'].predict(h2o_frame)
-        pred_df = predictions.as_data_frame()
-        pred = int(pred_df['predict'][0])
-        conf = float(pred_df['p1'][0]) if pred == 1 else float(pred_df['p0'][0])
-        results['GBM'] = {
-            'prediction': pred,
-            'confidence': round(conf * 100, 2),
-            'label': 'HUMAN' if pred == 1 else 'AI'
-        }
-
-        # GLM
-        print("  - GLM...")
-        predictions = self.models['GLM'].predict(h2o_frame)
-        pred_df = predictions.as_data_frame()
-        pred = int(pred_df['predict'][0])
-        conf = float(pred_df['p1'][0]) if pred == 1 else float(pred_df['p0'][0])
-        results['GLM'] = {
-            'prediction': pred,
-            'confidence': round(conf * 100, 2),
-            'label': 'HUMAN' if pred == 1 else 'AI'
-        }
-
-        # Ensemble
-        predictions_list = [r['prediction'] for r in results.values()]
-        ensemble_pred = 1 if sum(predictions_list) >= 3 else 0
-        ensemble_label = 'HUMAN' if ensemble_pred == 1 else 'AI'
-        avg_confidence = round(np.mean([r['confidence'] for r in results.values()]), 2)
-        vote_count = sum(predictions_list)
-
-        ensemble = {
-            'prediction': ensemble_pred,
-            'label': ensemble_label,
-            'confidence': avg_confidence,
-            'vote_count': vote_count,
-            'total_models': 5
-        }
-
-        return {
-            'individual_results': results,
-            'ensemble': ensemble
-        }
+            observe()
+    return response
 
-# Initialize predictor
-predictor = HumanOrAIPredictor()
+def _observe_latency(endpoint, start):
+    REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+def _batcher_for(tier):
+    return fast_batcher if tier == 'fast' else batcher
+
+def _score_now(items, tier):
+    """Score items on the calling thread (batching off), as already resolved futures"""
+    futures = [Future() for _ in items]
+    try:
+        results = _run_batch(items, tier)
+    except Exception as e:
+        for future in futures:
+            future.set_exception(e)
+        return futures
+    for future, result in zip(futures, results):
+        future.set_result(result)
+    return futures
+
+def _start_for(tier):
+    """start_many(items) -> futures: the tier's serving queue, or the calling thread without batching"""
+    if app.config['BATCH_WAIT_MS'] > 0:
+        return _batcher_for(tier).submit_many
+    return partial(_score_now, tier=tier)
+
+def _submit(texts, tier, deadline=None):
+    """One future per text (or StageRequest); a text already being scored joins that run.
+
+    deadline bounds the wait for another worker running the same text.
+    """
+    start = _start_for(tier)
+    if single_flight is None:
+        return start(texts)
+    keys = [_flight_key(text, tier) for text in texts]
+    return single_flight.submit_many(keys, texts, start, deadline)
+
+def _flight_key(item, tier):
+    """Single-flight key: tier and text hash, plus the models of a stream stage"""
+    if isinstance(item, StageRequest):
+        return f"{tier}:{text_hash(item.text)}:{'+'.join(item.model_names)}"
+    return f"{tier}:{text_hash(item)}"
+
+def _deadline():
+    """time.monotonic() at which the request times out, None without REQUEST_TIMEOUT_SECONDS"""
+    timeout = app.config['REQUEST_TIMEOUT_SECONDS']
+    return time.monotonic() + timeout if timeout else None
+
+def _await_results(futures, deadline):
+    """Results of queued texts in order; TimeoutError at deadline (see _deadline)"""
+    timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+    done, not_done = wait(futures, timeout=timeout)
+    if not_done:
+        # Texts still waiting in the queue are dropped by the workers
+        for future in not_done:
+            future.cancel()
+        raise TimeoutError('Prediction timed out')
+    return [future.result() for future in futures]
+
+def _overloaded(message):
+    """503 asking the client to come back after RETRY_AFTER_SECONDS"""
+    response = jsonify({'error': message})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(app.config['RETRY_AFTER_SECONDS'])
+    return response
 
 @app.route('/')
 def index():
@@ -263,27 +328,188 @@ def predict():
 
         data = request.get_json()
         text = data.get('text', '')
+        tier = data.get('tier', predictor.default_tier)
 
-        if not text.strip():
-            return jsonify({'error': 'Please provide text to analyze'}), 400
+        error = _validate_text(text) or _validate_tier(tier)
+        if error:
+            return jsonify({'error': error}), 400
+
+        # Make predictions
+        deadline = _deadline()
+        results = _await_results(_submit([text], tier, deadline), deadline)[0]
 
-        # Validate minimum word count (50 words required)
-        word_count = len(text.split())
-        if word_count < 50:
+        return jsonify(results)
+
+    except QueueFullError:
+        return _overloaded('Server is busy, please retry later')
+    except TimeoutError as e:
+        return _overloaded(str(e))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    try:
+        # Initialize models on first request
+        if not predictor.is_initialized:
+            predictor.initialize()
+
+        data = request.get_json()
+        texts = data.get('texts', [])
+        tier = data.get('tier', predictor.default_tier)
+
+        error = _validate_tier(tier)
+        if error:
+            return jsonify({'error': error}), 400
+
+        if not isinstance(texts, list) or not texts:
+            return jsonify({'error': 'Please provide a non-empty list of texts'}), 400
+
+        if len(texts) > app.config['MAX_BATCH_DOCUMENTS']:
             return jsonify({
-                'error': f'Text must contain at least 50 words. Current: {word_count} words.'
+                'error': f"At most {app.config['MAX_BATCH_DOCUMENTS']} texts per request. Current: {len(texts)}."
             }), 400
 
+        for i, text in enumerate(texts):
+            error = _validate_text(text)
+            if error:
+                return jsonify({'error': f'Text {i}: {error}'}), 400
+
         # Make predictions
-        results = predictor.predict_all(text)
+        deadline = _deadline()
+        results = _await_results(_submit(texts, tier, deadline), deadline)
 
-        return jsonify(results)
+        return jsonify({'results': results})
 
+    except QueueFullError:
+        return _overloaded('Server is busy, please retry later')
+    except TimeoutError as e:
+        return _overloaded(str(e))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _sse(event, data):
+    """One server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/predict_stream', methods=['POST'])
+def predict_stream():
+    """/predict as server-sent events: a 'model' event per model as it finishes, then 'ensemble'"""
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+        tier = data.get('tier', predictor.default_tier)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    error = _validate_text(text) or _validate_tier(tier)
+    if error:
+        return jsonify({'error': error}), 400
+
+    # Every stage goes through single-flight and the serving queue and shares the request deadline
+    deadline = _deadline()
+    events = predictor.iter_predictions(text, tier=tier, run_stage=partial(_run_stage, text, tier, deadline))
+    try:
+        # Initialize models on first request
+        if not predictor.is_initialized:
+            predictor.initialize()
+        # The first stage runs before the response starts, so a full queue is still a 503
+        first = next(events)
+    except QueueFullError:
+        return _overloaded('Server is busy, please retry later')
+    except TimeoutError as e:
+        return _overloaded(str(e))
+    except Exception as e:
+        first, events = ('error', {'error': str(e)}), iter(())
+
+    def stream():
+        yield _sse(*first)
+        try:
+            for event, payload in events:
+                yield _sse(event, payload)
+        except QueueFullError:
+            yield _sse('error', {'error': 'Server is busy, please retry later'})
+        except Exception as e:
+            yield _sse('error', {'error': str(e)})
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _run_stage(text, tier, deadline, model_names):
+    """Scores of one stream stage, queued on the tier's batcher: {model_name: (prediction, confidence)}"""
+    return _await_results(_submit([StageRequest(text, tuple(model_names))], tier, deadline), deadline)[0]
+
+def _eager_initialize():
+    try:
+        predictor.initialize()
+    except Exception as e:
+        print(f"Model loading failed: {e}")
+
+def start_eager_loading():
+    """Load every model in a background thread so the server can answer /healthz meanwhile"""
+    thread = threading.Thread(target=_eager_initialize, name='eager-load', daemon=True)
+    thread.start()
+    return thread
+
+def prepare_prefork():
+    """Load every model in the master process right before workers are forked"""
+    predictor.initialize()
+    # Move everything loaded so far out of the collector's reach: collections in
+    # the workers then never write to (and so never copy) the shared pages
+    gc.collect()
+    gc.freeze()
+
+def after_fork(workers=1):
+    """Per-worker setup in a process forked after prepare_prefork"""
+    # Split the cores between the workers unless HUMANORAI_TORCH_THREADS is set
+    torch.set_num_threads(predictor.torch_threads or max(1, (os.cpu_count() or 1) // workers))
+    predictor.after_fork()
+    if prediction_cache is not None:
+        prediction_cache.after_fork()
+
+@app.route('/healthz')
+def healthz():
+    # Liveness: the process is up and serving requests
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    # Readiness: all models are loaded and warm
+    if predictor.is_initialized:
+        return jsonify({'status': 'ready', 'load_times': predictor.load_times})
+
+    status = 'error' if predictor.init_error else 'loading'
+    return jsonify({
+        'status': status,
+        'error': predictor.init_error,
+        'load_times': predictor.load_times
+    }), 503
+
+@app.route('/cache_stats')
+def cache_stats():
+    if predictor.cache is None:
+        stats = {'enabled': False}
+    else:
+        stats = dict(predictor.cache.stats(), enabled=True)
+    if predictor.encoding_cache is not None:
+        stats['encodings'] = predictor.encoding_cache.stats()
+    return jsonify(stats)
+
+@app.route('/metrics')
+def metrics():
+    # Prometheus text exposition format
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+# Under a WSGI server (not `python app.py`) warm up as soon as the module is imported;
+# a pre-fork master loads in prepare_prefork instead (no threads before fork)
+if app.config['EAGER_LOAD'] and not app.config['PREFORK'] and __name__ != '__main__':
+    start_eager_loading()
+
 if __name__ == '__main__':
     print("Starting Human or AI Classifier Web Application...")
     print("Server will be available at: http://localhost:5000")
     print("-" * 60)
+    # The debug reloader imports this file twice; only the serving child loads models
+    if app.config['EAGER_LOAD'] and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_eager_loading()
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,111 @@
+"""
+Dynamic micro-batching for the prediction endpoints.
+
+Concurrent requests are collected for a few milliseconds and scored together,
+so the models run one forward pass per batch instead of one per text.
+
+The batcher is also the serving queue: request threads only enqueue texts and
+wait, while a fixed number of worker threads run the models. The queue is
+bounded; when it is full, submit raises QueueFullError right away so the
+server can shed load instead of accepting work it cannot finish.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class QueueFullError(Exception):
+    """The inference queue has no room for the submitted items"""
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5, workers=1, max_queue_size=0):
+        """
+        batch_fn: callable taking a list of items and returning a list of
+                  results in the same order
+        max_batch_size: upper bound on the number of items per call
+        max_wait_ms: how long to wait for more items once one has arrived
+        workers: threads calling batch_fn, i.e. batches scored at the same time
+        max_queue_size: items allowed to wait for a worker (0: unbounded)
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.workers = max(1, int(workers))
+        self.max_queue_size = max(0, int(max_queue_size))
+        self.rejected = 0  # items refused because the queue was full
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one item and return a Future resolved with its result"""
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items):
+        """Queue all items or none of them; one Future per item.
+
+        Raises QueueFullError when the queue cannot take every item, so a
+        batch request is never half accepted.
+        """
+        self._ensure_started()
+        futures = [Future() for _ in items]
+        # Workers only ever shrink the queue, so the room checked here cannot
+        # disappear before the items are put
+        with self._submit_lock:
+            if self.max_queue_size and self._queue.qsize() + len(items) > self.max_queue_size:
+                self.rejected += len(items)
+                raise QueueFullError(f"Inference queue is full ({self.max_queue_size} items)")
+            for item, future in zip(items, futures):
+                self._queue.put((item, future))
+        return futures
+
+    def queue_depth(self):
+        """Items waiting for a worker thread"""
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        # Worker threads are started lazily so importing app.py stays cheap
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f'micro-batcher-{len(self._threads)}',
+                                          daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until the batch is full or the wait expires"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            # Skip requests whose caller has already given up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,252 @@
+"""
+Latency/throughput benchmark of the inference stack.
+
+A synthetic corpus (50 to 5000 words per document, fixed seed) is scored by
+every model on its own, by the full ensemble (predict_all) and through the
+Flask app (/predict via the test client, micro-batcher included), at several
+concurrency levels. For every target and level the report holds p50/p95/p99
+latency and docs/sec, plus the median latency per document length.
+
+The predictor is the one app.py builds, so it is configured with the usual
+HUMANORAI_* environment variables; they are recorded in the output together
+with the git commit. Run from the repository root (models/ must exist):
+
+    HUMANORAI_H2O_BACKEND=native python benchmark.py --output bench.json
+    python benchmark.py --output new.json --compare bench.json
+
+--compare exits with status 1 when a latency percentile or docs/sec is worse
+than the baseline by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+WORD_COUNTS = (50, 100, 250, 500, 1000, 2500, 5000)
+CONCURRENCY_LEVELS = (1, 4, 8)
+PERCENTILES = (50, 95, 99)
+
+# Common English words; enough variety for realistic tokenization and TF-IDF hits
+VOCABULARY = (
+    'the of and to in is that for it as was with be by on not he this are or his from at which but '
+    'have an they you were her she there been one all we their has would when if so no will more '
+    'other its time what about up out into than them can only some could these two may first then '
+    'do any like my now over such our man me even most made after also did many before must through '
+    'back years where much your way well down should because each just those people how too little '
+    'state good very make world still own see men work long get here between both life being under '
+    'never day same another know while last might us great old year off come since against go came '
+    'right used take three small study research model data system language text human written '
+    'generated analysis results method approach however therefore example important different'
+).split()
+
+
+def synthetic_corpus(word_counts=WORD_COUNTS, docs_per_length=3, seed=0):
+    """Deterministic documents, docs_per_length of each word count, all distinct"""
+    rng = random.Random(seed)
+    texts = []
+    for word_count in word_counts:
+        for _ in range(docs_per_length):
+            words = []
+            while len(words) < word_count:
+                sentence = rng.choices(VOCABULARY, k=min(rng.randint(8, 24), word_count - len(words)))
+                sentence[0] = sentence[0].capitalize()
+                sentence[-1] += '.'
+                words.extend(sentence)
+            texts.append(' '.join(words))
+    return texts
+
+
+def summarize(latencies, wall_seconds, word_counts):
+    """Percentiles in milliseconds, throughput, and median latency per document length"""
+    latencies_ms = np.array(latencies) * 1000
+    summary = {'requests': len(latencies)}
+    for percentile in PERCENTILES:
+        summary[f'p{percentile}_ms'] = round(float(np.percentile(latencies_ms, percentile)), 3)
+    summary['mean_ms'] = round(float(latencies_ms.mean()), 3)
+    summary['max_ms'] = round(float(latencies_ms.max()), 3)
+    summary['docs_per_sec'] = round(len(latencies) / wall_seconds, 3)
+
+    by_words = {}
+    for word_count, latency in zip(word_counts, latencies_ms):
+        by_words.setdefault(word_count, []).append(latency)
+    summary['p50_ms_by_words'] = {
+        str(word_count): round(float(np.median(values)), 3) for word_count, values in sorted(by_words.items())
+    }
+    return summary
+
+
+def run_target(score, texts, concurrency, repeats=1):
+    """Score every text (repeats times) from concurrency threads; one call per text"""
+    work = [text for _ in range(repeats) for text in texts]
+    latencies = [None] * len(work)
+
+    def timed(i):
+        start = time.perf_counter()
+        score(work[i])
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='benchmark') as pool:
+        list(pool.map(timed, range(len(work))))
+    wall_seconds = time.perf_counter() - start
+
+    return summarize(latencies, wall_seconds, [len(text.split()) for text in work])
+
+
+def predictor_targets(predictor, model_names):
+    """One scoring function per model, plus the full ensemble"""
+    targets = {
+        model_name: (lambda text, model_name=model_name: predictor._run_branches([text], (model_name,)))
+        for model_name in model_names
+    }
+    targets['ensemble'] = predictor.predict_all
+    return targets
+
+
+def flask_target(flask_app):
+    """POST /predict through the test client, one client per thread"""
+    local = threading.local()
+
+    def post(text):
+        if not hasattr(local, 'client'):
+            local.client = flask_app.test_client()
+        response = local.client.post('/predict', json={'text': text})
+        if response.status_code != 200:
+            raise RuntimeError(f"/predict returned {response.status_code}: {response.get_json()}")
+
+    return post
+
+
+def run_benchmark(targets, texts, concurrency_levels=CONCURRENCY_LEVELS, repeats=1, warmup=2):
+    """[{'target', 'concurrency', ...summary}] for every target and concurrency level"""
+    results = []
+    for name, score in targets.items():
+        # Untimed calls first: lazy allocations, thread pools, first-call overheads
+        for text in texts[:warmup]:
+            score(text)
+        for concurrency in concurrency_levels:
+            summary = run_target(score, texts, concurrency, repeats)
+            results.append(dict(target=name, concurrency=concurrency, **summary))
+            print(f"{name:<10} x{concurrency:<3} p50 {summary['p50_ms']:>10.1f} ms  "
+                  f"p95 {summary['p95_ms']:>10.1f} ms  p99 {summary['p99_ms']:>10.1f} ms  "
+                  f"{summary['docs_per_sec']:>8.2f} docs/s")
+    return results
+
+
+def compare_results(baseline, current, tolerance=0.10):
+    """Regressions of current against baseline, as readable strings.
+
+    A latency percentile regresses when it grows by more than tolerance,
+    docs/sec when it drops by more than tolerance. Targets missing from
+    either run are not compared.
+    """
+    baseline_rows = {(row['target'], row['concurrency']): row for row in baseline['results']}
+    regressions = []
+    for row in current['results']:
+        old = baseline_rows.get((row['target'], row['concurrency']))
+        if old is None:
+            continue
+        label = f"{row['target']} x{row['concurrency']}"
+        for percentile in PERCENTILES:
+            key = f'p{percentile}_ms'
+            if row[key] > old[key] * (1 + tolerance):
+                regressions.append(f"{label}: {key} {old[key]} -> {row[key]}")
+        if row['docs_per_sec'] < old['docs_per_sec'] * (1 - tolerance):
+            regressions.append(f"{label}: docs_per_sec {old['docs_per_sec']} -> {row['docs_per_sec']}")
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment(predictor):
+    return {
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'device': str(predictor.device),
+        'env': {key: value for key, value in sorted(os.environ.items()) if key.startswith('HUMANORAI_')},
+    }
+
+
+def main():
+    from ensemble import MODEL_NAMES
+
+    parser = argparse.ArgumentParser(description='Latency/throughput benchmark of the Human or AI models')
+    parser.add_argument('--output', default='benchmark.json', help='JSON report path')
+    parser.add_argument('--word-counts', type=int, nargs='+', default=list(WORD_COUNTS))
+    parser.add_argument('--docs-per-length', type=int, default=3)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=list(CONCURRENCY_LEVELS))
+    parser.add_argument('--repeats', type=int, default=1, help='Passes over the corpus per measurement')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed calls per target')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--targets', nargs='+', choices=list(MODEL_NAMES) + ['ensemble', 'flask'],
+                        default=list(MODEL_NAMES) + ['ensemble', 'flask'])
+    parser.add_argument('--keep-caches', action='store_true',
+                        help='Leave the prediction and encoding caches on (repeats then measure cache hits)')
+    parser.add_argument('--compare', metavar='BASELINE', help='Earlier report to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Allowed relative slowdown')
+    args = parser.parse_args()
+
+    import app as app_module
+
+    predictor = app_module.predictor
+    if not args.keep_caches:
+        predictor.cache = None
+        predictor.encoding_cache = None
+    predictor.initialize()
+
+    texts = synthetic_corpus(args.word_counts, args.docs_per_length, args.seed)
+    targets = predictor_targets(predictor, [name for name in MODEL_NAMES if name in args.targets])
+    if 'ensemble' not in args.targets:
+        del targets['ensemble']
+    if 'flask' in args.targets:
+        targets['flask'] = flask_target(app_module.app)
+
+    print(f"Benchmarking {len(texts)} documents ({min(args.word_counts)}-{max(args.word_counts)} words) "
+          f"at concurrency {args.concurrency}")
+    results = run_benchmark(targets, texts, args.concurrency, args.repeats, args.warmup)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': _environment(predictor),
+        'corpus': {
+            'seed': args.seed,
+            'word_counts': args.word_counts,
+            'docs_per_length': args.docs_per_length,
+            'repeats': args.repeats,
+            'caches': args.keep_caches,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
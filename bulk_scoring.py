@@ -0,0 +1,222 @@
+"""
+Bulk offline scoring of large corpora.
+
+The input (CSV, JSONL or Parquet) is read lazily, cut into chunks and scored
+by a pool of worker processes. Each worker loads the models once and scores
+its chunks with predict_all_batch. Results are appended to a JSONL file in
+input order, one line per row.
+
+After every written chunk, the output is fsynced and a checkpoint file
+(<output>.ckpt) records the number of finished rows and the output size. A
+restarted run truncates the output back to the checkpoint and skips the rows
+that are already finished, so no row is scored or written twice.
+
+Usage (see predict.py --help):
+    python predict.py --bulk corpus.csv --output scores.jsonl --workers 4
+"""
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+
+INPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+_worker_predictor = None
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension in ('parquet', 'pq'):
+        return 'parquet'
+    if extension in ('csv', 'tsv', 'txt'):
+        return 'csv'
+    raise ValueError(f"Cannot detect the format of '{path}', expected one of {INPUT_FORMATS}")
+
+
+def _iter_rows(path, input_format):
+    """Input rows as dicts, read lazily"""
+    if input_format == 'csv':
+        # Articles can be longer than the default 128 KB field limit
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f, delimiter='\t' if path.endswith('.tsv') else ',')
+    elif input_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif input_format == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet input needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=1024):
+            yield from batch.to_pylist()
+    else:
+        raise ValueError(f"Unknown input format '{input_format}', expected one of {INPUT_FORMATS}")
+
+
+def iter_records(path, text_column='Text', id_column=None, input_format=None):
+    """(row, id, text) for every input row; id is the row number without id_column"""
+    for row, record in enumerate(_iter_rows(path, input_format or detect_format(path))):
+        text = record.get(text_column)
+        yield row, record.get(id_column, row) if id_column else row, text if isinstance(text, str) else ''
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _create_predictor(predictor_kwargs):
+    from ensemble import HumanOrAIPredictor
+
+    predictor = HumanOrAIPredictor(**predictor_kwargs)
+    predictor.initialize()
+    return predictor
+
+
+def _export_native_models(predictor_kwargs):
+    """Run the one-time native H2O export here, before any worker starts.
+
+    Otherwise every worker would find the exports missing and write the same
+    .npz files at the same time.
+    """
+    if predictor_kwargs.get('h2o_backend') != 'native':
+        return
+    from h2o_native import export_all, native_model_paths
+
+    models_dir = predictor_kwargs.get('models_dir', 'models')
+    if not all(os.path.exists(path) for path in native_model_paths(models_dir).values()):
+        print("Native H2O models not found, exporting from H2O...")
+        export_all(models_dir)
+
+
+def _init_worker(predictor_kwargs):
+    # Runs once per worker process: the models stay loaded for all its chunks
+    global _worker_predictor
+    _worker_predictor = _create_predictor(predictor_kwargs)
+
+
+def _score_chunk(chunk, predictor=None):
+    """Output lines for one chunk of (row, id, text)"""
+    predictor = predictor or _worker_predictor
+    valid = [(row, record_id, text) for row, record_id, text in chunk if text.strip()]
+    scored = iter(predictor.predict_all_batch([text for _, _, text in valid]) if valid else [])
+
+    lines = []
+    for row, record_id, text in chunk:
+        if text.strip():
+            lines.append(dict(next(scored), row=row, id=record_id))
+        else:
+            lines.append({'row': row, 'id': record_id, 'error': 'empty text'})
+    return lines
+
+
+class Checkpoint:
+    """Finished rows and output size of a bulk run, replaced atomically"""
+
+    def __init__(self, output_path):
+        self.path = output_path + '.ckpt'
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, input_path, rows_done, output_bytes, finished=False):
+        state = {
+            'input': os.path.abspath(input_path),
+            'rows_done': rows_done,
+            'output_bytes': output_bytes,
+            'finished': finished
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def score_file(input_path, output_path, text_column='Text', id_column=None, input_format=None,
+               workers=1, batch_size=32, predictor_kwargs=None, overwrite=False):
+    """Score every row of input_path into output_path (JSONL), resuming if possible.
+
+    workers=0 scores in the calling process. Returns the number of rows scored
+    by this call.
+    """
+    predictor_kwargs = predictor_kwargs or {}
+    checkpoint = Checkpoint(output_path)
+    state = None if overwrite else checkpoint.load()
+
+    if state is not None:
+        if state['input'] != os.path.abspath(input_path):
+            raise ValueError(f"{checkpoint.path} belongs to {state['input']}, not {input_path}")
+        if state['finished']:
+            print(f"Already finished: {state['rows_done']} rows in {output_path}")
+            return 0
+        rows_done = state['rows_done']
+        # Drop lines written after the last checkpoint
+        os.truncate(output_path, state['output_bytes'])
+        print(f"Resuming after {rows_done} rows")
+    else:
+        if os.path.exists(output_path) and not overwrite:
+            raise FileExistsError(f"{output_path} exists without a checkpoint, pass overwrite=True to replace it")
+        rows_done = 0
+        open(output_path, 'wb').close()
+        checkpoint.save(input_path, 0, 0)
+
+    records = islice(iter_records(input_path, text_column, id_column, input_format), rows_done, None)
+    chunks = _chunks(records, batch_size)
+
+    start = time.perf_counter()
+    scored = 0
+    # Binary mode: out.tell() is an exact byte offset for the checkpoint
+    with open(output_path, 'ab') as out:
+
+        def write(lines):
+            nonlocal rows_done, scored
+            for line in lines:
+                out.write((json.dumps(line) + '\n').encode('utf-8'))
+            out.flush()
+            os.fsync(out.fileno())
+            rows_done += len(lines)
+            scored += len(lines)
+            checkpoint.save(input_path, rows_done, out.tell())
+            rate = scored / (time.perf_counter() - start)
+            print(f"{rows_done} rows done ({rate:.1f} docs/s)")
+
+        if workers == 0:
+            predictor = _create_predictor(predictor_kwargs)
+            for chunk in chunks:
+                write(_score_chunk(chunk, predictor))
+        else:
+            _export_native_models(predictor_kwargs)
+            # spawn: workers must not inherit torch/H2O state from this process
+            context = multiprocessing.get_context('spawn')
+            with context.Pool(workers, initializer=_init_worker, initargs=(predictor_kwargs,)) as pool:
+                # Bounded and ordered: the input is never read far ahead of the
+                # output, and lines are written in row order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.apply_async(_score_chunk, (chunk,)))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().get())
+                while pending:
+                    write(pending.popleft().get())
+
+        checkpoint.save(input_path, rows_done, out.tell(), finished=True)
+
+    return scored
@@ -0,0 +1,141 @@
+"""
+Threshold sweep for the confidence-gated cascade (HUMANORAI_CASCADE_THRESHOLD).
+
+In cascade mode DRF, GBM and GLM score every text. When their mean HUMAN
+probability is confident enough (max(p, 1 - p) >= threshold) that answer is
+returned, otherwise the text escalates to BERT and RoBERTa and the 5-model
+vote decides. This tool scores a labelled file once with all five models,
+measures the seconds per document of both stages, and replays the cascade
+for each threshold: accuracy, escalation rate and average cost per document.
+
+    python cascade.py --data heldout.csv --sample 1000 --output sweep.json
+    python cascade.py --data heldout.csv --max-accuracy-drop 0.005
+
+With --max-accuracy-drop the cheapest threshold whose accuracy stays within
+that drop of the full ensemble is recommended.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLDS = (0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.975, 0.99)
+
+
+def score_labeled(predictor, texts, batch_size=16):
+    """Scores of all five models per text, and mean seconds per text of each cascade stage"""
+    from ensemble import CASCADE_MODELS, MODEL_NAMES, TRANSFORMER_MODELS
+
+    scores = {model_name: [] for model_name in MODEL_NAMES}
+    seconds = {'tfidf': 0.0, 'transformers': 0.0}
+
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        for stage, model_names in (('tfidf', CASCADE_MODELS), ('transformers', TRANSFORMER_MODELS)):
+            begin = time.perf_counter()
+            stage_scores = predictor._run_branches(chunk, model_names)
+            seconds[stage] += time.perf_counter() - begin
+            for model_name in model_names:
+                scores[model_name].extend(stage_scores[model_name])
+        print(f"{min(start + batch_size, len(texts))}/{len(texts)} texts scored")
+
+    return scores, {stage: total / len(texts) for stage, total in seconds.items()}
+
+
+def sweep_thresholds(scores, labels, seconds_per_doc, thresholds=DEFAULT_THRESHOLDS):
+    """Replay the cascade for every threshold on precomputed scores.
+
+    seconds_per_doc: {'tfidf': s, 'transformers': s}; an escalated text costs
+    both stages, an answered one the TF-IDF stage only.
+    """
+    from ensemble import MAJORITY, MODEL_NAMES, cascade_decision
+
+    labels = np.asarray(labels)
+    decisions = [cascade_decision(scores, i) for i in range(len(labels))]
+    cheap_pred = np.array([prediction for prediction, _ in decisions])
+    cheap_conf = np.array([confidence for _, confidence in decisions])
+    full_pred = (np.sum([[score[0] for score in scores[model_name]] for model_name in MODEL_NAMES],
+                        axis=0) >= MAJORITY).astype(int)
+    full_cost = seconds_per_doc['tfidf'] + seconds_per_doc['transformers']
+
+    sweep = []
+    for threshold in thresholds:
+        escalated = cheap_conf < threshold
+        prediction = np.where(escalated, full_pred, cheap_pred)
+        escalation_rate = float(escalated.mean())
+        cost = seconds_per_doc['tfidf'] + escalation_rate * seconds_per_doc['transformers']
+        sweep.append({
+            'threshold': threshold,
+            'accuracy': round(float(np.mean(prediction == labels)), 4),
+            'escalation_rate': round(escalation_rate, 4),
+            'transformer_calls_saved': round(1.0 - escalation_rate, 4),
+            'cost_ms_per_doc': round(cost * 1000, 3),
+            'relative_cost': round(cost / full_cost, 4) if full_cost else None,
+        })
+
+    return {
+        'documents': len(labels),
+        'full_accuracy': round(float(np.mean(full_pred == labels)), 4),
+        'tfidf_only_accuracy': round(float(np.mean(cheap_pred == labels)), 4),
+        'stage_ms_per_doc': {stage: round(value * 1000, 3) for stage, value in seconds_per_doc.items()},
+        'sweep': sweep,
+    }
+
+
+def pick_threshold(report, max_accuracy_drop):
+    """Cheapest sweep row whose accuracy is within max_accuracy_drop of the full ensemble"""
+    eligible = [row for row in report['sweep']
+                if row['accuracy'] >= report['full_accuracy'] - max_accuracy_drop]
+    return min(eligible, key=lambda row: (row['cost_ms_per_doc'], -row['accuracy']), default=None)
+
+
+def main():
+    from ensemble import HumanOrAIPredictor
+
+    parser = argparse.ArgumentParser(description='Accuracy vs cost of cascade thresholds on a labelled file')
+    parser.add_argument('--data', required=True, help='Labelled CSV file')
+    parser.add_argument('--text-column', default='Text')
+    parser.add_argument('--label-column', default='Label')
+    parser.add_argument('--sample', type=int, default=1000, help='Documents to score (0 = all)')
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--h2o-backend', default='native', choices=('cluster', 'native'))
+    parser.add_argument('--thresholds', type=float, nargs='+', default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument('--max-accuracy-drop', type=float,
+                        help='Recommend the cheapest threshold within this accuracy drop')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).dropna(subset=[args.text_column, args.label_column])
+    if args.sample and len(df) > args.sample:
+        df = df.sample(n=args.sample, random_state=42)
+
+    # No prediction cache: stage timings must be real model cost
+    predictor = HumanOrAIPredictor(models_dir=args.models_dir, h2o_backend=args.h2o_backend)
+    predictor.initialize()
+    scores, seconds_per_doc = score_labeled(predictor, df[args.text_column].tolist(), args.batch_size)
+    report = sweep_thresholds(scores, df[args.label_column].astype(int).tolist(), seconds_per_doc,
+                              sorted(args.thresholds))
+
+    print(f"\nFull ensemble accuracy {report['full_accuracy']}, TF-IDF only {report['tfidf_only_accuracy']}")
+    print(f"{'threshold':>9} {'accuracy':>8} {'escalated':>9} {'ms/doc':>8} {'rel.cost':>8}")
+    for row in report['sweep']:
+        print(f"{row['threshold']:>9} {row['accuracy']:>8} {row['escalation_rate']:>9} "
+              f"{row['cost_ms_per_doc']:>8} {row['relative_cost']:>8}")
+
+    if args.max_accuracy_drop is not None:
+        report['recommended'] = pick_threshold(report, args.max_accuracy_drop)
+        if report['recommended']:
+            print(f"\nRecommended: HUMANORAI_CASCADE_THRESHOLD={report['recommended']['threshold']}")
+        else:
+            print("\nNo threshold stays within the accuracy drop")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Distillation of the five-model ensemble into one small "fast tier" transformer.
+
+1. label: the full ensemble scores a corpus. The soft label of a text is the
+   mean HUMAN probability of BERT, RoBERTa, DRF, GBM and GLM; the ensemble's
+   majority label is kept next to it.
+2. train: a small student (default distilbert-base-uncased) is fine-tuned on
+   the soft labels with a soft cross-entropy loss. The Trainer setup follows
+   ModelEgitim.py (dynamic padding, group_by_length, same optimizer settings).
+3. report: held-out texts are scored by both tiers; the report gives the
+   student's agreement with the ensemble label, accuracies and docs/sec.
+
+    python distillation.py label --data corpus.csv --output soft_labels.csv
+    python distillation.py train --soft-labels soft_labels.csv --output models/student_model
+    python distillation.py report --data heldout.csv --output agreement.json
+
+The student is trained on raw text, the same input it gets when serving. It
+is served with HUMANORAI_TIERS=full,fast and {"tier": "fast"} in a request.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+from transformers import Trainer
+
+STUDENT_BASE_MODEL = 'distilbert-base-uncased'
+
+
+def ensemble_soft_labels(predictor, texts, batch_size=16):
+    """Mean HUMAN probability of the five models and the majority label, per text"""
+    from ensemble import MAJORITY, MODEL_NAMES, human_probability
+
+    soft_labels, ensemble_labels = [], []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        scores = predictor._run_branches(chunk)
+        for i in range(len(chunk)):
+            results = [scores[model_name][i] for model_name in MODEL_NAMES]
+            soft_labels.append(float(np.mean([human_probability(*result) for result in results])))
+            ensemble_labels.append(int(sum(prediction for prediction, _ in results) >= MAJORITY))
+        print(f"{min(start + batch_size, len(texts))}/{len(texts)} texts labelled")
+    return soft_labels, ensemble_labels
+
+
+class DistillationTrainer(Trainer):
+    """Trainer whose 'labels' are teacher probabilities [P(AI), P(HUMAN)] instead of classes"""
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        targets = inputs.pop('labels')
+        outputs = model(**inputs)
+        # Cross-entropy against the soft targets (KL divergence up to a constant)
+        loss = -(targets * torch.log_softmax(outputs.logits, dim=-1)).sum(dim=-1).mean()
+        return (loss, outputs) if return_outputs else loss
+
+
+def _agreement_metrics(eval_pred):
+    logits, targets = eval_pred
+    return {'agreement': float(np.mean(np.argmax(logits, axis=-1) == np.argmax(targets, axis=-1)))}
+
+
+def train_student(texts, soft_labels, output_dir, base_model=STUDENT_BASE_MODEL, epochs=3,
+                  batch_size=16, learning_rate=5e-5, eval_fraction=0.1, seed=42):
+    """Fine-tune the student on soft labels and save it (with its tokenizer) to output_dir.
+
+    Returns the evaluation metrics on the held-back eval_fraction of the texts.
+    """
+    from transformers import (AutoModelForSequenceClassification, AutoTokenizer,
+                              DataCollatorWithPadding, TrainingArguments)
+
+    tokenizer = AutoTokenizer.from_pretrained(base_model)
+    model = AutoModelForSequenceClassification.from_pretrained(base_model, num_labels=2)
+
+    # Column 1 is HUMAN, as in the teacher models (Label 1 = HUMAN, 0 = AI)
+    encodings = tokenizer(list(texts), truncation=True, max_length=512)
+    features = [
+        {'input_ids': ids, 'attention_mask': mask, 'labels': [1.0 - p, p]}
+        for ids, mask, p in zip(encodings['input_ids'], encodings['attention_mask'], soft_labels)
+    ]
+    order = np.random.default_rng(seed).permutation(len(features))
+    n_eval = max(1, int(len(features) * eval_fraction))
+    eval_dataset = [features[i] for i in order[:n_eval]]
+    train_dataset = [features[i] for i in order[n_eval:]]
+
+    training_args = TrainingArguments(
+        output_dir=os.path.join(output_dir, 'checkpoints'),
+        eval_strategy='epoch',
+        save_strategy='no',
+        learning_rate=learning_rate,
+        per_device_train_batch_size=batch_size,
+        per_device_eval_batch_size=batch_size,
+        num_train_epochs=epochs,
+        weight_decay=0.01,
+        logging_steps=10,
+        group_by_length=True,  # Similar lengths share a batch: less padding
+        seed=seed,
+        report_to=[],
+    )
+    trainer = DistillationTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=eval_dataset,
+        data_collator=DataCollatorWithPadding(tokenizer),
+        compute_metrics=_agreement_metrics,
+    )
+
+    print(f"Training {base_model} on {len(train_dataset)} soft-labelled texts...")
+    trainer.train()
+    metrics = trainer.evaluate()
+
+    trainer.save_model(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    print(f"Student saved to {output_dir}")
+    return metrics
+
+
+def agreement_report(texts, labels=None, models_dir='models', batch_size=16):
+    """Score texts with the full ensemble and the fast tier and compare them"""
+    from ensemble import MODEL_NAMES, HumanOrAIPredictor, human_probability
+
+    texts = list(texts)
+    predictor = HumanOrAIPredictor(models_dir=models_dir, tiers=('full', 'fast'))
+    predictor.initialize()
+
+    outputs, seconds = {}, {}
+    for tier in ('full', 'fast'):
+        begin = time.perf_counter()
+        outputs[tier] = []
+        for start in range(0, len(texts), batch_size):
+            outputs[tier].extend(predictor.predict_all_batch(texts[start:start + batch_size], tier=tier))
+        seconds[tier] = time.perf_counter() - begin
+
+    full_pred = np.array([output['ensemble']['prediction'] for output in outputs['full']])
+    fast_pred = np.array([output['ensemble']['prediction'] for output in outputs['fast']])
+    full_prob = np.array([
+        np.mean([human_probability(r['prediction'], r['confidence'] / 100)
+                 for r in (output['individual_results'][name] for name in MODEL_NAMES)])
+        for output in outputs['full']
+    ])
+    fast_prob = np.array([
+        human_probability(output['ensemble']['prediction'], output['ensemble']['confidence'] / 100)
+        for output in outputs['fast']
+    ])
+
+    report = {
+        'documents': len(texts),
+        'label_agreement': round(float(np.mean(full_pred == fast_pred)), 4),
+        'mean_abs_prob_diff': round(float(np.abs(full_prob - fast_prob).mean()), 6),
+        'full_docs_per_sec': round(len(texts) / seconds['full'], 2),
+        'fast_docs_per_sec': round(len(texts) / seconds['fast'], 2),
+        'speedup': round(seconds['full'] / seconds['fast'], 2),
+    }
+    if labels is not None:
+        labels = np.asarray(labels)
+        report['full_accuracy'] = round(float(np.mean(full_pred == labels)), 4)
+        report['fast_accuracy'] = round(float(np.mean(fast_pred == labels)), 4)
+    return report
+
+
+def _read_texts(path, text_column, label_column=None, sample=0):
+    df = pd.read_csv(path).dropna(subset=[text_column])
+    if sample and len(df) > sample:
+        df = df.sample(n=sample, random_state=42)
+    labels = df[label_column].astype(int).tolist() if label_column and label_column in df.columns else None
+    return df[text_column].tolist(), labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distil the 5-model ensemble into a fast-tier student')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    label = commands.add_parser('label', help='Soft labels from the full ensemble')
+    label.add_argument('--data', required=True, help='CSV corpus, labelled or not')
+    label.add_argument('--text-column', default='Text')
+    label.add_argument('--sample', type=int, default=0, help='Texts to label (0 = all)')
+    label.add_argument('--batch-size', type=int, default=16)
+    label.add_argument('--models-dir', default='models')
+    label.add_argument('--output', required=True, help='CSV with Text, soft_label, ensemble_label')
+
+    train = commands.add_parser('train', help='Fine-tune the student on soft labels')
+    train.add_argument('--soft-labels', required=True, help='Output of the label command')
+    train.add_argument('--base-model', default=STUDENT_BASE_MODEL)
+    train.add_argument('--epochs', type=int, default=3)
+    train.add_argument('--batch-size', type=int, default=16)
+    train.add_argument('--learning-rate', type=float, default=5e-5)
+    train.add_argument('--output', default=os.path.join('models', 'student_model'))
+
+    report = commands.add_parser('report', help='Agreement of the fast tier with the full ensemble')
+    report.add_argument('--data', required=True, help='Held-out CSV file')
+    report.add_argument('--text-column', default='Text')
+    report.add_argument('--label-column', default='Label', help='Ignored when the column is missing')
+    report.add_argument('--sample', type=int, default=500, help='Documents to score (0 = all)')
+    report.add_argument('--batch-size', type=int, default=16)
+    report.add_argument('--models-dir', default='models')
+    report.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    if args.command == 'label':
+        from ensemble import HumanOrAIPredictor
+
+        texts, _ = _read_texts(args.data, args.text_column, sample=args.sample)
+        predictor = HumanOrAIPredictor(models_dir=args.models_dir)
+        predictor.initialize()
+        soft_labels, ensemble_labels = ensemble_soft_labels(predictor, texts, args.batch_size)
+        pd.DataFrame({'Text': texts, 'soft_label': soft_labels, 'ensemble_label': ensemble_labels}) \
+            .to_csv(args.output, index=False)
+        print(f"Soft labels written to {args.output}")
+
+    elif args.command == 'train':
+        df = pd.read_csv(args.soft_labels)
+        metrics = train_student(df['Text'].tolist(), df['soft_label'].tolist(), args.output,
+                                args.base_model, args.epochs, args.batch_size, args.learning_rate)
+        print(json.dumps(metrics, indent=2))
+
+    else:
+        texts, labels = _read_texts(args.data, args.text_column, args.label_column, args.sample)
+        result = agreement_report(texts, labels, args.models_dir, args.batch_size)
+        print(json.dumps(result, indent=2))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
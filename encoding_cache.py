@@ -0,0 +1,63 @@
+"""
+Bounded cache of tokenizer output for the transformer models.
+
+Entries hold the token ids of a whole text (no special tokens, no
+truncation), keyed by the model name and a hash of the text. One entry
+serves both the truncated 512-token input and every long-document window,
+and a retried or repeated text is not tokenized again. Ids are stored as
+int32 arrays: a 600-word article takes a few KB.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from prediction_cache import text_hash
+
+
+class EncodingCache:
+    def __init__(self, max_entries=1024):
+        """max_entries: cached encodings (one entry = one text for one tokenizer)"""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name, text):
+        return f"{model_name}:{text_hash(text)}"
+
+    def get(self, key):
+        """Cached token ids for key as a list, or None"""
+        with self._lock:
+            ids = self._entries.get(key)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return ids.tolist()
+
+    def put(self, key, ids):
+        with self._lock:
+            self._entries[key] = np.asarray(ids, dtype=np.int32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries
+            }
@@ -0,0 +1,878 @@
+"""
+The HumanOrAI model ensemble: BERT, RoBERTa and the TF-IDF based DRF, GBM and
+GLM, scored together and combined by majority vote (or by the fast tier's
+distilled student). Serving (app.py), bulk scoring and the offline tools all
+use HumanOrAIPredictor from here; importing this module starts nothing.
+"""
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import h2o
+import numpy as np
+import pandas as pd
+import torch
+from transformers import BertForSequenceClassification, BertTokenizerFast
+from transformers import RobertaForSequenceClassification, RobertaTokenizerFast
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from h2o_native import (H2O_MODEL_DIRS, export_all, load_native_model, model_feature_names,
+                        native_model_paths, vocabulary_index)
+from prediction_cache import PredictionCache, artifact_fingerprint, text_hash
+from encoding_cache import EncodingCache
+from metrics import BATCH_SIZE, STAGE_SECONDS
+from quantization import quantize_transformer
+from onnx_backend import OnnxSequenceClassifier, export_onnx, onnx_model_path
+from prefork import mmap_model_weights
+from preprocessing import LEMMA_TABLE_FILE, TextPreprocessor
+
+TRANSFORMER_MODELS = ('BERT', 'RoBERTa')
+H2O_MODELS = ('DRF', 'GBM', 'GLM')
+MODEL_NAMES = TRANSFORMER_MODELS + H2O_MODELS
+MAJORITY = len(MODEL_NAMES) // 2 + 1
+# Cheapest model first; early-exit mode stops once the majority is decided
+EARLY_EXIT_ORDER = ('GLM', 'GBM', 'DRF', 'BERT', 'RoBERTa')
+# No majority exists before MAJORITY votes, so the first stage runs that many
+# models at once (the three H2O models share one TF-IDF pass)
+EARLY_EXIT_STAGES = (EARLY_EXIT_ORDER[:MAJORITY],) + tuple((name,) for name in EARLY_EXIT_ORDER[MAJORITY:])
+# Cascade mode: the cheap TF-IDF models answer alone when confident enough
+CASCADE_MODELS = H2O_MODELS
+H2O_BACKENDS = ('cluster', 'native')
+MAX_TOKENS = 512  # BERT/RoBERTa position limit, special tokens included
+TRANSFORMER_BACKENDS = ('torch', 'onnx')
+TIERS = ('full', 'fast')
+STUDENT_MODEL = 'Student'  # fast tier: one transformer distilled from the ensemble
+
+
+class HumanOrAIPredictor:
+    def __init__(self, models_dir='models', h2o_backend='cluster', parallel=False,
+                 parallel_workers=2, torch_threads=None, h2o_threads=None, cache=None,
+                 parallel_load=False, long_document=False, max_windows=8, window_overlap=128,
+                 early_exit=False, quantize=False, transformer_backend='torch', encoding_cache=None,
+                 max_bucket_size=16, max_padding=0.25, mmap_weights=False, tiers=('full',),
+                 cascade_threshold=None):
+        if h2o_backend not in H2O_BACKENDS:
+            raise ValueError(f"Unknown H2O backend '{h2o_backend}', expected one of {H2O_BACKENDS}")
+        if transformer_backend not in TRANSFORMER_BACKENDS:
+            raise ValueError(f"Unknown transformer backend '{transformer_backend}', "
+                             f"expected one of {TRANSFORMER_BACKENDS}")
+        if quantize and transformer_backend != 'torch':
+            raise ValueError("quantize applies to the 'torch' transformer backend only")
+        if not tiers or any(tier not in TIERS for tier in tiers):
+            raise ValueError(f"Unknown tiers {tiers}, expected a subset of {TIERS}")
+        if cascade_threshold is not None and not 0.5 <= cascade_threshold <= 1.0:
+            raise ValueError(f"cascade_threshold must be between 0.5 and 1.0, got {cascade_threshold}")
+        if cascade_threshold is not None and early_exit:
+            raise ValueError("early_exit and cascade_threshold are alternative modes, enable one")
+
+        self.models_dir = models_dir
+        self.models = {}
+        self.tiers = tuple(tiers)        # loaded tiers: 'full' ensemble and/or 'fast' student
+        self.default_tier = self.tiers[0]
+        self.h2o_backend = h2o_backend  # 'cluster': H2O JVM, 'native': in-process evaluators
+        self.native_models = {}
+        self.is_initialized = False
+        self.parallel_load = parallel_load  # load all artifacts concurrently in initialize()
+        self.load_times = {}                # seconds per artifact, filled by initialize()
+        self.init_error = None
+        self._init_lock = threading.Lock()
+        # Training-time cleaning + lemmatization in front of the TF-IDF vectorizer
+        self.preprocessor = TextPreprocessor()
+        # Cluster backend: H2O frame columns and the TF-IDF column of each, set once at load
+        self.h2o_columns = None
+        self.h2o_column_index = None
+        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+
+        # Length buckets for transformer forward passes
+        self.max_bucket_size = max_bucket_size  # sequences per forward pass
+        self.max_padding = max_padding          # padded tokens allowed per real token
+
+        # Long-document mode: overlapping 512-token windows instead of truncation
+        self.long_document = long_document
+        self.max_windows = max_windows        # cap on windows per text (cost bound)
+        self.window_overlap = window_overlap  # tokens shared by consecutive windows
+
+        # 'torch': eager PyTorch models, 'onnx': ONNX Runtime sessions (CPU)
+        self.transformer_backend = transformer_backend
+
+        # INT8 dynamic quantization of the transformers (CPU kernels only)
+        self.quantize = quantize
+        if self.quantize and self.device.type == 'cuda':
+            print("Quantized models run on CPU only: using fp32 on CUDA")
+            self.quantize = False
+
+        # Read-only mmapped safetensors weights, shared by forked workers (CPU torch only)
+        self.mmap_weights = (mmap_weights and transformer_backend == 'torch'
+                             and not self.quantize and self.device.type == 'cpu')
+
+        # Parallel mode: transformer and H2O branches of predict_all run concurrently
+        self.parallel = parallel
+        self.parallel_workers = parallel_workers
+        self.torch_threads = torch_threads  # intra-op threads per forward pass (None: torch default)
+        self.h2o_threads = h2o_threads      # H2O cluster threads (None: all cores)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # Early exit: models run in EARLY_EXIT_ORDER until the majority is decided
+        self.early_exit = early_exit
+        # Cascade: TF-IDF models answer alone above this confidence, else escalate
+        self.cascade_threshold = cascade_threshold
+        self.cascade_counts = {'answered': 0, 'escalated': 0}  # texts per cascade outcome
+
+        # Optional PredictionCache; keys include the version of each loaded model
+        self.cache = cache
+        self.model_versions = {}
+        # Optional EncodingCache: token ids per text, skips re-tokenization
+        self.encoding_cache = encoding_cache
+
+    def initialize(self):
+        # The lock lets eager loading and a first request race safely
+        with self._init_lock:
+            if self.is_initialized:
+                return
+
+            try:
+                self._load_models()
+            except Exception as e:
+                self.init_error = str(e)
+                raise
+
+    def _load_models(self):
+        print("Initializing models...")
+        print(f"Using device: {self.device}")
+        start = time.perf_counter()
+
+        if self.torch_threads:
+            # Leave cores for the H2O branch when both run at the same time
+            torch.set_num_threads(self.torch_threads)
+
+        loaders = []
+        if 'full' in self.tiers:
+            loaders += [self._load_bert, self._load_roberta, self._load_tfidf, self._load_h2o_models]
+        if 'fast' in self.tiers:
+            loaders.append(self._load_student)
+        if self.parallel_load:
+            # Artifacts are independent: load them side by side
+            with ThreadPoolExecutor(max_workers=len(loaders), thread_name_prefix='model-load') as pool:
+                for future in [pool.submit(loader) for loader in loaders]:
+                    future.result()
+        else:
+            for loader in loaders:
+                loader()
+
+        if 'full' in self.tiers:
+            # Needs the TF-IDF vocabulary, so it runs after all loaders
+            self._bind_h2o_inputs()
+
+        self._compute_model_versions()
+
+        self.load_times['total'] = round(time.perf_counter() - start, 3)
+        self.init_error = None
+        self.is_initialized = True
+        print(f"All models loaded successfully in {self.load_times['total']}s!\n")
+
+    @contextmanager
+    def _timed_load(self, artifact):
+        """Record how long loading one artifact took, in seconds"""
+        start = time.perf_counter()
+        yield
+        self.load_times[artifact] = round(time.perf_counter() - start, 3)
+
+    def _load_transformer(self, model_name, model_class, tokenizer_class, dirname):
+        print(f"Loading {model_name}...")
+        with self._timed_load(model_name):
+            model_path = os.path.join(self.models_dir, dirname)
+            if self.transformer_backend == 'onnx':
+                model = self._load_onnx_transformer(model_name, dirname)
+            else:
+                model = model_class.from_pretrained(model_path)
+                model.to(self.device)
+                model.eval()
+                if self.quantize:
+                    model = quantize_transformer(model)
+                elif self.mmap_weights:
+                    mapped = mmap_model_weights(model, model_path)
+                    print(f"{model_name}: {mapped} weight tensors memory-mapped")
+            self.models[model_name] = {
+                'model': model,
+                'tokenizer': tokenizer_class.from_pretrained(model_path)
+            }
+
+    def _load_onnx_transformer(self, model_name, dirname):
+        onnx_path = onnx_model_path(self.models_dir, dirname)
+        if not os.path.exists(onnx_path):
+            print(f"Exporting {model_name} to ONNX (one-time)...")
+            fused = export_onnx(os.path.join(self.models_dir, dirname), onnx_path)
+            print(f"{model_name} fused operators: {fused}")
+        return OnnxSequenceClassifier(onnx_path, threads=self.torch_threads)
+
+    def after_fork(self):
+        """Reset per-process state in a worker forked from the loading process"""
+        # Locks and thread pools do not survive fork; they are recreated on demand
+        self._init_lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor = None
+        if self.is_initialized and self.h2o_backend == 'cluster':
+            # The inherited HTTP session belongs to the parent: reconnect to the same JVM
+            h2o.connect(url=h2o.connection().base_url, verbose=False)
+
+    def _load_bert(self):
+        self._load_transformer('BERT', BertForSequenceClassification, BertTokenizerFast, 'bert_model')
+
+    def _load_roberta(self):
+        self._load_transformer('RoBERTa', RobertaForSequenceClassification, RobertaTokenizerFast, 'roberta_model')
+
+    def _load_student(self):
+        # Any small Hugging Face classifier (DistilBERT by default), see distillation.py
+        self._load_transformer(STUDENT_MODEL, AutoModelForSequenceClassification, AutoTokenizer, 'student_model')
+
+    def _load_tfidf(self):
+        # Load TF-IDF vectorizer
+        print("Loading TF-IDF...")
+        with self._timed_load('TF-IDF'):
+            tfidf_path = os.path.join(self.models_dir, 'tfidf_vectorizer.pkl')
+            try:
+                with open(tfidf_path, 'rb') as f:
+                    self.tfidf_vectorizer = pickle.load(f)
+            except Exception as e:
+                print(f"Error loading with pickle: {e}")
+                print("Trying with joblib...")
+                import joblib
+                self.tfidf_vectorizer = joblib.load(tfidf_path)
+            self.preprocessor = TextPreprocessor.load(self.models_dir)
+
+    def _load_h2o_models(self):
+        if self.h2o_backend == 'native':
+            self._load_native_h2o_models()
+        else:
+            self._load_h2o_cluster_models()
+
+    def _compute_model_versions(self):
+        """Version ids of the loaded artifacts, part of every prediction cache key"""
+        tfidf_version = artifact_fingerprint(os.path.join(self.models_dir, 'tfidf_vectorizer.pkl'))
+        lemma_version = artifact_fingerprint(os.path.join(self.models_dir, LEMMA_TABLE_FILE))
+        # Scoring options that change transformer outputs are part of the version
+        transformer_variant = ''
+        if self.long_document:
+            transformer_variant += f"-win{self.max_windows}o{self.window_overlap}"
+        if self.quantize:
+            transformer_variant += "-int8"
+        if self.transformer_backend == 'onnx':
+            transformer_variant += "-onnx"
+
+        self.model_versions = {
+            'BERT': artifact_fingerprint(os.path.join(self.models_dir, 'bert_model')) + transformer_variant,
+            'RoBERTa': artifact_fingerprint(os.path.join(self.models_dir, 'roberta_model')) + transformer_variant,
+        }
+        for model_name in H2O_MODELS:
+            model_version = artifact_fingerprint(os.path.join(self.models_dir, H2O_MODEL_DIRS[model_name]))
+            self.model_versions[model_name] = f"{model_version}-{tfidf_version}-{lemma_version}"
+        self.model_versions[STUDENT_MODEL] = (
+            artifact_fingerprint(os.path.join(self.models_dir, 'student_model')) + transformer_variant)
+
+    def _load_h2o_cluster_models(self):
+        # Initialize H2O
+        print("Initializing H2O...")
+        with self._timed_load('H2O init'):
+            h2o.init(verbose=False, nthreads=self.h2o_threads or -1)
+
+        # Load H2O models
+        print("Loading H2O models...")
+
+        def load(model_name):
+            with self._timed_load(model_name):
+                model_path = os.path.join(self.models_dir, H2O_MODEL_DIRS[model_name])
+                self.models[model_name] = h2o.load_model(model_path)
+
+        if self.parallel_load:
+            with ThreadPoolExecutor(max_workers=len(H2O_MODELS), thread_name_prefix='h2o-load') as pool:
+                list(pool.map(load, H2O_MODELS))
+        else:
+            for model_name in H2O_MODELS:
+                load(model_name)
+
+    def _bind_h2o_inputs(self):
+        """Map the H2O models' input columns to TF-IDF columns once, failing on any mismatch.
+
+        Per request the H2O features are then one column gather on the TF-IDF
+        matrix, with no column name handling.
+        """
+        vocabulary = self.tfidf_vectorizer.vocabulary_
+        if self.h2o_backend == 'native':
+            for native_model in self.native_models.values():
+                native_model.bind_vocabulary(vocabulary)
+            return
+
+        # The three models share one frame, laid out in DRF's training column order
+        columns = model_feature_names(self.models['DRF'])
+        for model_name in H2O_MODELS:
+            extra = set(model_feature_names(self.models[model_name])) - set(columns)
+            if extra:
+                raise ValueError(f"{model_name} expects {len(extra)} columns that DRF does not "
+                                 f"(first: {sorted(extra)[:5]})")
+        self.h2o_column_index = vocabulary_index(columns, vocabulary)
+        self.h2o_columns = columns
+        print(f"H2O models expect {len(columns)} features")
+
+    def _load_native_h2o_models(self):
+        """Load DRF/GBM/GLM as in-process evaluators, exporting them once if needed"""
+        paths = native_model_paths(self.models_dir)
+        if not all(os.path.exists(path) for path in paths.values()):
+            # One-time export needs the H2O cluster, later starts do not
+            print("Native H2O models not found, exporting from H2O...")
+            with self._timed_load('H2O export'):
+                export_all(self.models_dir)
+
+        print("Loading native H2O models...")
+        for model_name in H2O_MODELS:
+            with self._timed_load(model_name):
+                self.native_models[model_name] = load_native_model(paths[model_name])
+
+    def _encode(self, model_name, texts):
+        """Token ids of each text, without special tokens and without truncation.
+
+        The fast tokenizer encodes all texts in one call. With an encoding
+        cache, only texts that are not cached yet are tokenized.
+        """
+        tokenizer = self.models[model_name]['tokenizer']
+        with STAGE_SECONDS.time(stage='tokenize', model=model_name):
+            if self.encoding_cache is None:
+                return tokenizer(list(texts), add_special_tokens=False, truncation=False, verbose=False)['input_ids']
+
+            keys = [EncodingCache.make_key(model_name, text) for text in texts]
+            encodings = [self.encoding_cache.get(key) for key in keys]
+            missing = [i for i, ids in enumerate(encodings) if ids is None]
+            if missing:
+                encoded = tokenizer([texts[i] for i in missing], add_special_tokens=False,
+                                    truncation=False, verbose=False)['input_ids']
+                for i, ids in zip(missing, encoded):
+                    self.encoding_cache.put(keys[i], ids)
+                    encodings[i] = ids
+            return encodings
+
+    def _predict_transformer_batch(self, model_name, texts):
+        """Score several texts with a single padded forward pass"""
+        if self.long_document:
+            return self._predict_transformer_windows(model_name, texts)
+
+        tokenizer = self.models[model_name]['tokenizer']
+
+        # Same ids as tokenizer(text, truncation=True, max_length=512): the
+        # first 510 tokens between [CLS]/[SEP] (<s>/</s> for RoBERTa)
+        sequences = [
+            [tokenizer.cls_token_id] + ids[:MAX_TOKENS - 2] + [tokenizer.sep_token_id]
+            for ids in self._encode(model_name, texts)
+        ]
+
+        probs = torch.softmax(self._forward_logits(model_name, sequences), dim=1)
+        confidences, predictions = torch.max(probs, dim=1)
+
+        return list(zip(predictions.tolist(), confidences.tolist()))
+
+    def _forward_logits(self, model_name, sequences):
+        """Logits for token id sequences, one forward pass per length bucket.
+
+        Each bucket is padded only to its own longest sequence; the rows of the
+        returned tensor follow the order of sequences.
+        """
+        tokenizer = self.models[model_name]['tokenizer']
+        model = self.models[model_name]['model']
+
+        logits = [None] * len(sequences)
+        buckets = _length_buckets([len(ids) for ids in sequences], self.max_bucket_size, self.max_padding)
+        for bucket in buckets:
+            inputs = _pad_batch([sequences[i] for i in bucket], tokenizer.pad_token_id)
+
+            with STAGE_SECONDS.time(stage='forward', model=model_name):
+                # Move inputs to device
+                inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+                with torch.no_grad():
+                    bucket_logits = model(**inputs).logits
+
+            for i, row in zip(bucket, bucket_logits):
+                logits[i] = row
+
+        return torch.stack(logits)
+
+    def _predict_transformer_windows(self, model_name, texts):
+        """Long-document mode: score overlapping 512-token windows instead of truncating.
+
+        The windows of all texts are batched together (in length buckets); the
+        window logits of a text are averaged into its document score.
+        """
+        tokenizer = self.models[model_name]['tokenizer']
+
+        # Each window is [CLS] ... [SEP] for BERT and <s> ... </s> for RoBERTa
+        window_size = MAX_TOKENS - 2
+        token_ids = self._encode(model_name, texts)
+
+        windows = []
+        owners = []
+        for text_index, ids in enumerate(token_ids):
+            for start in _window_starts(len(ids), window_size, self.window_overlap, self.max_windows):
+                windows.append([tokenizer.cls_token_id] + ids[start:start + window_size] + [tokenizer.sep_token_id])
+                owners.append(text_index)
+
+        logits = self._forward_logits(model_name, windows)
+
+        results = []
+        owners = torch.tensor(owners, device=logits.device)
+        for text_index in range(len(token_ids)):
+            doc_logits = logits[owners == text_index].mean(dim=0)
+            probs = torch.softmax(doc_logits, dim=0)
+            confidence, prediction = torch.max(probs, dim=0)
+            results.append((prediction.item(), confidence.item()))
+
+        return results
+
+    def predict_bert(self, text):
+        return self._predict_transformer_batch('BERT', [text])[0]
+
+    def predict_roberta(self, text):
+        return self._predict_transformer_batch('RoBERTa', [text])[0]
+
+    def predict_bert_batch(self, texts):
+        """Predict a list of texts with BERT, returns [(prediction, confidence), ...]"""
+        return self._predict_transformer_batch('BERT', texts)
+
+    def predict_roberta_batch(self, texts):
+        """Predict a list of texts with RoBERTa, returns [(prediction, confidence), ...]"""
+        return self._predict_transformer_batch('RoBERTa', texts)
+
+    def _predict_h2o_batch(self, texts, model_names=H2O_MODELS):
+        """Score texts with the H2O models, returns {model_name: [(prediction, confidence), ...]}"""
+        if self.h2o_backend == 'native':
+            return self._predict_h2o_native(texts, model_names)
+        return self._predict_h2o_cluster(texts, model_names)
+
+    def _tfidf(self, texts):
+        """Sparse TF-IDF rows, texts preprocessed exactly as in training"""
+        with STAGE_SECONDS.time(stage='preprocess', model=''):
+            processed = self.preprocessor.preprocess_batch(texts)
+        with STAGE_SECONDS.time(stage='tfidf', model=''):
+            return self.tfidf_vectorizer.transform(processed)
+
+    def _predict_h2o_native(self, texts, model_names):
+        """Score the H2O models in-process, no H2O cluster round-trips"""
+        # CSR matrix straight from the vectorizer, never densified
+        tfidf_features = self._tfidf(texts)
+
+        scores = {}
+        for model_name in model_names:
+            with STAGE_SECONDS.time(stage='h2o_predict', model=model_name):
+                predict, p0, p1 = self.native_models[model_name].predict(tfidf_features)
+            scores[model_name] = [_h2o_prediction(*row) for row in zip(predict, p0, p1)]
+
+        return scores
+
+    def _predict_h2o_cluster(self, texts, model_names):
+        """Run the H2O models on one shared H2O frame holding every text"""
+        tfidf_features = self._tfidf(texts)
+
+        with STAGE_SECONDS.time(stage='h2o_upload', model=''):
+            # Gather the model columns in frame order; the H2O REST upload needs
+            # dense rows, so the matrix is only densified here at the JVM boundary
+            df = pd.DataFrame(tfidf_features[:, self.h2o_column_index].toarray(), columns=self.h2o_columns)
+            # Create H2O frame once for all H2O models
+            h2o_frame = h2o.H2OFrame(df, column_types=['numeric'] * len(self.h2o_columns))
+
+        scores = {}
+        for model_name in model_names:
+            print(f"  - {model_name}...")
+            with STAGE_SECONDS.time(stage='h2o_predict', model=model_name):
+                predictions = self.models[model_name].predict(h2o_frame)
+            with STAGE_SECONDS.time(stage='h2o_download', model=model_name):
+                pred_df = predictions.as_data_frame()
+            scores[model_name] = [
+                _h2o_prediction(pred, p0, p1)
+                for pred, p0, p1 in zip(pred_df['predict'], pred_df['p0'], pred_df['p1'])
+            ]
+
+        return scores
+
+    def predict_h2o_model(self, text, model_name):
+        """Predict using H2O models (DRF, GBM, GLM)"""
+        return self._predict_h2o_batch([text], [model_name])[model_name][0]
+
+    def _predict_transformers(self, texts, model_names=TRANSFORMER_MODELS):
+        """Transformer branch: BERT then RoBERTa"""
+        single_fns = {'BERT': self.predict_bert, 'RoBERTa': self.predict_roberta}
+        batch_fns = {'BERT': self.predict_bert_batch, 'RoBERTa': self.predict_roberta_batch}
+
+        scores = {}
+        for model_name in model_names:
+            if len(texts) == 1:
+                print(f"Running {model_name}...")
+                scores[model_name] = [single_fns[model_name](texts[0])]
+            else:
+                print(f"Running {model_name} on {len(texts)} texts...")
+                scores[model_name] = batch_fns[model_name](texts)
+        return scores
+
+    def _predict_h2o(self, texts, model_names=H2O_MODELS):
+        """TF-IDF/H2O branch: DRF, GBM and GLM"""
+        print("Running H2O models...")
+        return self._predict_h2o_batch(texts, model_names)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.parallel_workers,
+                                                    thread_name_prefix='predict-branch')
+        return self._executor
+
+    def _cache_keys(self, texts, model_name):
+        version = self.model_versions.get(model_name, '')
+        return [PredictionCache.make_key(text_hash(text), model_name, version) for text in texts]
+
+    def _run_branches(self, texts, model_names=MODEL_NAMES):
+        """Score texts with the given models, returns {model_name: [(prediction, confidence), ...]}
+
+        Results already in the prediction cache are reused per model; only the
+        missing (model, text) pairs are computed. The transformer branch and the
+        TF-IDF/H2O branch share no state, so in parallel mode the transformers
+        run on the worker pool while the H2O branch runs on the calling thread.
+        """
+        scores = {model_name: [None] * len(texts) for model_name in model_names}
+        keys = {}
+        if self.cache is not None:
+            for model_name in model_names:
+                keys[model_name] = self._cache_keys(texts, model_name)
+                scores[model_name] = [self.cache.get(key) for key in keys[model_name]]
+
+        def pending(branch_models):
+            """Models that still miss a result, and the texts they must run on"""
+            names = [name for name in branch_models if name in scores and None in scores[name]]
+            indices = sorted({i for name in names for i, value in enumerate(scores[name]) if value is None})
+            return tuple(names), indices
+
+        transformer_names, transformer_indices = pending(TRANSFORMER_MODELS)
+        h2o_names, h2o_indices = pending(H2O_MODELS)
+
+        def transformer_branch():
+            if not transformer_names:
+                return {}
+            return self._predict_transformers([texts[i] for i in transformer_indices], transformer_names)
+
+        def h2o_branch():
+            if not h2o_names:
+                return {}
+            return self._predict_h2o([texts[i] for i in h2o_indices], h2o_names)
+
+        if self.parallel and transformer_names and h2o_names:
+            transformer_future = self._get_executor().submit(transformer_branch)
+            computed = [(h2o_indices, h2o_branch()), (transformer_indices, transformer_future.result())]
+        else:
+            computed = [(transformer_indices, transformer_branch()), (h2o_indices, h2o_branch())]
+
+        for indices, branch_scores in computed:
+            for model_name, values in branch_scores.items():
+                for i, value in zip(indices, values):
+                    if scores[model_name][i] is None:
+                        scores[model_name][i] = value
+                        if self.cache is not None:
+                            self.cache.put(keys[model_name][i], value)
+
+        return scores
+
+    def _run_early_exit(self, texts):
+        """Score texts in EARLY_EXIT_ORDER, dropping each text once its majority is decided.
+
+        Models that were not needed for a text are left as None in the result.
+        """
+        scores = {model_name: [None] * len(texts) for model_name in MODEL_NAMES}
+        undecided = list(range(len(texts)))
+
+        for stage in EARLY_EXIT_STAGES:
+            stage_scores = self._run_branches([texts[i] for i in undecided], stage)
+            for model_name, values in stage_scores.items():
+                for i, value in zip(undecided, values):
+                    scores[model_name][i] = value
+
+            undecided = [i for i in undecided if not _majority_decided(scores, i)]
+            if not undecided:
+                break
+
+        return scores
+
+    def _run_cascade(self, texts):
+        """Score texts with the TF-IDF models; only texts below the cascade threshold
+        also run BERT and RoBERTa. Transformer scores of the other texts stay None.
+        """
+        scores = {model_name: [None] * len(texts) for model_name in MODEL_NAMES}
+        scores.update(self._run_branches(texts, CASCADE_MODELS))
+
+        uncertain = [i for i in range(len(texts)) if not self._cascade_confident(scores, i)]
+        if uncertain:
+            escalated = self._run_branches([texts[i] for i in uncertain], TRANSFORMER_MODELS)
+            for model_name, values in escalated.items():
+                for i, value in zip(uncertain, values):
+                    scores[model_name][i] = value
+
+        self.cascade_counts['escalated'] += len(uncertain)
+        self.cascade_counts['answered'] += len(texts) - len(uncertain)
+        return scores
+
+    def _cascade_confident(self, scores, i):
+        return cascade_decision(scores, i)[1] >= self.cascade_threshold
+
+    def _score(self, texts):
+        if self.cascade_threshold is not None:
+            return self._run_cascade(texts)
+        if self.early_exit:
+            return self._run_early_exit(texts)
+        return self._run_branches(texts)
+
+    def _output(self, scores, i):
+        """Response dict for text i, answered by the cascade's TF-IDF stage or by the vote"""
+        if self.cascade_threshold is not None and all(scores[name][i] is None for name in TRANSFORMER_MODELS):
+            return _build_cascade_output(scores, i)
+        return _build_output(scores, i)
+
+    def _resolve_tier(self, tier):
+        tier = tier or self.default_tier
+        if tier not in self.tiers:
+            raise ValueError(f"Tier '{tier}' is not available, loaded tiers: {', '.join(self.tiers)}")
+        return tier
+
+    def _predict_fast(self, texts):
+        """Fast tier: (prediction, confidence) of the distilled student per text"""
+        scores = [None] * len(texts)
+        keys = None
+        if self.cache is not None:
+            keys = self._cache_keys(texts, STUDENT_MODEL)
+            scores = [self.cache.get(key) for key in keys]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = self._predict_transformer_batch(STUDENT_MODEL, [texts[i] for i in missing])
+            for i, score in zip(missing, computed):
+                scores[i] = score
+                if keys is not None:
+                    self.cache.put(keys[i], score)
+        return scores
+
+    def predict_all(self, text, tier=None):
+        if self._resolve_tier(tier) == 'fast':
+            return self.predict_all_batch([text], tier='fast')[0]
+
+        scores = self._score([text])
+
+        with STAGE_SECONDS.time(stage='ensemble', model=''):
+            return self._output(scores, 0)
+
+    def score_stage(self, texts, model_names):
+        """{model_name: [(prediction, confidence), ...]} of one iter_predictions stage"""
+        if tuple(model_names) == (STUDENT_MODEL,):
+            return {STUDENT_MODEL: self._predict_fast(texts)}
+        return self._run_branches(texts, model_names)
+
+    def iter_predictions(self, text, tier=None, run_stage=None):
+        """Score one text stage by stage (EARLY_EXIT_STAGES), cheapest models first.
+
+        Yields ('model', result) as soon as each model has scored the text and
+        ('ensemble', output) last, output being what predict_all returns. In
+        early-exit mode the stages after the decided majority are skipped, in
+        cascade mode the transformers are skipped when the TF-IDF models are
+        confident. The fast tier has a single stage: the student.
+
+        run_stage(model_names) -> {model_name: (prediction, confidence)} scores
+        the text for one stage; by default score_stage on the calling thread.
+        """
+        if run_stage is None:
+            def run_stage(model_names):
+                return {name: values[0] for name, values in self.score_stage([text], model_names).items()}
+
+        if self._resolve_tier(tier) == 'fast':
+            score = run_stage((STUDENT_MODEL,))[STUDENT_MODEL]
+            yield 'model', dict(_format_result(*score), model=STUDENT_MODEL)
+            yield 'ensemble', _build_fast_output(score)
+            return
+
+        scores = {model_name: [None] for model_name in MODEL_NAMES}
+        cascade = self.cascade_threshold is not None
+        for stage in EARLY_EXIT_STAGES:
+            if self.early_exit and _majority_decided(scores, 0):
+                break
+            # The first stage holds the three TF-IDF models (CASCADE_MODELS)
+            if cascade and scores[CASCADE_MODELS[0]][0] is not None:
+                confident = self._cascade_confident(scores, 0)
+                self.cascade_counts['answered' if confident else 'escalated'] += 1
+                cascade = False
+                if confident:
+                    break
+            stage_scores = run_stage(stage)
+            for model_name in stage:
+                scores[model_name] = [stage_scores[model_name]]
+                yield 'model', dict(_format_result(*scores[model_name][0]), model=model_name)
+
+        with STAGE_SECONDS.time(stage='ensemble', model=''):
+            output = self._output(scores, 0)
+        yield 'ensemble', output
+
+    def predict_all_batch(self, texts, tier=None):
+        """Make predictions for several texts, one forward pass per model.
+
+        Returns one {'individual_results', 'ensemble', 'skipped_models'} dict
+        per text, in the same order as the input. tier='fast' scores with the
+        distilled student only (see _build_fast_output).
+        """
+        texts = list(texts)
+        tier = self._resolve_tier(tier)
+        print(f"Running batch of {len(texts)} texts ({tier} tier)...")
+        BATCH_SIZE.observe(len(texts))
+
+        if tier == 'fast':
+            return [_build_fast_output(score) for score in self._predict_fast(texts)]
+
+        scores = self._score(texts)
+
+        with STAGE_SECONDS.time(stage='ensemble', model=''):
+            return [self._output(scores, i) for i in range(len(texts))]
+
+
+def _pad_batch(sequences, pad_token_id):
+    """input_ids / attention_mask tensors for token id lists, right-padded to the longest"""
+    length = max(len(ids) for ids in sequences)
+    input_ids = np.full((len(sequences), length), pad_token_id, dtype=np.int64)
+    attention_mask = np.zeros((len(sequences), length), dtype=np.int64)
+    for row, ids in enumerate(sequences):
+        input_ids[row, :len(ids)] = ids
+        attention_mask[row, :len(ids)] = 1
+    return {'input_ids': torch.from_numpy(input_ids), 'attention_mask': torch.from_numpy(attention_mask)}
+
+
+def _length_buckets(lengths, max_bucket_size, max_padding):
+    """Split sequence indices into forward-pass buckets of similar length.
+
+    Indices are sorted by length; a bucket is closed when it holds
+    max_bucket_size sequences or when adding the next (longer) sequence would
+    make the padding exceed max_padding times the real tokens of the bucket.
+    """
+    buckets = []
+    bucket, real_tokens = [], 0
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        padded_tokens = (len(bucket) + 1) * lengths[i]
+        if bucket and (len(bucket) == max_bucket_size
+                       or padded_tokens > (1 + max_padding) * (real_tokens + lengths[i])):
+            buckets.append(bucket)
+            bucket, real_tokens = [], 0
+        bucket.append(i)
+        real_tokens += lengths[i]
+    if bucket:
+        buckets.append(bucket)
+    return buckets
+
+
+def _window_starts(n_tokens, window_size, overlap, max_windows):
+    """Start offsets of overlapping windows covering n_tokens tokens.
+
+    Consecutive windows share `overlap` tokens and the last window ends at the
+    final token. When more than max_windows are needed, evenly spaced windows
+    are kept so the whole document is still sampled.
+    """
+    if n_tokens <= window_size:
+        return [0]
+
+    step = max(1, window_size - overlap)
+    starts = list(range(0, n_tokens - window_size, step))
+    starts.append(n_tokens - window_size)
+
+    if max_windows and len(starts) > max_windows:
+        keep = np.unique(np.linspace(0, len(starts) - 1, max_windows).round().astype(int))
+        starts = [starts[i] for i in keep]
+
+    return starts
+
+
+def _h2o_prediction(pred, p0, p1):
+    """Convert one H2O predict/p0/p1 row into (prediction, confidence)"""
+    pred = int(pred)
+    confidence = float(p1) if pred == 1 else float(p0)
+    return pred, confidence
+
+
+def _format_result(pred, conf):
+    return {
+        'prediction': pred,
+        'confidence': round(conf * 100, 2),
+        'label': 'HUMAN' if pred == 1 else 'AI'
+    }
+
+
+def _majority_decided(scores, i):
+    """True when the votes for text i already fix the majority vote"""
+    votes = [scores[model_name][i][0] for model_name in MODEL_NAMES if scores[model_name][i] is not None]
+    human_votes = sum(votes)
+    return human_votes >= MAJORITY or len(votes) - human_votes >= MAJORITY
+
+
+def _build_output(scores, i):
+    """Response dict for text i; models without a score were skipped by early exit"""
+    results = {
+        model_name: _format_result(*scores[model_name][i])
+        for model_name in MODEL_NAMES
+        if scores[model_name][i] is not None
+    }
+    return {
+        'individual_results': results,
+        'ensemble': _build_ensemble(results),
+        'skipped_models': [model_name for model_name in MODEL_NAMES if model_name not in results]
+    }
+
+
+def human_probability(prediction, confidence):
+    """P(HUMAN) of one (prediction, confidence) result; confidence belongs to the predicted class"""
+    return confidence if prediction == 1 else 1.0 - confidence
+
+
+def cascade_decision(scores, i):
+    """(prediction, confidence) of the TF-IDF models for text i, from their mean HUMAN probability"""
+    p_human = float(np.mean([human_probability(*scores[model_name][i]) for model_name in CASCADE_MODELS]))
+    return (1, p_human) if p_human >= 0.5 else (0, 1.0 - p_human)
+
+
+def _build_cascade_output(scores, i):
+    """Response dict for text i answered by the TF-IDF models alone (cascade mode)"""
+    results = {model_name: _format_result(*scores[model_name][i]) for model_name in CASCADE_MODELS}
+    decision = _format_result(*cascade_decision(scores, i))
+    ensemble = _build_ensemble(results)
+    ensemble.update(prediction=decision['prediction'], label=decision['label'],
+                    confidence=decision['confidence'], answered_by='tfidf')
+    return {
+        'individual_results': results,
+        'ensemble': ensemble,
+        'skipped_models': list(TRANSFORMER_MODELS)
+    }
+
+
+def _build_fast_output(score):
+    """Response dict of the fast tier: the student's result stands in for the ensemble"""
+    result = _format_result(*score)
+    return {
+        'individual_results': {STUDENT_MODEL: result},
+        'ensemble': dict(result, vote_count=result['prediction'], models_run=1, total_models=1, tier='fast'),
+        'skipped_models': list(MODEL_NAMES)
+    }
+
+
+def _build_ensemble(results):
+    """Majority vote over the individual model results"""
+    predictions_list = [r['prediction'] for r in results.values()]
+    ensemble_pred = 1 if sum(predictions_list) >= MAJORITY else 0
+    ensemble_label = 'HUMAN' if ensemble_pred == 1 else 'AI'
+    avg_confidence = round(np.mean([r['confidence'] for r in results.values()]), 2)
+    vote_count = sum(predictions_list)
+
+    return {
+        'prediction': ensemble_pred,
+        'label': ensemble_label,
+        'confidence': avg_confidence,
+        'vote_count': vote_count,
+        'models_run': len(results),
+        'total_models': len(MODEL_NAMES)
+    }
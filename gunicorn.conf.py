@@ -0,0 +1,38 @@
+"""
+Pre-fork multi-worker serving:
+
+    pip install gunicorn
+    HUMANORAI_H2O_BACKEND=native gunicorn -c gunicorn.conf.py app:app
+
+The master imports app.py and loads every model once (prepare_prefork), then
+forks the workers. Workers share the model memory copy-on-write, and the
+transformer weights are mmapped read-only from model.safetensors, so resident
+memory grows far less than one full model set per worker. Use the native H2O
+backend; with the cluster backend each worker still opens its own connection
+to the (single) H2O JVM.
+"""
+import multiprocessing
+import os
+
+# Read by app.py when the master imports it (preload_app below)
+os.environ['HUMANORAI_PREFORK'] = '1'
+os.environ.setdefault('HUMANORAI_MMAP_WEIGHTS', '1')
+
+bind = os.environ.get('HUMANORAI_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('HUMANORAI_WORKERS', multiprocessing.cpu_count() // 2 or 1))
+# Request threads per worker; they only wait on the worker's inference queue
+worker_class = 'gthread'
+threads = int(os.environ.get('HUMANORAI_WORKER_THREADS', 8))
+timeout = int(os.environ.get('HUMANORAI_WORKER_TIMEOUT', 120))
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after app.py is imported and before any worker is forked
+    from app import prepare_prefork
+    prepare_prefork()
+
+
+def post_fork(server, worker):
+    from app import after_fork
+    after_fork(server.cfg.workers)
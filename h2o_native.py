@@ -0,0 +1,431 @@
+"""
+In-process scoring for the H2O AutoML models (DRF, GBM, GLM).
+
+The models are exported once from a running H2O cluster into plain NumPy
+arrays (.npz files under models/native/). Later runs load these files and
+score inside the Python process, without starting the H2O JVM or uploading
+an H2OFrame per request.
+
+Export manually with:
+    python h2o_native.py [models_dir]
+
+Every exported model is checked against H2O's own p0/p1 on sample rows before it
+is written (PARITY_TOLERANCE). Re-check existing exports with:
+    python h2o_native.py [models_dir] --verify
+and time them against H2O's model.predict with:
+    python h2o_native.py [models_dir] --benchmark
+"""
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+import scipy.sparse as sp
+
+NATIVE_DIR = 'native'
+
+H2O_MODEL_DIRS = {
+    'DRF': 'DRF_1_AutoML_4_20251221_72446',
+    'GBM': 'GBM_1_AutoML_4_20251221_72446',
+    'GLM': 'GLM_1_AutoML_4_20251221_72446',
+}
+
+# Largest allowed |p0 - H2O p0| / |p1 - H2O p1| on the parity sample
+PARITY_TOLERANCE = 1e-5
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _default_threshold(model):
+    """Threshold H2O uses to turn p1 into the 'predict' column (max F1)"""
+    threshold = model._model_json['output'].get('default_threshold')
+    if threshold is None:
+        threshold = model.find_threshold_by_max_metric('f1')
+    return float(threshold)
+
+
+def model_feature_names(model):
+    """Training columns of an H2O model, in training order, without the response column"""
+    output = model._model_json['output']
+    response = output.get('response_column_name')
+    return [name for name in output['names'] if name != response]
+
+
+def vocabulary_index(feature_names, vocabulary):
+    """TF-IDF column of every model feature, fails when a feature is not in the vocabulary"""
+    missing = [name for name in feature_names if name not in vocabulary]
+    if missing:
+        raise ValueError(f"{len(missing)} model features are not in the TF-IDF vocabulary "
+                         f"(first: {missing[:5]})")
+    return np.array([vocabulary[name] for name in feature_names], dtype=np.int64)
+
+
+class NativeH2OModel(ABC):
+    """Common part of the native evaluators: thresholding, feature binding, persistence"""
+    algo = None
+
+    def __init__(self, feature_names, threshold):
+        self.feature_names = list(feature_names)
+        self.threshold = float(threshold)
+        # Input column of every model feature, identity until bound to a vocabulary
+        self.feature_index = np.arange(len(self.feature_names), dtype=np.int64)
+
+    def bind_vocabulary(self, vocabulary):
+        """Map every model feature to its column in the TF-IDF matrix.
+
+        The mapping is folded into the model parameters, so scoring reads the
+        sparse TF-IDF rows directly and never reorders or densifies them.
+        """
+        self.feature_index = vocabulary_index(self.feature_names, vocabulary)
+        self._bind_inputs(max(vocabulary.values()) + 1)
+
+    def _bind_inputs(self, n_inputs):
+        pass
+
+    @abstractmethod
+    def predict_p1(self, X):
+        """X: TF-IDF rows, scipy CSR matrix (dense arrays are converted)"""
+
+    def predict(self, X):
+        """Return (predict, p0, p1) arrays, same columns as H2O's model.predict"""
+        p1 = self.predict_p1(X)
+        predict = (p1 >= self.threshold).astype(np.int64)
+        return predict, 1.0 - p1, p1
+
+    def _meta(self):
+        return {'algo': self.algo, 'threshold': self.threshold, 'feature_names': self.feature_names}
+
+    def _arrays(self):
+        return {}
+
+    def save(self, path):
+        np.savez(path, meta=np.array(json.dumps(self._meta())), **self._arrays())
+
+
+class NativeGLM(NativeH2OModel):
+    """Binomial GLM: sigmoid(x . beta + intercept)"""
+    algo = 'glm'
+
+    def __init__(self, feature_names, threshold, coefficients, intercept):
+        super().__init__(feature_names, threshold)
+        self.coefficients = np.asarray(coefficients, dtype=np.float64)
+        self.intercept = float(intercept)
+        self._input_coefficients = self.coefficients
+
+    def _bind_inputs(self, n_inputs):
+        # Coefficient vector laid out in TF-IDF column order
+        self._input_coefficients = np.zeros(n_inputs, dtype=np.float64)
+        self._input_coefficients[self.feature_index] = self.coefficients
+
+    @classmethod
+    def from_h2o(cls, model):
+        # H2O standardizes the inputs when fitting; coef() returns the coefficients
+        # with that standardization already folded in (unlike coef_norm()), so
+        # they apply to the raw TF-IDF values and the rows stay sparse
+        coefs = dict(model.coef())
+        intercept = coefs.pop('Intercept', 0.0)
+        names = list(coefs)
+        return cls(names, _default_threshold(model), [coefs[name] for name in names], intercept)
+
+    def predict_p1(self, X):
+        # Sparse matrix-vector product, only the non-zero TF-IDF terms contribute
+        X = sp.csr_matrix(X, dtype=np.float64)
+        return _sigmoid(np.asarray(X @ self._input_coefficients).ravel() + self.intercept)
+
+    def _meta(self):
+        meta = super()._meta()
+        meta['intercept'] = self.intercept
+        return meta
+
+    def _arrays(self):
+        return {'coefficients': self.coefficients}
+
+    @classmethod
+    def _from_saved(cls, meta, arrays):
+        return cls(meta['feature_names'], meta['threshold'], arrays['coefficients'], meta['intercept'])
+
+
+class NativeTreeEnsemble(NativeH2OModel):
+    """Binomial DRF/GBM stored as one flat node table for the whole ensemble.
+
+    Node arrays: feature (-1 for leaves), threshold, left, right, na_left and
+    value; tree t owns nodes tree_offsets[t]:tree_offsets[t + 1] and starts at
+    its first node. Child indices are global, so every tree is walked at once.
+    A row goes left when value < threshold.
+    """
+    NODE_ARRAYS = ('feature', 'threshold', 'left', 'right', 'na_left', 'value')
+    # Documents scored per step; bounds the (row, tree) arrays of a walk
+    CHUNK_ROWS = 256
+
+    def __init__(self, algo, feature_names, threshold, trees, init_f=0.0):
+        super().__init__(feature_names, threshold)
+        self.algo = algo
+        self.init_f = float(init_f)
+
+        # Trees use local child indices; shift them by the tree offset
+        self.tree_offsets = np.cumsum([0] + [len(tree['left']) for tree in trees]).astype(np.int64)
+        self.nodes = {key: np.concatenate([np.asarray(tree[key]) for tree in trees]) for key in self.NODE_ARRAYS}
+        offsets = np.repeat(self.tree_offsets[:-1], np.diff(self.tree_offsets))
+        for key in ('left', 'right'):
+            children = self.nodes[key].astype(np.int64)
+            self.nodes[key] = np.where(children >= 0, children + offsets, -1)
+        self.nodes['feature'] = self.nodes['feature'].astype(np.int64)
+        self.nodes['na_left'] = self.nodes['na_left'].astype(bool)
+        self._bind_inputs(len(self.feature_names))
+
+    def _bind_inputs(self, n_inputs):
+        # Input column read by every split node (-1 at leaves), so splits look
+        # their values up in the TF-IDF rows without reordering any column
+        split = self.nodes['feature']
+        self._split_columns = np.where(split >= 0, self.feature_index[np.maximum(split, 0)], -1)
+
+    @property
+    def n_trees(self):
+        return len(self.tree_offsets) - 1
+
+    @classmethod
+    def from_h2o(cls, model):
+        from h2o.tree import H2OTree
+
+        feature_names = model_feature_names(model)
+        name_to_index = {name: i for i, name in enumerate(feature_names)}
+        output = model._model_json['output']
+        n_trees = int(output['model_summary']['number_of_trees'][0])
+
+        trees = []
+        for tree_number in range(n_trees):
+            tree = H2OTree(model=model, tree_number=tree_number)
+            trees.append({
+                'feature': np.array([-1 if f is None else name_to_index[f] for f in tree.features], dtype=np.int64),
+                'threshold': np.array([np.nan if t is None else t for t in tree.thresholds], dtype=np.float64),
+                'left': np.array(tree.left_children, dtype=np.int64),
+                'right': np.array(tree.right_children, dtype=np.int64),
+                'na_left': np.array([na == 'LEFT' for na in tree.nas], dtype=bool),
+                'value': np.array([np.nan if p is None else p for p in tree.predictions], dtype=np.float64),
+            })
+
+        return cls(model.algo, feature_names, _default_threshold(model), trees, output.get('init_f', 0.0))
+
+    def _leaf_totals(self, X):
+        """Sum of the leaf values reached by each row, all trees walked together.
+
+        X: CSR rows in canonical format (sorted, no duplicate columns). Every
+        step moves each (row, tree) pair one level down; pairs already at a
+        leaf stay put. Split values are binary-searched among the non-zeros of
+        X, an absent entry reading as 0.0, so no row is ever densified.
+        """
+        table = self.nodes
+        n_rows, n_columns = X.shape
+        # Non-zero entries keyed by row * n_columns + column, in ascending order
+        keys = np.repeat(np.arange(n_rows, dtype=np.int64), np.diff(X.indptr)) * n_columns + X.indices
+        last = keys.size - 1
+
+        nodes = np.tile(self.tree_offsets[:-1], (n_rows, 1))
+        rows = np.arange(n_rows, dtype=np.int64)[:, None]
+        while True:
+            columns = self._split_columns[nodes]
+            inner = columns >= 0
+            if not inner.any():
+                break
+            values = np.zeros(nodes.shape)
+            if last >= 0:
+                wanted = rows * n_columns + columns
+                positions = np.minimum(np.searchsorted(keys, wanted), last)
+                values = np.where(keys[positions] == wanted, X.data[positions], 0.0)
+            go_left = np.where(np.isnan(values), table['na_left'][nodes], values < table['threshold'][nodes])
+            nodes = np.where(inner, np.where(go_left, table['left'][nodes], table['right'][nodes]), nodes)
+        return table['value'][nodes].sum(axis=1)
+
+    def predict_p1(self, X):
+        X = sp.csr_matrix(X, dtype=np.float64)
+        if not X.has_canonical_format:
+            X = X.copy()
+            X.sum_duplicates()
+
+        totals = np.empty(X.shape[0])
+        for start in range(0, X.shape[0], self.CHUNK_ROWS):
+            # Row slices of a CSR matrix stay sparse and canonical
+            chunk = X[start:start + self.CHUNK_ROWS]
+            totals[start:start + chunk.shape[0]] = self._leaf_totals(chunk)
+
+        if self.algo == 'gbm':
+            # Bernoulli GBM: trees add up to the logit of p1
+            return _sigmoid(totals + self.init_f)
+        # Binomial DRF: the average of the class-0 trees is p0
+        return 1.0 - totals / self.n_trees
+
+    def _meta(self):
+        meta = super()._meta()
+        meta['init_f'] = self.init_f
+        return meta
+
+    def _arrays(self):
+        # Saved with per-tree (local) child indices, as exported
+        offsets = np.repeat(self.tree_offsets[:-1], np.diff(self.tree_offsets))
+        arrays = {'tree_offsets': self.tree_offsets}
+        arrays.update(self.nodes)
+        for key in ('left', 'right'):
+            arrays[key] = np.where(arrays[key] >= 0, arrays[key] - offsets, -1)
+        return arrays
+
+    @classmethod
+    def _from_saved(cls, meta, arrays):
+        offsets = arrays['tree_offsets']
+        trees = []
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            trees.append({key: arrays[key][start:end] for key in cls.NODE_ARRAYS})
+        return cls(meta['algo'], meta['feature_names'], meta['threshold'], trees, meta['init_f'])
+
+
+def export_native_model(model):
+    """Convert a loaded H2O model into its in-process equivalent"""
+    if model.algo == 'glm':
+        return NativeGLM.from_h2o(model)
+    if model.algo in ('drf', 'gbm'):
+        return NativeTreeEnsemble.from_h2o(model)
+    raise ValueError(f"Unsupported H2O algorithm for native scoring: {model.algo}")
+
+
+def load_native_model(path):
+    """Load a model written by NativeH2OModel.save"""
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        arrays = {key: data[key] for key in data.files if key != 'meta'}
+
+    if meta['algo'] == 'glm':
+        return NativeGLM._from_saved(meta, arrays)
+    return NativeTreeEnsemble._from_saved(meta, arrays)
+
+
+def native_model_paths(models_dir):
+    native_dir = os.path.join(models_dir, NATIVE_DIR)
+    return {name: os.path.join(native_dir, f'{name}.npz') for name in H2O_MODEL_DIRS}
+
+
+def parity_sample(n_features, n_rows=64, density=0.02, seed=0):
+    """Random non-negative sparse rows shaped like TF-IDF output (L2-normalized)"""
+    X = sp.random(n_rows, n_features, density=density, format='csr',
+                  random_state=np.random.default_rng(seed), dtype=np.float64)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms) @ X)
+
+
+def check_parity(native_model, h2o_model, X, tolerance=PARITY_TOLERANCE):
+    """Compare native predict/p0/p1 with H2O's on X (columns in model feature order).
+
+    Returns the largest absolute p0/p1 difference, raises ValueError above
+    tolerance or when a 'predict' label differs (wrong threshold).
+    """
+    import h2o
+    import pandas as pd
+
+    frame = h2o.H2OFrame(pd.DataFrame(sp.csr_matrix(X).toarray(), columns=native_model.feature_names),
+                         column_types=['numeric'] * len(native_model.feature_names))
+    expected = h2o_model.predict(frame).as_data_frame()
+
+    # Unbound model: columns of X are the model features in order
+    predict, p0, p1 = native_model.predict(X)
+    max_diff = max(
+        float(np.max(np.abs(p0 - expected['p0'].to_numpy(dtype=np.float64)), initial=0.0)),
+        float(np.max(np.abs(p1 - expected['p1'].to_numpy(dtype=np.float64)), initial=0.0)),
+    )
+    if max_diff > tolerance:
+        raise ValueError(f"Native {native_model.algo} p0/p1 differ from H2O by {max_diff:.3g} "
+                         f"(tolerance {tolerance:g})")
+    mismatches = int(np.sum(predict != expected['predict'].to_numpy().astype(np.int64)))
+    if mismatches:
+        raise ValueError(f"Native {native_model.algo} 'predict' differs from H2O on {mismatches} rows "
+                         f"(threshold {native_model.threshold:g})")
+    return max_diff
+
+
+def export_all(models_dir='models', verify=True):
+    """Export DRF, GBM and GLM from models_dir into models_dir/native"""
+    import h2o
+
+    h2o.init(verbose=False)
+    paths = native_model_paths(models_dir)
+    os.makedirs(os.path.dirname(paths['DRF']), exist_ok=True)
+
+    for name, model_dir in H2O_MODEL_DIRS.items():
+        if os.path.exists(paths[name]):
+            continue
+        print(f"Exporting {name} for in-process scoring...")
+        model = h2o.load_model(os.path.join(models_dir, model_dir))
+        native_model = export_native_model(model)
+        if verify:
+            max_diff = check_parity(native_model, model, parity_sample(len(native_model.feature_names)))
+            print(f"{name}: max |p - H2O p| = {max_diff:.3g}")
+        native_model.save(paths[name])
+
+    return paths
+
+
+def verify_all(models_dir='models', tolerance=PARITY_TOLERANCE):
+    """Re-check existing exports against the H2O models, returns {name: max_diff}"""
+    import h2o
+
+    h2o.init(verbose=False)
+    results = {}
+    for name, path in native_model_paths(models_dir).items():
+        model = h2o.load_model(os.path.join(models_dir, H2O_MODEL_DIRS[name]))
+        native_model = load_native_model(path)
+        results[name] = check_parity(native_model, model, parity_sample(len(native_model.feature_names)),
+                                     tolerance)
+    return results
+
+
+def benchmark_all(models_dir='models', n_rows=1000, repeats=3):
+    """Docs/sec of the native evaluators vs H2O's model.predict on the same rows.
+
+    The H2O timing includes the frame upload and the result download, as in
+    the 'cluster' backend.
+    """
+    import h2o
+    import pandas as pd
+
+    h2o.init(verbose=False)
+    results = {}
+    for name, path in native_model_paths(models_dir).items():
+        model = h2o.load_model(os.path.join(models_dir, H2O_MODEL_DIRS[name]))
+        native_model = load_native_model(path)
+        X = parity_sample(len(native_model.feature_names), n_rows=n_rows)
+
+        def score_h2o():
+            frame = h2o.H2OFrame(pd.DataFrame(X.toarray(), columns=native_model.feature_names),
+                                 column_types=['numeric'] * len(native_model.feature_names))
+            model.predict(frame).as_data_frame()
+
+        seconds = {}
+        for backend, score in (('native', lambda: native_model.predict(X)), ('h2o', score_h2o)):
+            timings = []
+            for _ in range(repeats):
+                begin = time.perf_counter()
+                score()
+                timings.append(time.perf_counter() - begin)
+            seconds[backend] = min(timings)
+
+        results[name] = {
+            'native_docs_per_sec': round(n_rows / seconds['native'], 1),
+            'h2o_docs_per_sec': round(n_rows / seconds['h2o'], 1),
+            'speedup': round(seconds['h2o'] / seconds['native'], 1),
+        }
+    return results
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    models_dir = args[0] if args else 'models'
+    if '--verify' in sys.argv[1:]:
+        for name, max_diff in verify_all(models_dir).items():
+            print(f"{name}: max |p - H2O p| = {max_diff:.3g}")
+    elif '--benchmark' in sys.argv[1:]:
+        print(json.dumps(benchmark_all(models_dir), indent=2))
+    else:
+        for name, path in export_all(models_dir).items():
+            print(f"{name}: {path}")
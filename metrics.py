@@ -0,0 +1,137 @@
+"""
+Minimal Prometheus-style metrics for the prediction service.
+
+Histograms record where prediction time goes (tokenization, forward passes,
+TF-IDF, H2O upload/predict/download, ensembling); callback gauges read live
+values such as queue depth, cache hit rate and process RSS at scrape time.
+render() produces the Prometheus text exposition format served on /metrics.
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds: from sub-millisecond H2O predicts up to multi-second transformer batches
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in labels)
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def collect(self):
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, values in sorted(series.items()):
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + [('le', '+Inf')])} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {values[-1]}")
+        return lines
+
+
+class CallbackMetric:
+    """Gauge or counter whose value is read from a callback at scrape time.
+
+    The callback returns a number, or None to leave the metric out.
+    """
+
+    def __init__(self, name, documentation, callback, metric_type='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.metric_type = metric_type
+
+    def collect(self):
+        value = self.callback()
+        if value is None:
+            return []
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            f"{self.name} {_format_value(value)}"
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+def process_rss_bytes():
+    """Current resident set size; peak RSS where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'humanorai_stage_seconds', 'Time spent in one prediction stage', ('stage', 'model')))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'humanorai_request_seconds', 'End-to-end request latency', ('endpoint',)))
+BATCH_SIZE = REGISTRY.register(Histogram(
+    'humanorai_batch_size', 'Texts scored per predict_all_batch call', buckets=BATCH_SIZE_BUCKETS))
+REGISTRY.register(CallbackMetric(
+    'humanorai_process_resident_memory_bytes', 'Resident memory of this process', process_rss_bytes))
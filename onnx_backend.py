@@ -0,0 +1,148 @@
+"""
+ONNX Runtime backend for the BERT and RoBERTa classifiers.
+
+Each fine-tuned model is exported once to ONNX (models/onnx/<model dir>.onnx)
+and optimized with the onnxruntime transformer optimizer, which fuses the
+embedding, attention, GELU and LayerNorm subgraphs into single CPU kernels.
+At serving time OnnxSequenceClassifier stands in for the PyTorch model: it
+takes the same tokenizer outputs and returns the same logits, so batching,
+long-document windows and (prediction, confidence) are shared by both
+backends.
+
+Export manually (and check parity against PyTorch) with:
+    python onnx_backend.py [models_dir]
+
+onnx and onnxruntime are only needed for this backend.
+"""
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+ONNX_DIR = 'onnx'
+
+TRANSFORMER_MODEL_DIRS = {
+    'BERT': 'bert_model',
+    'RoBERTa': 'roberta_model',
+}
+
+# Positional order of the *ForSequenceClassification forward() arguments;
+# the exporter names graph inputs in this order
+FORWARD_INPUTS = ('input_ids', 'attention_mask', 'token_type_ids')
+
+PARITY_TEXTS = [
+    "The committee reviewed the proposal and asked for a revised budget before the next meeting.",
+    "honestly i didnt think the movie was that good but my friends loved it so whatever",
+    "In conclusion, renewable energy sources offer a sustainable path forward for modern economies.",
+]
+
+
+def onnx_model_path(models_dir, dirname):
+    return os.path.join(models_dir, ONNX_DIR, f"{dirname}.onnx")
+
+
+def export_onnx(model_dir, output_path, opset=17):
+    """Export a fine-tuned classifier to an optimized ONNX file.
+
+    Returns the fused operator counts reported by the optimizer.
+    """
+    from onnxruntime.transformers.optimizer import optimize_model
+
+    # The optimizer recognises the eager attention subgraph, not SDPA
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir, attn_implementation='eager')
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    dummy = tokenizer(PARITY_TEXTS[:2], return_tensors='pt', padding=True)
+    input_names = [name for name in FORWARD_INPUTS if name in dummy]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    raw_path = output_path + '.raw'
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                model, tuple(dummy[name] for name in input_names), raw_path,
+                input_names=input_names, output_names=['logits'],
+                dynamic_axes=dynamic_axes, opset_version=opset, dynamo=False
+            )
+
+        optimized = optimize_model(
+            raw_path, model_type='bert',
+            num_heads=model.config.num_attention_heads,
+            hidden_size=model.config.hidden_size
+        )
+        optimized.save_model_to_file(output_path)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    return {op: count for op, count in optimized.get_fused_operator_statistics().items() if count}
+
+
+class OnnxSequenceClassifier:
+    """ONNX Runtime session with the call signature of an eval-mode HF classifier"""
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_names = [graph_input.name for graph_input in self.session.get_inputs()]
+
+    def __call__(self, **inputs):
+        input_ids = inputs['input_ids']
+        feed = {}
+        for name in self.input_names:
+            # tokenizer.pad() leaves out token_type_ids; BERT defaults them to zeros
+            value = inputs.get(name)
+            if value is None:
+                value = torch.zeros_like(input_ids)
+            feed[name] = value.cpu().numpy().astype(np.int64)
+
+        logits = self.session.run(['logits'], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+def check_parity(model_dir, onnx_path, texts=PARITY_TEXTS):
+    """Largest logit difference and label agreement between PyTorch and ONNX Runtime"""
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    onnx_model = OnnxSequenceClassifier(onnx_path)
+
+    inputs = tokenizer(list(texts), return_tensors='pt', truncation=True, max_length=512, padding=True)
+    with torch.no_grad():
+        expected = model(**inputs).logits
+    actual = onnx_model(**inputs).logits
+
+    return {
+        'max_abs_logit_diff': float((expected - actual).abs().max()),
+        'label_agreement': float((expected.argmax(dim=1) == actual.argmax(dim=1)).float().mean())
+    }
+
+
+def export_all(models_dir='models'):
+    """Export BERT and RoBERTa, returns {model_name: (path, fused ops, parity)}"""
+    exported = {}
+    for model_name, dirname in TRANSFORMER_MODEL_DIRS.items():
+        model_dir = os.path.join(models_dir, dirname)
+        path = onnx_model_path(models_dir, dirname)
+        fused = export_onnx(model_dir, path)
+        exported[model_name] = (path, fused, check_parity(model_dir, path))
+    return exported
+
+
+if __name__ == '__main__':
+    for name, (path, fused, parity) in export_all(sys.argv[1] if len(sys.argv) > 1 else 'models').items():
+        print(f"{name}: {path}")
+        print(f"  fused: {fused}")
+        print(f"  parity: {parity}")
@@ -1,19 +1,25 @@
+import argparse
 import os
 import torch
 import pickle
 import h2o
-from transformers import BertForSequenceClassification, BertTokenizer
-from transformers import RobertaForSequenceClassification, RobertaTokenizer
+from transformers import BertForSequenceClassification, BertTokenizerFast
+from transformers import RobertaForSequenceClassification, RobertaTokenizerFast
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 import pandas as pd
+from bulk_scoring import INPUT_FORMATS, score_file
+from h2o_native import model_feature_names, vocabulary_index
+from preprocessing import TextPreprocessor
 
 class HumanOrAIPredictor:
     def __init__(self, models_dir='models'):
         self.models_dir = models_dir
         self.models = {}
         self.predictions = {}
-        self.h2o_column_names = None  # Store H2O expected column names
+        # H2O frame columns and the TF-IDF column of each, set once at load
+        self.h2o_columns = None
+        self.h2o_column_index = None
 
         print("Loading models...")
         self._load_models()
@@ -25,7 +31,7 @@ class HumanOrAIPredictor:
         bert_path = os.path.join(self.models_dir, 'bert_model')
         self.models['BERT'] = {
             'model': BertForSequenceClassification.from_pretrained(bert_path),
-            'tokenizer': BertTokenizer.from_pretrained(bert_path)
+            'tokenizer': BertTokenizerFast.from_pretrained(bert_path)
         }
         self.models['BERT']['model'].eval()
 
@@ -34,7 +40,7 @@ class HumanOrAIPredictor:
         roberta_path = os.path.join(self.models_dir, 'roberta_model')
         self.models['RoBERTa'] = {
             'model': RobertaForSequenceClassification.from_pretrained(roberta_path),
-            'tokenizer': RobertaTokenizer.from_pretrained(roberta_path)
+            'tokenizer': RobertaTokenizerFast.from_pretrained(roberta_path)
         }
         self.models['RoBERTa']['model'].eval()
 
@@ -49,6 +55,7 @@ class HumanOrAIPredictor:
             print("Trying with joblib...")
             import joblib
             self.tfidf_vectorizer = joblib.load(tfidf_path)
+        self.preprocessor = TextPreprocessor.load(self.models_dir)
 
         # Initialize H2O
         print("Initializing H2O...")
@@ -67,14 +74,11 @@ class HumanOrAIPredictor:
         glm_path = os.path.join(self.models_dir, 'GLM_1_AutoML_4_20251221_72446')
         self.models['GLM'] = h2o.load_model(glm_path)
 
-        # Get expected column names from one of the models
-        try:
-            varimp = self.models['DRF'].varimp(use_pandas=True)
-            if varimp is not None and len(varimp) > 0:
-                self.h2o_column_names = varimp['variable'].tolist()
-                print(f"Model expects {len(self.h2o_column_names)} features")
-        except Exception as e:
-            print(f"Could not get column names: {e}")
+        # Training columns in training order, mapped to TF-IDF columns once;
+        # fails here when a model column is not in the vectorizer vocabulary
+        self.h2o_columns = model_feature_names(self.models['DRF'])
+        self.h2o_column_index = vocabulary_index(self.h2o_columns, self.tfidf_vectorizer.vocabulary_)
+        print(f"Model expects {len(self.h2o_columns)} features")
 
     def predict_bert(self, text):
         """Predict using BERT model"""
@@ -110,17 +114,10 @@ class HumanOrAIPredictor:
 
     def predict_h2o_model(self, text, model_name):
         """Predict using H2O models (DRF, GBM, GLM)"""
-        # Transform text using TF-IDF
-        tfidf_features = self.tfidf_vectorizer.transform([text]).toarray()
-        n_features = tfidf_features.shape[1]
-
-        # Use stored column names if available
-        if self.h2o_column_names and len(self.h2o_column_names) >= n_features:
-            # Use the expected column names from model training
-            df = pd.DataFrame(tfidf_features, columns=self.h2o_column_names[:n_features])
-        else:
-            # Fallback: let pandas auto-generate column names
-            df = pd.DataFrame(tfidf_features)
+        # Preprocess as in training, transform using TF-IDF, model columns in training order
+        processed = self.preprocessor.preprocess(text)
+        tfidf_features = self.tfidf_vectorizer.transform([processed])[:, self.h2o_column_index].toarray()
+        df = pd.DataFrame(tfidf_features, columns=self.h2o_columns)
 
         # Convert to H2O frame
         h2o_frame = h2o.H2OFrame(df)
@@ -206,7 +203,42 @@ class HumanOrAIPredictor:
         h2o.cluster().shutdown()
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Human or AI Text Classifier')
+    bulk = parser.add_argument_group('bulk mode', 'score a whole corpus into a JSONL file')
+    bulk.add_argument('--bulk', metavar='INPUT', help='CSV, JSONL or Parquet file to score')
+    bulk.add_argument('--output', help='JSONL output (default: INPUT.scores.jsonl)')
+    bulk.add_argument('--format', choices=INPUT_FORMATS, help='Input format (default: from the extension)')
+    bulk.add_argument('--text-column', default='Text')
+    bulk.add_argument('--id-column', help='Copied to every output line (default: row number)')
+    bulk.add_argument('--workers', type=int, default=1, help='Worker processes, 0 = score in this process')
+    bulk.add_argument('--batch-size', type=int, default=32, help='Rows per chunk sent to a worker')
+    bulk.add_argument('--h2o-backend', choices=('cluster', 'native'), default='native',
+                      help='native avoids one H2O JVM connection per worker')
+    bulk.add_argument('--overwrite', action='store_true', help='Start over instead of resuming')
+    return parser.parse_args()
+
+
+def run_bulk(args):
+    output = args.output or os.path.splitext(args.bulk)[0] + '.scores.jsonl'
+    workers = max(args.workers, 0)
+    predictor_kwargs = {
+        'h2o_backend': args.h2o_backend,
+        # Split the cores between the workers instead of oversubscribing them
+        'torch_threads': max(1, (os.cpu_count() or 1) // max(workers, 1)),
+    }
+    scored = score_file(args.bulk, output, text_column=args.text_column, id_column=args.id_column,
+                        input_format=args.format, workers=workers, batch_size=args.batch_size,
+                        predictor_kwargs=predictor_kwargs, overwrite=args.overwrite)
+    print(f"Scored {scored} rows into {output}")
+
+
 def main():
+    args = parse_args()
+    if args.bulk:
+        run_bulk(args)
+        return
+
     # Get input text from user
     print("Human or AI Text Classifier")
     print("="*70)
@@ -0,0 +1,198 @@
+"""
+Content-addressed cache for per-model prediction results.
+
+Entries are keyed by a hash of the input text, the model name and the
+version of the loaded model artifact, so a model update never serves stale
+results. Each model is stored separately: when only some models have a
+cached result for a text, the others are computed and the rest are reused.
+
+Memory tier: LRU with an entry limit and a TTL.
+Disk tier (optional): SQLite file that survives restarts and can be shared
+by several worker processes.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def artifact_fingerprint(path):
+    """Cheap version id for a model file or directory: names, sizes and mtimes"""
+    digest = hashlib.sha256()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                stat = os.stat(file_path)
+                digest.update(f"{os.path.relpath(file_path, path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    elif os.path.exists(path):
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+class SQLiteCacheStore:
+    """Disk tier shared between processes; writes are last-writer-wins"""
+    # Puts between two trims of expired and surplus rows; in between the table
+    # may hold up to this many rows (per process) beyond max_entries
+    TRIM_INTERVAL = 1000
+
+    def __init__(self, path, ttl_seconds, max_entries):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._puts = 0
+        self._puts_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                " key TEXT PRIMARY KEY, prediction INTEGER, confidence REAL, created REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS predictions_created ON predictions (created)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def reset_connections(self):
+        """Drop connections inherited from a parent process (call after fork)"""
+        self._local = threading.local()
+
+    def get(self, key):
+        """((prediction, confidence), created) for key, created in time.time() seconds; None if absent or expired"""
+        row = self._connection().execute(
+            "SELECT prediction, confidence, created FROM predictions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        prediction, confidence, created = row
+        if self.ttl_seconds and time.time() - created > self.ttl_seconds:
+            return None
+        return (prediction, confidence), created
+
+    def put(self, key, value):
+        prediction, confidence = value
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, prediction, confidence, created) VALUES (?, ?, ?, ?)",
+                (key, int(prediction), float(confidence), time.time())
+            )
+        with self._puts_lock:
+            self._puts += 1
+            due = self._puts % self.TRIM_INTERVAL == 0
+        if due:
+            self.trim()
+
+    def trim(self):
+        """Delete expired rows and the oldest rows beyond max_entries, in one pass"""
+        with self._connection() as conn:
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM predictions WHERE created < ?", (time.time() - self.ttl_seconds,))
+            if self.max_entries:
+                # Every insert (INSERT OR REPLACE too) takes a new, larger rowid,
+                # so rowid order is age order and the rowid index finds the cut
+                conn.execute(
+                    "DELETE FROM predictions WHERE rowid <= ("
+                    " SELECT rowid FROM predictions ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+
+class PredictionCache:
+    def __init__(self, max_entries=5000, ttl_seconds=3600, disk_path=None, max_disk_entries=200000):
+        """
+        max_entries: in-memory entries (one entry = one model's result for one text)
+        ttl_seconds: entry lifetime, 0 disables expiry
+        disk_path: SQLite file for the optional persistent tier
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = SQLiteCacheStore(disk_path, ttl_seconds, max_disk_entries) if disk_path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    @staticmethod
+    def make_key(text_digest, model_name, model_version):
+        return f"{text_digest}:{model_name}:{model_version}"
+
+    def get(self, key):
+        """Cached (prediction, confidence) for key, or None"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self.ttl_seconds or now - created <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        row = self.disk.get(key) if self.disk else None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            self.hits += 1
+            self.disk_hits += 1
+            # Keep the disk entry's age: its TTL runs from the original put, not from now
+            self._store(key, value, now - max(0.0, time.time() - created))
+        return value
+
+    def put(self, key, value):
+        value = (int(value[0]), float(value[1]))
+        with self._lock:
+            self._store(key, value, time.monotonic())
+        if self.disk:
+            self.disk.put(key, value)
+
+    def _store(self, key, value, now):
+        self._entries[key] = (value, now)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def after_fork(self):
+        # A forked worker must open its own SQLite connections
+        if self.disk:
+            self.disk.reset_connections()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'disk_path': self.disk.path if self.disk else None
+            }
@@ -0,0 +1,80 @@
+"""
+Read-only memory-mapped transformer weights for pre-fork serving.
+
+from_pretrained copies every weight into anonymous process memory. When the
+parent of a pre-fork server loads the models, forked workers share those
+pages only until something writes near them, and a new server process gets
+its own copy. mmap_model_weights re-points the parameters of a loaded model
+at a read-only mmap of its model.safetensors instead. The page cache then
+holds the only copy of the weights, shared by every worker and by every
+process that maps the same file.
+
+The mapped tensors are read-only, so this is for inference on CPU only (no
+training, no quantization, no .to('cuda')).
+"""
+import json
+import mmap
+import os
+import struct
+import warnings
+
+import torch
+
+SAFETENSORS_FILE = 'model.safetensors'
+
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+    'U8': torch.uint8, 'BOOL': torch.bool,
+}
+
+
+def mmap_safetensors(path):
+    """{name: tensor} viewing a read-only mmap of a .safetensors file, no copy"""
+    with open(path, 'rb') as f:
+        # Layout: 8-byte little-endian header size, JSON header, raw tensor data
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header.pop('__metadata__', None)
+    data_start = 8 + header_size
+    tensors = {}
+    with warnings.catch_warnings():
+        # Writing to these tensors would fault, which is the point
+        warnings.filterwarnings('ignore', message='The given buffer is not writable')
+        for name, info in header.items():
+            dtype = SAFETENSORS_DTYPES[info['dtype']]
+            begin, end = info['data_offsets']
+            offset = data_start + begin
+            itemsize = torch.empty((), dtype=dtype).element_size()
+            if end == begin:
+                tensor = torch.empty(0, dtype=dtype)
+            elif offset % itemsize:
+                # Misaligned entry (old writers): fall back to a private copy
+                tensor = torch.frombuffer(bytearray(buffer[offset:data_start + end]), dtype=dtype)
+            else:
+                tensor = torch.frombuffer(buffer, dtype=dtype, count=(end - begin) // itemsize, offset=offset)
+            tensors[name] = tensor.reshape(info['shape'])
+    return tensors
+
+
+def mmap_model_weights(model, model_dir):
+    """Replace the parameters of model with mmapped ones from model_dir/model.safetensors.
+
+    Only entries whose name, shape and dtype match the model are swapped; the
+    rest (e.g. weights saved under legacy names) keep their loaded copy.
+    Returns the number of swapped tensors, 0 when there is no safetensors file.
+    """
+    path = os.path.join(model_dir, SAFETENSORS_FILE)
+    if not os.path.exists(path):
+        return 0
+
+    state = model.state_dict()
+    mapped = {
+        name: tensor for name, tensor in mmap_safetensors(path).items()
+        if name in state and state[name].shape == tensor.shape and state[name].dtype == tensor.dtype
+    }
+    # assign=True keeps the mmapped storage instead of copying into the old one
+    model.load_state_dict(mapped, strict=False, assign=True)
+    return len(mapped)
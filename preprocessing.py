@@ -0,0 +1,135 @@
+"""
+Text preprocessing shared by training (ModelEgitim.py) and serving (TF-IDF input).
+
+The TF-IDF vectorizer was fitted on lemmatize(clean_text(text)):
+lowercase, strip URLs, HTML tags and non-letters, collapse whitespace, then
+WordNet-lemmatize every token (noun lemmas, no stopword removal). Serving
+applies the same steps so request texts land on the same vocabulary terms.
+
+WordNet is not called per token. At training time every distinct corpus word
+is lemmatized once into a lookup table, saved next to the vectorizer
+(models/lemma_table.json). At serving time lemmatization is a dict lookup.
+Words missing from the table go to WordNet when nltk is installed; the
+result is memoized. Without nltk, missing words are kept unchanged.
+
+Build the table for an existing corpus (nltk + wordnet needed) with:
+    python preprocessing.py --data corpus.csv --output models/lemma_table.json
+"""
+import argparse
+import json
+import os
+import re
+
+LEMMA_TABLE_FILE = 'lemma_table.json'
+
+_URL_RE = re.compile(r'http\S+|www\S+|https\S+')
+_HTML_RE = re.compile(r'<.*?>')
+_NON_LETTER_RE = re.compile(r'[^a-z\s]')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _strip(text):
+    """Lowercase, no URLs, no HTML tags, letters and whitespace only"""
+    text = _URL_RE.sub('', text.lower())
+    text = _HTML_RE.sub('', text)
+    return _NON_LETTER_RE.sub('', text)
+
+
+def clean_text(text):
+    """Regex cleaning step of the training pipeline"""
+    return _SPACE_RE.sub(' ', _strip(text)).strip()
+
+
+def _wordnet_lemmatize():
+    """WordNetLemmatizer.lemmatize, or None when nltk or the wordnet data is missing"""
+    try:
+        from nltk.stem import WordNetLemmatizer
+        lemmatize = WordNetLemmatizer().lemmatize
+        lemmatize('tests')  # loads the corpus, raises LookupError if not downloaded
+    except (ImportError, LookupError):
+        return None
+    return lemmatize
+
+
+def build_lemma_table(cleaned_texts):
+    """WordNet lemma of every distinct word in the (clean_text'ed) corpus"""
+    lemmatize = _wordnet_lemmatize()
+    if lemmatize is None:
+        raise ImportError("Building the lemma table needs nltk with the wordnet corpus: "
+                          "pip install nltk && python -m nltk.downloader wordnet omw-1.4")
+
+    words = set()
+    for text in cleaned_texts:
+        words.update(text.split())
+    return {word: lemmatize(word) for word in sorted(words)}
+
+
+class TextPreprocessor:
+    """clean_text + table-based lemmatization, one text or a batch at a time"""
+
+    def __init__(self, lemma_table=None, wordnet_fallback=True, max_entries=500_000):
+        self.lemmas = dict(lemma_table or {})
+        self.max_entries = max_entries  # bound on the table once fallback lemmas are memoized
+        self._wordnet_fallback = wordnet_fallback
+        self._wordnet = None
+        self._wordnet_checked = False
+
+    @classmethod
+    def load(cls, models_dir, **kwargs):
+        """Preprocessor with the lemma table saved in models_dir, when there is one"""
+        path = os.path.join(models_dir, LEMMA_TABLE_FILE)
+        if not os.path.exists(path):
+            print(f"Lemma table not found at {path}, unknown words use WordNet if available")
+            return cls(**kwargs)
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f), **kwargs)
+
+    def save_table(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.lemmas, f, ensure_ascii=False, sort_keys=True)
+
+    def _lemma(self, word):
+        """Lemma of a word that is not in the table"""
+        if not self._wordnet_checked:
+            self._wordnet = _wordnet_lemmatize() if self._wordnet_fallback else None
+            self._wordnet_checked = True
+        if self._wordnet is None:
+            return word
+
+        lemma = self._wordnet(word)
+        if len(self.lemmas) < self.max_entries:
+            self.lemmas[word] = lemma
+        return lemma
+
+    def lemmatize(self, cleaned_text):
+        """Lemmatization step of the training pipeline (input already cleaned)"""
+        lemmas, lemma = self.lemmas, self._lemma
+        return ' '.join([lemmas.get(word) or lemma(word) for word in cleaned_text.split()])
+
+    def preprocess(self, text):
+        """lemmatize(clean_text(text)); split() already collapses the whitespace"""
+        return self.lemmatize(_strip(text))
+
+    def preprocess_batch(self, texts):
+        lemmas, lemma = self.lemmas, self._lemma
+        return [' '.join([lemmas.get(word) or lemma(word) for word in _strip(text).split()])
+                for text in texts]
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Build the lemma table used by the serving preprocessing')
+    parser.add_argument('--data', required=True, help='Training CSV file')
+    parser.add_argument('--text-column', default='Text')
+    parser.add_argument('--output', default=os.path.join('models', LEMMA_TABLE_FILE))
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.data).dropna(subset=[args.text_column])[args.text_column]
+    preprocessor = TextPreprocessor(build_lemma_table(clean_text(text) for text in texts))
+    preprocessor.save_table(args.output)
+    print(f"{len(preprocessor.lemmas)} lemmas written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Dynamic INT8 quantization of the transformer models for CPU inference.
+
+quantize_transformer replaces every nn.Linear of BERT/RoBERTa with a dynamically
+quantized one (int8 weights, activations quantized on the fly). The attention
+and feed-forward projections are Linear layers, so most of the compute moves to
+int8 kernels while embeddings and LayerNorm stay fp32.
+
+The parity check scores a held-out sample with the fp32 and int8 models and
+reports label agreement, probability drift, accuracy and speed per model:
+
+    python quantization.py --data heldout.csv --sample 200 --output parity.json
+
+The CSV needs a text column (default 'Text') and optionally a label column
+(default 'Label', 1 = HUMAN, 0 = AI), the same layout as the training data.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import torch
+
+
+def quantize_transformer(model):
+    """Dynamically quantized copy of model, Linear layers only (CPU only)"""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _score(predictor, texts, batch_size):
+    """{model_name: [(prediction, confidence), ...]} and seconds per model"""
+    from ensemble import TRANSFORMER_MODELS
+
+    scores = {model_name: [] for model_name in TRANSFORMER_MODELS}
+    seconds = dict.fromkeys(TRANSFORMER_MODELS, 0.0)
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        for model_name in TRANSFORMER_MODELS:
+            begin = time.perf_counter()
+            scores[model_name].extend(predictor._predict_transformers(chunk, (model_name,))[model_name])
+            seconds[model_name] += time.perf_counter() - begin
+    return scores, seconds
+
+
+def parity_report(texts, labels=None, models_dir='models', batch_size=8):
+    """Compare fp32 and int8 transformer predictions on texts.
+
+    Returns {model_name: metrics}. Accuracies are included when labels are given.
+    """
+    from ensemble import HumanOrAIPredictor, human_probability
+
+    texts = list(texts)
+    results = {}
+    for quantize in (False, True):
+        predictor = HumanOrAIPredictor(models_dir=models_dir, quantize=quantize)
+        # Only the transformers are compared: skip TF-IDF and H2O
+        predictor._load_bert()
+        predictor._load_roberta()
+        results[quantize] = _score(predictor, texts, batch_size)
+
+    (fp32_scores, fp32_seconds), (int8_scores, int8_seconds) = results[False], results[True]
+
+    report = {}
+    for model_name in fp32_scores:
+        fp32_pred = np.array([pred for pred, _ in fp32_scores[model_name]])
+        int8_pred = np.array([pred for pred, _ in int8_scores[model_name]])
+        fp32_prob = np.array([human_probability(*score) for score in fp32_scores[model_name]])
+        int8_prob = np.array([human_probability(*score) for score in int8_scores[model_name]])
+        drift = np.abs(fp32_prob - int8_prob)
+
+        metrics = {
+            'documents': len(texts),
+            'label_agreement': round(float(np.mean(fp32_pred == int8_pred)), 4),
+            'mean_abs_prob_diff': round(float(drift.mean()), 6),
+            'max_abs_prob_diff': round(float(drift.max()), 6),
+            'fp32_ms_per_doc': round(1000 * fp32_seconds[model_name] / len(texts), 2),
+            'int8_ms_per_doc': round(1000 * int8_seconds[model_name] / len(texts), 2),
+            'speedup': round(fp32_seconds[model_name] / int8_seconds[model_name], 2),
+        }
+        if labels is not None:
+            labels = np.asarray(labels)
+            metrics['fp32_accuracy'] = round(float(np.mean(fp32_pred == labels)), 4)
+            metrics['int8_accuracy'] = round(float(np.mean(int8_pred == labels)), 4)
+        report[model_name] = metrics
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fp32 vs dynamic INT8 parity check for BERT and RoBERTa')
+    parser.add_argument('--data', required=True, help='Held-out CSV file')
+    parser.add_argument('--text-column', default='Text')
+    parser.add_argument('--label-column', default='Label', help='Ignored when the column is missing')
+    parser.add_argument('--sample', type=int, default=200, help='Documents to score (0 = all)')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--output', help='Write the report as JSON')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data).dropna(subset=[args.text_column])
+    if args.sample and len(df) > args.sample:
+        df = df.sample(n=args.sample, random_state=42)
+
+    labels = df[args.label_column].astype(int).tolist() if args.label_column in df.columns else None
+    report = parity_report(df[args.text_column].tolist(), labels, args.models_dir, args.batch_size)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
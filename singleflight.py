@@ -0,0 +1,219 @@
+"""
+Single-flight coalescing of identical in-flight predictions.
+
+A client retrying a slow /predict call, or many users posting the same text
+at once, would otherwise start one full model run per request. SingleFlight
+keys every text (tier + text hash; a /predict_stream stage adds its model
+names): a request whose key is already being computed attaches to that
+computation and gets the same result.
+
+Inside a worker process this is a dict of in-flight futures. Across the
+workers of a pre-fork server it is optional, via lock_dir. The request
+leading a key holds a lock on that key until its result is ready: one byte
+of a shared lock file, at an offset taken from the key's hash. The same key
+in another worker waits for that lock, then runs; its model scores now come
+from the shared SQLite prediction cache (HUMANORAI_CACHE_PATH), which serves
+as the cross-worker result store. Different keys never wait for each other.
+"""
+import errno
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+LOCK_FILE = 'singleflight.lock'
+
+
+def _copy_outcome(source, target):
+    """Resolve target like the finished source, unless target is already done"""
+    try:
+        if source.cancelled():
+            target.cancel()
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+    except InvalidStateError:
+        pass  # target was cancelled by its caller meanwhile
+
+
+class _Flight:
+    """One in-flight computation and the callers waiting for it"""
+
+    def __init__(self, key):
+        self.key = key
+        self.future = Future()
+        self.source = None  # future of the underlying computation, once started
+        self.waiters = 0
+
+
+class FileLock:
+    """Exclusive per-key lock shared by the processes using lock_dir.
+
+    A key locks one byte of LOCK_FILE (fcntl record lock) at an offset from
+    its hash, so unrelated keys do not contend and no file is created per
+    key. Record locks belong to the process: its threads never block each
+    other (SingleFlight coalesces those in memory), and the file stays open,
+    since closing any descriptor of it would drop every lock of the process.
+    """
+
+    def __init__(self, lock_dir, timeout=60.0, poll_interval=0.01):
+        import fcntl  # POSIX only, like the pre-fork server itself
+
+        self._fcntl = fcntl
+        self.lock_dir = lock_dir
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        os.makedirs(lock_dir, exist_ok=True)
+        self.path = os.path.join(lock_dir, LOCK_FILE)
+        self._fd = None
+        self._pid = None
+        self._fd_lock = threading.Lock()
+
+    @staticmethod
+    def offset(key):
+        # 60 bits of the key's hash: distinct keys share a byte with negligible probability
+        return int(hashlib.sha256(key.encode()).hexdigest()[:15], 16)
+
+    def _descriptor(self):
+        # Opened once per process; a forked worker opens its own
+        with self._fd_lock:
+            if self._pid != os.getpid():
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._pid = os.getpid()
+            return self._fd
+
+    def _try_lock(self, fd, offset):
+        try:
+            self._fcntl.lockf(fd, self._fcntl.LOCK_EX | self._fcntl.LOCK_NB, 1, offset)
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EACCES, errno.EAGAIN):
+                raise
+            return False
+
+    def acquire_all(self, keys, deadline=None):
+        """The keys whose lock was obtained; a key still held by another process after timeout is skipped.
+
+        Keys are locked in offset order, so two processes locking overlapping
+        keys cannot wait on each other in a cycle. deadline (time.monotonic())
+        is the caller's own limit: reaching it before timeout releases the
+        locks taken so far and raises TimeoutError.
+        """
+        fd = self._descriptor()
+        lock_deadline = time.monotonic() + self.timeout
+        held = set()
+        for key in sorted(keys, key=self.offset):
+            while not self._try_lock(fd, self.offset(key)):
+                now = time.monotonic()
+                if deadline is not None and now >= deadline and deadline < lock_deadline:
+                    for locked in held:
+                        self.release(locked)
+                    raise TimeoutError('Prediction timed out')
+                if now >= lock_deadline:
+                    # Run without this lock rather than fail the request
+                    break
+                time.sleep(self.poll_interval)
+            else:
+                held.add(key)
+        return held
+
+    def release(self, key):
+        self._fcntl.lockf(self._descriptor(), self._fcntl.LOCK_UN, 1, self.offset(key))
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=None, lock_timeout=60.0):
+        """
+        lock_dir: directory for cross-process lock files (None: this process only)
+        lock_timeout: longest wait for another process's computation of a key
+        """
+        self.file_lock = FileLock(lock_dir, lock_timeout) if lock_dir else None
+        self.coalesced = 0  # texts that attached to a computation already in flight
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def submit_many(self, keys, items, start_many, deadline=None):
+        """One Future per item, in order.
+
+        Items whose key is in flight share that computation; the others are
+        passed, all together, to start_many(items) -> futures. If start_many
+        raises (e.g. QueueFullError), nothing was started: the error is raised
+        here and given to any caller that attached meanwhile. deadline
+        (time.monotonic()) bounds the wait for other processes' locks; past it
+        the same happens with TimeoutError.
+        """
+        flights, leading = [], {}
+        with self._lock:
+            for key, item in zip(keys, items):
+                flight = self._inflight.get(key)
+                if flight is None:
+                    flight = self._inflight[key] = _Flight(key)
+                    leading[key] = (item, flight)
+                elif key not in leading:
+                    self.coalesced += 1
+                flight.waiters += 1
+                flights.append(flight)
+
+        if leading:
+            self._start(leading, start_many, deadline)
+        return [self._follow(flight) for flight in flights]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def _start(self, leading, start_many, deadline):
+        held = set()
+
+        def finish(flight):
+            # Unlocked while the key is still in flight here, so no new leader
+            # in this process can take the lock before it is released
+            if flight.key in held:
+                self.file_lock.release(flight.key)
+            self._forget(flight)
+
+        try:
+            if self.file_lock is not None:
+                # Only keys led here are locked; other workers wait on a key until its result is ready
+                held = self.file_lock.acquire_all(leading, deadline)
+            started = start_many([item for item, _ in leading.values()])
+        except BaseException as e:
+            for _, flight in leading.values():
+                finish(flight)
+                flight.future.set_exception(e)
+            raise
+
+        for (_, flight), source in zip(leading.values(), started):
+            flight.source = source
+
+            def done(source, flight=flight):
+                finish(flight)
+                _copy_outcome(source, flight.future)
+
+            source.add_done_callback(done)
+
+    def _forget(self, flight):
+        """Later requests for the key start a new computation (and see the cache)"""
+        with self._lock:
+            if self._inflight.get(flight.key) is flight:
+                del self._inflight[flight.key]
+
+    def _follow(self, flight):
+        """Per-caller view of a flight: cancelling it only drops this caller"""
+        view = Future()
+        flight.future.add_done_callback(lambda done: _copy_outcome(done, view))
+        view.add_done_callback(lambda done: done.cancelled() and self._leave(flight))
+        return view
+
+    def _leave(self, flight):
+        # The last caller gone cancels a computation that has not started yet
+        with self._lock:
+            flight.waiters -= 1
+            abandoned = flight.waiters == 0
+            if abandoned and self._inflight.get(flight.key) is flight:
+                # New requests must not attach to a computation being cancelled
+                del self._inflight[flight.key]
+        if abandoned and flight.source is not None:
+            flight.source.cancel()
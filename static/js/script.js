@@ -49,7 +49,7 @@ analyzeBtn.addEventListener('click', async () => {
     showLoading();
 
     try {
-        const response = await fetch('/predict', {
+        const response = await fetch('/predict_stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -57,20 +57,65 @@ analyzeBtn.addEventListener('click', async () => {
             body: JSON.stringify({ text: text }),
         });
 
-        const data = await response.json();
-
         if (!response.ok) {
+            const data = await response.json();
             throw new Error(data.error || 'Failed to analyze text');
         }
 
-        hideLoading();
-        displayResults(data);
+        // Model cards fill in as each model finishes; the ensemble comes last
+        let finished = false;
+        await readEvents(response, (event, data) => {
+            if (event === 'model') {
+                if (loadingState.style.display !== 'none') {
+                    hideLoading();
+                    showPendingResults();
+                }
+                updateModelCard(data.model, data);
+            } else if (event === 'ensemble') {
+                finished = true;
+                hideLoading();
+                displayResults(data);
+            } else if (event === 'error') {
+                throw new Error(data.error);
+            }
+        });
+
+        if (!finished) {
+            throw new Error('The connection closed before all models finished');
+        }
     } catch (error) {
         hideLoading();
         showError(error.message || 'An error occurred while analyzing the text');
     }
 });
 
+// Parse a text/event-stream response body, calling onEvent(event, data) per event
+async function readEvents(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            const dataLines = [];
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')));
+        }
+    }
+}
+
 // Helper functions
 function showLoading() {
     loadingState.style.display = 'block';
@@ -113,6 +158,23 @@ function displayResults(data) {
     resultsSection.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
 }
 
+// Results section with every model card waiting for its result
+function showPendingResults() {
+    ensembleIcon.innerHTML = '⏳';
+    ensembleLabel.textContent = 'ANALYZING';
+    ensembleLabel.className = 'ensemble-label';
+    ensembleConfidence.textContent = '-';
+    ensembleVotes.textContent = '-';
+    ensembleBar.style.width = '0%';
+
+    ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'].forEach(modelName => {
+        updateModelCard(modelName, null, 'pending');
+    });
+
+    resultsSection.style.display = 'block';
+    resultsSection.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+}
+
 function displayEnsembleResult(ensemble) {
     const isHuman = ensemble.label === 'HUMAN';
 
@@ -128,8 +190,9 @@ function displayEnsembleResult(ensemble) {
     // Set confidence
     ensembleConfidence.textContent = `${ensemble.confidence}%`;
 
-    // Set votes
-    ensembleVotes.textContent = `${ensemble.vote_count}/${ensemble.total_models}`;
+    // Set votes (early exit may skip models once the majority is decided)
+    const modelsRun = ensemble.models_run ?? ensemble.total_models;
+    ensembleVotes.textContent = `${ensemble.vote_count}/${modelsRun}`;
 
     // Set confidence bar
     ensembleBar.style.width = `${ensemble.confidence}%`;
@@ -138,28 +201,41 @@ function displayEnsembleResult(ensemble) {
 function displayIndividualResults(results) {
     const models = ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'];
 
-    models.forEach(modelName => {
-        const result = results[modelName];
-        const modelCard = document.getElementById(`model-${modelName}`);
+    // Models without a result were skipped by early exit: the majority was decided without them
+    models.forEach(modelName => updateModelCard(modelName, results[modelName], 'skipped'));
+}
+
+// Fill one model card; without a result the card shows the given state ('pending' or 'skipped')
+function updateModelCard(modelName, result, emptyState) {
+    const modelCard = document.getElementById(`model-${modelName}`);
+
+    if (!modelCard) return;
+
+    const badge = modelCard.querySelector('.prediction-badge');
+    const confidenceValue = modelCard.querySelector('.confidence-value');
+    const progressFill = modelCard.querySelector('.progress-fill');
 
-        if (!modelCard || !result) return;
+    if (!result) {
+        badge.textContent = emptyState.toUpperCase();
+        badge.className = `prediction-badge ${emptyState}`;
+        confidenceValue.textContent = '-';
+        progressFill.style.width = '0%';
+        progressFill.className = 'progress-fill';
+        return;
+    }
 
-        const isHuman = result.label === 'HUMAN';
+    const isHuman = result.label === 'HUMAN';
 
-        // Update prediction badge
-        const badge = modelCard.querySelector('.prediction-badge');
-        badge.textContent = result.label;
-        badge.className = `prediction-badge ${isHuman ? 'human' : 'ai'}`;
+    // Update prediction badge
+    badge.textContent = result.label;
+    badge.className = `prediction-badge ${isHuman ? 'human' : 'ai'}`;
 
-        // Update confidence value
-        const confidenceValue = modelCard.querySelector('.confidence-value');
-        confidenceValue.textContent = `${result.confidence}%`;
+    // Update confidence value
+    confidenceValue.textContent = `${result.confidence}%`;
 
-        // Update progress bar
-        const progressFill = modelCard.querySelector('.progress-fill');
-        progressFill.style.width = `${result.confidence}%`;
-        progressFill.className = `progress-fill ${isHuman ? 'human' : 'ai'}`;
-    });
+    // Update progress bar
+    progressFill.style.width = `${result.confidence}%`;
+    progressFill.className = `progress-fill ${isHuman ? 'human' : 'ai'}`;
 }
 
 // Sample texts for testing (optional feature)
@@ -236,12 +312,21 @@ document.addEventListener('keydown', (e) => {
 function renderPieChart() {
     const ctx = document.getElementById('confidenceChart').getContext('2d');
 
-    // Extract model data
+    // Extract model data (models skipped by early exit have no result)
     const models = ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'];
-    const modelData = models.map(name => ({
-        name: name,
-        confidence: latestResults.individual_results[name].confidence
-    }));
+    const colors = {
+        BERT: '102, 126, 234',    // Primary blue
+        RoBERTa: '118, 75, 162',  // Purple
+        DRF: '237, 100, 166',     // Pink
+        GBM: '255, 159, 67',      // Orange
+        GLM: '72, 219, 251'       // Cyan
+    };
+    const modelData = models
+        .filter(name => latestResults.individual_results[name])
+        .map(name => ({
+            name: name,
+            confidence: latestResults.individual_results[name].confidence
+        }));
 
     // Destroy existing chart if exists
     if (confidenceChart) {
@@ -255,20 +340,8 @@ function renderPieChart() {
             labels: modelData.map(m => m.name),
             datasets: [{
                 data: modelData.map(m => m.confidence),
-                backgroundColor: [
-                    'rgba(102, 126, 234, 0.8)',  // BERT - Primary blue
-                    'rgba(118, 75, 162, 0.8)',   // RoBERTa - Purple
-                    'rgba(237, 100, 166, 0.8)',  // DRF - Pink
-                    'rgba(255, 159, 67, 0.8)',   // GBM - Orange
-                    'rgba(72, 219, 251, 0.8)'    // GLM - Cyan
-                ],
-                borderColor: [
-                    'rgba(102, 126, 234, 1)',
-                    'rgba(118, 75, 162, 1)',
-                    'rgba(237, 100, 166, 1)',
-                    'rgba(255, 159, 67, 1)',
-                    'rgba(72, 219, 251, 1)'
-                ],
+                backgroundColor: modelData.map(m => `rgba(${colors[m.name]}, 0.8)`),
+                borderColor: modelData.map(m => `rgba(${colors[m.name]}, 1)`),
                 borderWidth: 2,
                 hoverOffset: 15
             }]
@@ -321,13 +394,15 @@ function renderPieChart() {
 function renderRankings() {
     const models = ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'];
 
-    // Create array with model data
-    const modelData = models.map(name => ({
-        name: name,
-        confidence: latestResults.individual_results[name].confidence,
-        label: latestResults.individual_results[name].label,
-        prediction: latestResults.individual_results[name].prediction
-    }));
+    // Create array with model data (skipped models are not ranked)
+    const modelData = models
+        .filter(name => latestResults.individual_results[name])
+        .map(name => ({
+            name: name,
+            confidence: latestResults.individual_results[name].confidence,
+            label: latestResults.individual_results[name].label,
+            prediction: latestResults.individual_results[name].prediction
+        }));
 
     // Sort by confidence descending
     modelData.sort((a, b) => b.confidence - a.confidence);
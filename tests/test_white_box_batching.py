@@ -0,0 +1,202 @@
+"""
+WHITE BOX TEST CASE 4: Micro-Batching Logic Testing
+Test ID: WB-TC-004
+Risk Level: HIGH
+Test Type: Statement Coverage + Concurrency Testing
+
+Tests:
+- batching.MicroBatcher: batch collection, ordering, error propagation
+- Load shedding: bounded queue, all-or-nothing submit_many, 503 + Retry-After
+- app.HumanOrAIPredictor.predict_all_batch: per-document result shape
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import threading
+import pandas as pd
+import numpy as np
+import scipy.sparse as sp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from batching import MicroBatcher, QueueFullError
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """White Box Test Case 4: MicroBatcher"""
+
+    def test_concurrent_items_share_one_batch(self):
+        """Aynı anda gelen istekler tek bir batch içinde işlenmeli"""
+        calls = []
+
+        def batch_fn(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+        futures = [batcher.submit(i) for i in range(4)]
+
+        self.assertEqual([f.result(timeout=5) for f in futures], [0, 2, 4, 6])
+        self.assertEqual(calls, [[0, 1, 2, 3]])
+
+    def test_batch_size_limit(self):
+        """max_batch_size aşılınca yeni batch başlamalı"""
+        calls = []
+
+        def batch_fn(items):
+            calls.append(len(items))
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=200)
+        futures = [batcher.submit(i) for i in range(5)]
+
+        self.assertEqual([f.result(timeout=5) for f in futures], [0, 1, 2, 3, 4])
+        self.assertTrue(all(size <= 2 for size in calls))
+        self.assertEqual(sum(calls), 5)
+
+    def test_exception_reaches_every_caller(self):
+        """batch_fn hatası batch'teki tüm isteklere iletilmeli"""
+        def batch_fn(items):
+            raise RuntimeError("model failure")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=50)
+        futures = [batcher.submit(i) for i in range(2)]
+
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+
+class TestLoadShedding(unittest.TestCase):
+    """Dolu kuyruk yeni işi kabul etmek yerine hemen reddetmeli"""
+
+    def blocked_batcher(self, **kwargs):
+        """Batcher whose single worker is stuck in batch_fn until release is set"""
+        started, release = threading.Event(), threading.Event()
+
+        def batch_fn(items):
+            started.set()
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=1, max_wait_ms=0, **kwargs)
+        first = batcher.submit('running')
+        self.assertTrue(started.wait(5))
+        self.addCleanup(release.set)
+        return batcher, first, release
+
+    def test_full_queue_rejects(self):
+        batcher, first, release = self.blocked_batcher(max_queue_size=2)
+        waiting = batcher.submit_many(['a', 'b'])
+
+        with self.assertRaises(QueueFullError):
+            batcher.submit('c')
+        # A batch that does not fit is refused as a whole
+        with self.assertRaises(QueueFullError):
+            batcher.submit_many(['d', 'e'])
+        self.assertEqual(batcher.queue_depth(), 2)
+        self.assertEqual(batcher.rejected, 3)
+
+        release.set()
+        self.assertEqual([f.result(timeout=5) for f in [first] + waiting], ['running', 'a', 'b'])
+
+    def test_fixed_worker_count(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def batch_fn(items):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            threading.Event().wait(0.05)
+            with lock:
+                active[0] -= 1
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=1, max_wait_ms=0, workers=2)
+        futures = batcher.submit_many(list(range(6)))
+
+        self.assertEqual([f.result(timeout=5) for f in futures], list(range(6)))
+        self.assertEqual(peak[0], 2)
+
+    def test_endpoint_returns_503_with_retry_after(self):
+        import app as app_module
+
+        client = app_module.app.test_client()
+        text = ' '.join(['queue'] * 60)
+        busy = MagicMock()
+        busy.submit.side_effect = QueueFullError('full')
+        busy.submit_many.side_effect = QueueFullError('full')
+
+        with patch.object(app_module.predictor, 'is_initialized', True), \
+                patch.object(app_module, 'batcher', busy), \
+                patch.dict(app_module.app.config, {'BATCH_WAIT_MS': 5, 'RETRY_AFTER_SECONDS': 7}):
+            single = client.post('/predict', json={'text': text})
+            batch = client.post('/predict_batch', json={'texts': [text, text]})
+
+        for response in (single, batch):
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '7')
+
+    def test_timed_out_request_leaves_the_queue(self):
+        import app as app_module
+
+        batcher, first, release = self.blocked_batcher()
+        queued = batcher.submit('late')
+
+        with patch.dict(app_module.app.config, {'REQUEST_TIMEOUT_SECONDS': 0.05}):
+            with self.assertRaises(TimeoutError):
+                app_module._await_results([queued], app_module._deadline())
+        self.assertTrue(queued.cancelled())
+
+
+class TestPredictAllBatch(unittest.TestCase):
+    """predict_all_batch, predict_all ile aynı sonuç yapısını döndürmeli"""
+
+    @patch('ensemble.h2o.H2OFrame')
+    def test_per_document_shape(self, mock_h2o_frame):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor()
+        predictor.is_initialized = True
+        predictor.models = {'DRF': MagicMock(), 'GBM': MagicMock(), 'GLM': MagicMock()}
+        predictor.h2o_columns = ['col1', 'col2']
+        predictor.h2o_column_index = np.array([0, 1])
+        predictor.tfidf_vectorizer = MagicMock()
+        predictor.tfidf_vectorizer.transform = MagicMock(
+            return_value=sp.csr_matrix(np.array([[0.1, 0.2], [0.3, 0.4]]))
+        )
+
+        predictor.predict_bert_batch = MagicMock(return_value=[(1, 0.9), (0, 0.8)])
+        predictor.predict_roberta_batch = MagicMock(return_value=[(1, 0.7), (0, 0.6)])
+
+        mock_h2o_pred = MagicMock()
+        mock_h2o_pred.as_data_frame.return_value = pd.DataFrame({
+            'predict': [1, 0], 'p0': [0.2, 0.9], 'p1': [0.8, 0.1]
+        })
+        for name in ('DRF', 'GBM', 'GLM'):
+            predictor.models[name].predict = MagicMock(return_value=mock_h2o_pred)
+
+        outputs = predictor.predict_all_batch(["first text", "second text"])
+
+        self.assertEqual(len(outputs), 2)
+        self.assertEqual(outputs[0]['ensemble']['label'], 'HUMAN')
+        self.assertEqual(outputs[0]['ensemble']['vote_count'], 5)
+        self.assertEqual(outputs[1]['ensemble']['label'], 'AI')
+        self.assertEqual(outputs[1]['individual_results']['GLM']['confidence'], 90.0)
+        self.assertEqual(list(outputs[0]['individual_results']),
+                         ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'])
+
+        # One H2O frame for the whole batch
+        mock_h2o_frame.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
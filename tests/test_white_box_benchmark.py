@@ -0,0 +1,73 @@
+"""
+WHITE BOX TEST CASE 16: Benchmark Harness Testing
+Test ID: WB-TC-016
+Risk Level: LOW
+Test Type: Statement Coverage
+
+Tests:
+- benchmark.synthetic_corpus: deterministic, exact word counts, distinct texts
+- benchmark.run_benchmark: one row per target and concurrency level, every text scored
+- benchmark.compare_results: latency and throughput regressions beyond the tolerance
+"""
+
+import unittest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmark import compare_results, run_benchmark, synthetic_corpus
+
+
+class TestBenchmark(unittest.TestCase):
+    """White Box Test Case 16: Benchmark"""
+
+    def test_synthetic_corpus(self):
+        texts = synthetic_corpus((50, 5000), docs_per_length=2, seed=1)
+
+        self.assertEqual([len(text.split()) for text in texts], [50, 50, 5000, 5000])
+        self.assertEqual(len(set(texts)), 4)
+        self.assertEqual(texts, synthetic_corpus((50, 5000), docs_per_length=2, seed=1))
+        self.assertNotEqual(texts, synthetic_corpus((50, 5000), docs_per_length=2, seed=2))
+
+    def test_run_benchmark(self):
+        texts = synthetic_corpus((50, 100), docs_per_length=2)
+        calls = []
+        lock = threading.Lock()
+
+        def score(text):
+            with lock:
+                calls.append(text)
+
+        results = run_benchmark({'GLM': score, 'ensemble': score}, texts, (1, 3), repeats=2, warmup=1)
+
+        self.assertEqual([(row['target'], row['concurrency']) for row in results],
+                         [('GLM', 1), ('GLM', 3), ('ensemble', 1), ('ensemble', 3)])
+        # warmup + two passes at each of two levels, for each target
+        self.assertEqual(len(calls), 2 * (1 + 2 * 2 * len(texts)))
+        row = results[0]
+        self.assertEqual(row['requests'], 8)
+        self.assertLessEqual(row['p50_ms'], row['p95_ms'])
+        self.assertLessEqual(row['p95_ms'], row['p99_ms'])
+        self.assertGreater(row['docs_per_sec'], 0)
+        self.assertEqual(set(row['p50_ms_by_words']), {'50', '100'})
+
+    def test_compare_results(self):
+        """Tolerans dışındaki yavaşlamalar regresyon olarak raporlanmalı"""
+        def report(p95, docs_per_sec):
+            return {'results': [{'target': 'BERT', 'concurrency': 4, 'p50_ms': 10.0, 'p95_ms': p95,
+                                 'p99_ms': 30.0, 'docs_per_sec': docs_per_sec}]}
+
+        baseline = report(20.0, 100.0)
+
+        self.assertEqual(compare_results(baseline, report(21.0, 95.0), tolerance=0.10), [])
+        regressions = compare_results(baseline, report(25.0, 80.0), tolerance=0.10)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('p95_ms', regressions[0])
+        self.assertIn('docs_per_sec', regressions[1])
+        self.assertEqual(compare_results({'results': []}, report(99.0, 1.0)), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
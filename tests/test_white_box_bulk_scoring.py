@@ -0,0 +1,132 @@
+"""
+WHITE BOX TEST CASE 14: Bulk Offline Scoring Testing
+Test ID: WB-TC-014
+Risk Level: HIGH
+Test Type: Statement Coverage + Fault Injection
+
+Tests:
+- bulk_scoring.iter_records: lazy CSV and JSONL reading, id and text columns
+- bulk_scoring.score_file: JSONL output in row order, empty texts
+- Checkpoint: a crashed run resumes without rescoring or duplicating rows
+- _export_native_models: the native H2O export runs once, in the parent process
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import csv
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bulk_scoring import _export_native_models, iter_records, score_file
+
+
+class FakePredictor:
+    """predict_all_batch stand-in; fails on the chunk number given in fail_on"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.scored = []
+
+    def predict_all_batch(self, texts):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise RuntimeError("worker crashed")
+        self.scored.extend(texts)
+        return [{'ensemble': {'label': 'AI'}, 'words': len(text.split())} for text in texts]
+
+
+class TestBulkScoring(unittest.TestCase):
+    """White Box Test Case 14: Bulk scoring"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp.name, 'corpus.csv')
+        self.output_path = os.path.join(self.tmp.name, 'scores.jsonl')
+        with open(self.input_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['doc_id', 'Text'])
+            for i in range(10):
+                writer.writerow([f'd{i}', '' if i == 3 else ' '.join(['word'] * (i + 1))])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read_output(self):
+        with open(self.output_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_iter_records_csv_and_jsonl(self):
+        records = list(iter_records(self.input_path, id_column='doc_id'))
+        self.assertEqual(records[0], (0, 'd0', 'word'))
+        self.assertEqual(records[3], (3, 'd3', ''))
+
+        jsonl_path = os.path.join(self.tmp.name, 'corpus.jsonl')
+        with open(jsonl_path, 'w') as f:
+            f.write(json.dumps({'text': 'a b'}) + '\n\n' + json.dumps({'text': None}) + '\n')
+        self.assertEqual(list(iter_records(jsonl_path, text_column='text')), [(0, 0, 'a b'), (1, 1, '')])
+
+    @patch('bulk_scoring._create_predictor')
+    def test_scores_every_row_in_order(self, mock_create):
+        mock_create.return_value = FakePredictor()
+
+        scored = score_file(self.input_path, self.output_path, id_column='doc_id', workers=0, batch_size=4)
+
+        lines = self.read_output()
+        self.assertEqual(scored, 10)
+        self.assertEqual([line['row'] for line in lines], list(range(10)))
+        self.assertEqual(lines[9]['id'], 'd9')
+        self.assertEqual(lines[9]['words'], 10)
+        self.assertEqual(lines[3]['error'], 'empty text')
+
+    @patch('bulk_scoring._create_predictor')
+    def test_resume_after_crash(self, mock_create):
+        """Çöken bir çalışma, biten satırları tekrar skorlamadan devam etmeli"""
+        mock_create.return_value = FakePredictor(fail_on=2)
+        with self.assertRaises(RuntimeError):
+            score_file(self.input_path, self.output_path, workers=0, batch_size=4)
+        self.assertEqual(len(self.read_output()), 4)
+
+        # Simulate a half-written line from the crash
+        with open(self.output_path, 'a') as f:
+            f.write('{"row": 4, "trunc')
+
+        resumed = FakePredictor()
+        mock_create.return_value = resumed
+        scored = score_file(self.input_path, self.output_path, workers=0, batch_size=4)
+
+        self.assertEqual(scored, 6)
+        self.assertNotIn('word', resumed.scored, "Rows of the first chunk were scored again")
+        self.assertEqual([line['row'] for line in self.read_output()], list(range(10)))
+
+        # A finished run does nothing
+        self.assertEqual(score_file(self.input_path, self.output_path, workers=0), 0)
+
+    def test_existing_output_without_checkpoint(self):
+        open(self.output_path, 'w').close()
+        with self.assertRaises(FileExistsError):
+            score_file(self.input_path, self.output_path, workers=0)
+
+    @patch('h2o_native.export_all')
+    def test_native_export_runs_in_the_parent_once(self, mock_export):
+        """Worker'lar aynı .npz dosyalarını aynı anda yazmamalı"""
+        _export_native_models({'h2o_backend': 'cluster', 'models_dir': self.tmp.name})
+        mock_export.assert_not_called()
+
+        _export_native_models({'h2o_backend': 'native', 'models_dir': self.tmp.name})
+        mock_export.assert_called_once_with(self.tmp.name)
+
+        native_dir = os.path.join(self.tmp.name, 'native')
+        os.makedirs(native_dir)
+        for name in ('DRF', 'GBM', 'GLM'):
+            open(os.path.join(native_dir, f'{name}.npz'), 'w').close()
+        _export_native_models({'h2o_backend': 'native', 'models_dir': self.tmp.name})
+        mock_export.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,135 @@
+"""
+WHITE BOX TEST CASE 21: Confidence-Gated Cascade Testing
+Test ID: WB-TC-021
+Risk Level: MEDIUM
+Test Type: Statement Coverage + Branch Coverage
+
+Tests:
+- HumanOrAIPredictor cascade mode: confident texts answered by the TF-IDF models,
+  uncertain texts escalated to BERT/RoBERTa, counters, argument validation
+- iter_predictions in cascade mode: transformer stages skipped when confident
+- cascade.sweep_thresholds / pick_threshold: accuracy vs cost per threshold
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+def make_predictor(h2o_scores, transformer_vote=1, threshold=0.8):
+    """Cascade predictor; h2o_scores[i] is the (prediction, confidence) of every H2O model for text i"""
+    from ensemble import HumanOrAIPredictor
+
+    predictor = HumanOrAIPredictor(cascade_threshold=threshold)
+    predictor.is_initialized = True
+    texts = [f'text {i}' for i in range(len(h2o_scores))]
+
+    def fake_h2o(batch, model_names):
+        return {name: [h2o_scores[texts.index(text)] for text in batch] for name in model_names}
+
+    predictor._predict_h2o = MagicMock(side_effect=fake_h2o)
+    predictor._predict_transformers = MagicMock(
+        side_effect=lambda batch, model_names: {name: [(transformer_vote, 0.9)] * len(batch)
+                                                for name in model_names})
+    return predictor, texts
+
+
+class TestCascadeMode(unittest.TestCase):
+    """White Box Test Case 21: Cascade"""
+
+    def test_only_uncertain_texts_escalate(self):
+        # Text 0: p(HUMAN) 0.9 -> answered; text 1: p(HUMAN) 0.4 -> escalated
+        predictor, texts = make_predictor([(1, 0.9), (0, 0.6)], transformer_vote=1)
+
+        outputs = predictor.predict_all_batch(texts)
+
+        predictor._predict_transformers.assert_called_once_with(['text 1'], ('BERT', 'RoBERTa'))
+        self.assertEqual(outputs[0]['ensemble']['answered_by'], 'tfidf')
+        self.assertEqual(outputs[0]['ensemble']['confidence'], 90.0)
+        self.assertEqual(outputs[0]['skipped_models'], ['BERT', 'RoBERTa'])
+        # Escalated: 5-model vote, 2 HUMAN (transformers) vs 3 AI (H2O)
+        self.assertNotIn('answered_by', outputs[1]['ensemble'])
+        self.assertEqual(outputs[1]['ensemble']['label'], 'AI')
+        self.assertEqual(outputs[1]['skipped_models'], [])
+        self.assertEqual(predictor.cascade_counts, {'answered': 1, 'escalated': 1})
+
+    def test_decision_uses_mean_probability(self):
+        """Oylar bölünse bile karar ortalama HUMAN olasılığından verilir"""
+        from ensemble import _build_cascade_output
+
+        scores = {'DRF': [(1, 0.99)], 'GBM': [(1, 0.95)], 'GLM': [(0, 0.55)]}
+        output = _build_cascade_output(scores, 0)
+
+        self.assertEqual(output['ensemble']['label'], 'HUMAN')
+        self.assertAlmostEqual(output['ensemble']['confidence'], round((0.99 + 0.95 + 0.45) / 3 * 100, 2))
+        self.assertEqual(output['ensemble']['vote_count'], 2)
+
+    def test_invalid_configuration(self):
+        from ensemble import HumanOrAIPredictor
+
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(cascade_threshold=0.3)
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(cascade_threshold=0.8, early_exit=True)
+
+    def test_stream_stops_after_confident_tfidf_stage(self):
+        predictor, texts = make_predictor([(0, 0.95)])
+
+        events = list(predictor.iter_predictions(texts[0]))
+
+        self.assertEqual([data.get('model', event) for event, data in events], ['GLM', 'GBM', 'DRF', 'ensemble'])
+        self.assertEqual(events[-1][1]['ensemble']['answered_by'], 'tfidf')
+        predictor._predict_transformers.assert_not_called()
+
+
+class TestThresholdSweep(unittest.TestCase):
+
+    def setUp(self):
+        # Four texts: H2O confidence 0.95, 0.7, 0.6, 0.9; TF-IDF wrong on text 2 only
+        h2o = [(1, 0.95), (0, 0.7), (1, 0.6), (0, 0.9)]
+        self.scores = {name: list(h2o) for name in ('DRF', 'GBM', 'GLM')}
+        self.scores['BERT'] = [(1, 0.9), (0, 0.9), (0, 0.9), (0, 0.9)]
+        self.scores['RoBERTa'] = [(1, 0.9), (0, 0.9), (0, 0.9), (0, 0.9)]
+        self.labels = [1, 0, 0, 0]
+        self.seconds = {'tfidf': 0.001, 'transformers': 0.099}
+
+    def test_accuracy_and_cost_per_threshold(self):
+        from cascade import sweep_thresholds
+
+        report = sweep_thresholds(self.scores, self.labels, self.seconds, thresholds=(0.5, 0.65, 0.99))
+        rows = {row['threshold']: row for row in report['sweep']}
+
+        self.assertEqual(report['tfidf_only_accuracy'], 0.75)
+        self.assertEqual(report['full_accuracy'], 0.75)  # 3 H2O votes outvote the transformers on text 2
+        self.assertEqual(rows[0.5]['escalation_rate'], 0.0)
+        self.assertEqual(rows[0.5]['relative_cost'], 0.01)
+        self.assertEqual(rows[0.65]['escalation_rate'], 0.25)
+        self.assertAlmostEqual(rows[0.65]['cost_ms_per_doc'], 1.0 + 0.25 * 99.0)
+        self.assertEqual(rows[0.99]['transformer_calls_saved'], 0.0)
+        self.assertEqual(rows[0.99]['relative_cost'], 1.0)
+
+    def test_pick_cheapest_within_accuracy_drop(self):
+        from cascade import pick_threshold
+
+        report = {'full_accuracy': 0.9, 'sweep': [
+            {'threshold': 0.6, 'accuracy': 0.8, 'cost_ms_per_doc': 10.0},
+            {'threshold': 0.8, 'accuracy': 0.895, 'cost_ms_per_doc': 30.0},
+            {'threshold': 0.9, 'accuracy': 0.9, 'cost_ms_per_doc': 60.0},
+        ]}
+
+        self.assertEqual(pick_threshold(report, 0.01)['threshold'], 0.8)
+        self.assertEqual(pick_threshold(report, 0.0)['threshold'], 0.9)
+        report['full_accuracy'] = 0.95
+        self.assertIsNone(pick_threshold(report, 0.01))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
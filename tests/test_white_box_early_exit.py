@@ -0,0 +1,115 @@
+"""
+WHITE BOX TEST CASE 9: Early-Exit Ensemble Voting Testing
+Test ID: WB-TC-009
+Risk Level: MEDIUM
+Test Type: Decision Coverage
+
+Tests:
+- HumanOrAIPredictor._run_early_exit: H2O models first, transformers only when undecided
+- skipped_models and models_run in the response
+- predict_all_batch: each text stops at its own stage
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+def fake_branches(predictions):
+    """_predict_transformers / _predict_h2o stand-ins returning fixed votes per text"""
+    def run(texts, model_names):
+        return {name: [(predictions[text][name], 0.8) for text in texts] for name in model_names}
+    return MagicMock(side_effect=run)
+
+
+class TestEarlyExit(unittest.TestCase):
+    """White Box Test Case 9: Cost-ordered early exit"""
+
+    def make_predictor(self, predictions):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(early_exit=True)
+        predictor._predict_transformers = fake_branches(predictions)
+        predictor._predict_h2o = fake_branches(predictions)
+        return predictor
+
+    def test_agreeing_h2o_models_skip_transformers(self):
+        """Üç H2O modeli aynı oyu verirse transformer modelleri çalışmamalı"""
+        predictions = {'text': {'GLM': 0, 'GBM': 0, 'DRF': 0, 'BERT': 1, 'RoBERTa': 1}}
+        predictor = self.make_predictor(predictions)
+
+        result = predictor.predict_all('text')
+
+        predictor._predict_transformers.assert_not_called()
+        self.assertEqual(result['skipped_models'], ['BERT', 'RoBERTa'])
+        self.assertEqual(list(result['individual_results']), ['DRF', 'GBM', 'GLM'])
+        self.assertEqual(result['ensemble']['label'], 'AI')
+        self.assertEqual(result['ensemble']['models_run'], 3)
+        self.assertEqual(result['ensemble']['total_models'], 5)
+
+    def test_split_vote_runs_transformers_in_cost_order(self):
+        # 2 HUMAN / 1 AI after H2O: BERT decides with a third HUMAN vote
+        predictions = {'text': {'GLM': 1, 'GBM': 1, 'DRF': 0, 'BERT': 1, 'RoBERTa': 0}}
+        predictor = self.make_predictor(predictions)
+
+        result = predictor.predict_all('text')
+
+        predictor._predict_transformers.assert_called_once_with(['text'], ('BERT',))
+        self.assertEqual(result['skipped_models'], ['RoBERTa'])
+        self.assertEqual(result['ensemble']['label'], 'HUMAN')
+        self.assertEqual(result['ensemble']['vote_count'], 3)
+
+    def test_full_run_when_undecided(self):
+        predictions = {'text': {'GLM': 1, 'GBM': 0, 'DRF': 0, 'BERT': 1, 'RoBERTa': 1}}
+        predictor = self.make_predictor(predictions)
+
+        result = predictor.predict_all('text')
+
+        self.assertEqual(result['skipped_models'], [])
+        self.assertEqual(result['ensemble']['models_run'], 5)
+        self.assertEqual(result['ensemble']['label'], 'HUMAN')
+
+    def test_batch_drops_decided_texts(self):
+        """Batch içinde karar verilen metinler sonraki aşamalara girmemeli"""
+        predictions = {
+            'decided': {'GLM': 1, 'GBM': 1, 'DRF': 1, 'BERT': 0, 'RoBERTa': 0},
+            'open': {'GLM': 0, 'GBM': 1, 'DRF': 0, 'BERT': 1, 'RoBERTa': 0},
+        }
+        predictor = self.make_predictor(predictions)
+
+        results = predictor.predict_all_batch(['decided', 'open'])
+
+        predictor._predict_h2o.assert_called_once_with(['decided', 'open'], ('DRF', 'GBM', 'GLM'))
+        self.assertEqual(
+            [call.args for call in predictor._predict_transformers.call_args_list],
+            [(['open'], ('BERT',)), (['open'], ('RoBERTa',))]
+        )
+        self.assertEqual(results[0]['skipped_models'], ['BERT', 'RoBERTa'])
+        self.assertEqual(results[0]['ensemble']['label'], 'HUMAN')
+        self.assertEqual(results[1]['skipped_models'], [])
+        self.assertEqual(results[1]['ensemble']['label'], 'AI')
+
+    def test_disabled_by_default(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictions = {'text': {'GLM': 0, 'GBM': 0, 'DRF': 0, 'BERT': 0, 'RoBERTa': 0}}
+        predictor = HumanOrAIPredictor()
+        predictor._predict_transformers = fake_branches(predictions)
+        predictor._predict_h2o = fake_branches(predictions)
+
+        result = predictor.predict_all('text')
+
+        self.assertEqual(result['skipped_models'], [])
+        self.assertEqual(len(result['individual_results']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
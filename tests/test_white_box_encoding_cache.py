@@ -0,0 +1,79 @@
+"""
+WHITE BOX TEST CASE 12: Tokenization Cache Testing
+Test ID: WB-TC-012
+Risk Level: LOW
+Test Type: Statement Coverage + Decision Coverage
+
+Tests:
+- encoding_cache.EncodingCache: LRU eviction, hit/miss counters
+- HumanOrAIPredictor._encode: one batched tokenizer call, only for uncached texts
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from encoding_cache import EncodingCache
+
+
+def fake_tokenizer():
+    """Her metni kelime uzunluklarına çeviren tokenizer"""
+    return MagicMock(side_effect=lambda texts, **kwargs: {
+        'input_ids': [[len(word) for word in text.split()] for text in texts]})
+
+
+class TestEncodingCache(unittest.TestCase):
+    """White Box Test Case 12: EncodingCache and _encode"""
+
+    def test_lru_eviction(self):
+        cache = EncodingCache(max_entries=2)
+        cache.put('a', [1, 2])
+        cache.put('b', [3])
+        cache.get('a')          # 'a' is now most recently used
+        cache.put('c', [4])     # evicts 'b'
+
+        self.assertEqual(cache.get('a'), [1, 2])
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), [4])
+        self.assertEqual(cache.stats()['hits'], 3)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_encode_tokenizes_only_missing_texts(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(encoding_cache=EncodingCache(max_entries=10))
+        tokenizer = fake_tokenizer()
+        predictor.models['BERT'] = {'model': MagicMock(), 'tokenizer': tokenizer}
+
+        self.assertEqual(predictor._encode('BERT', ['ab cde', 'f']), [[2, 3], [1]])
+        tokenizer.assert_called_once()
+
+        tokenizer.reset_mock()
+        self.assertEqual(predictor._encode('BERT', ['f', 'gh']), [[1], [2]])
+        # Only the new text goes through the tokenizer
+        self.assertEqual(tokenizer.call_args.args[0], ['gh'])
+
+    def test_cache_is_per_model(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(encoding_cache=EncodingCache(max_entries=10))
+        predictor.models['BERT'] = {'model': MagicMock(), 'tokenizer': fake_tokenizer()}
+        predictor.models['RoBERTa'] = {'model': MagicMock(), 'tokenizer': fake_tokenizer()}
+
+        predictor._encode('BERT', ['same text'])
+        predictor._encode('RoBERTa', ['same text'])
+
+        predictor.models['RoBERTa']['tokenizer'].assert_called_once()
+        self.assertEqual(predictor.encoding_cache.stats()['entries'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
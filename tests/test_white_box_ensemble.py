@@ -18,6 +18,7 @@ import sys
 import os
 import pandas as pd
 import numpy as np
+import scipy.sparse as sp
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -35,7 +36,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         Helper: Mock predictor oluştur
         predictions: dict of {model_name: (prediction, confidence)}
         """
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         predictor = HumanOrAIPredictor()
         predictor.is_initialized = True
@@ -47,7 +48,8 @@ class TestEnsembleVotingLogic(unittest.TestCase):
             'GLM': MagicMock()
         }
         predictor.tfidf_vectorizer = MagicMock()
-        predictor.h2o_column_names = ['col1', 'col2']
+        predictor.h2o_columns = ['col1', 'col2']
+        predictor.h2o_column_index = np.array([0, 1])
         predictor.device = 'cpu'
 
         # Mock individual prediction methods
@@ -56,7 +58,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
 
         return predictor
 
-    @patch('app.h2o.H2OFrame')
+    @patch('ensemble.h2o.H2OFrame')
     def test_ensemble_unanimous_human(self, mock_h2o_frame):
         """
         Test Scenario 1: Tüm modeller HUMAN tahmin ediyor (5/5)
@@ -64,7 +66,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         """
         print("\n=== Scenario 1: Unanimous HUMAN (5/5) ===")
 
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: 5/5 HUMAN predictions
         predictor = self.create_mock_predictor({
@@ -84,7 +86,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         predictor.models['GLM'].predict = MagicMock(return_value=mock_h2o_pred)
 
         predictor.tfidf_vectorizer.transform = MagicMock(
-            return_value=MagicMock(toarray=lambda: np.array([[0.1, 0.2]]))
+            return_value=sp.csr_matrix(np.array([[0.1, 0.2]]))
         )
 
         # Mock H2O frame
@@ -110,7 +112,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         print(f"✅ Vote Count: {ensemble['vote_count']}/5")
         print(f"✅ Avg Confidence: {ensemble['confidence']}%")
 
-    @patch('app.h2o.H2OFrame')
+    @patch('ensemble.h2o.H2OFrame')
     def test_ensemble_majority_human(self, mock_h2o_frame):
         """
         Test Scenario 2: 3/5 HUMAN (majority voting - edge case)
@@ -118,7 +120,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         """
         print("\n=== Scenario 2: Majority HUMAN (3/5) ===")
 
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: 3 HUMAN, 2 AI
         predictor = self.create_mock_predictor({
@@ -142,7 +144,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         predictor.models['GLM'].predict = MagicMock(return_value=mock_h2o_ai)
 
         predictor.tfidf_vectorizer.transform = MagicMock(
-            return_value=MagicMock(toarray=lambda: np.array([[0.1, 0.2]]))
+            return_value=sp.csr_matrix(np.array([[0.1, 0.2]]))
         )
 
         mock_h2o_frame.return_value = MagicMock()
@@ -164,7 +166,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         print(f"✅ Vote Count: {vote_count}/5 HUMAN")
         print(f"✅ Ensemble: {ensemble['label']} (majority wins)")
 
-    @patch('app.h2o.H2OFrame')
+    @patch('ensemble.h2o.H2OFrame')
     def test_ensemble_ai_wins(self, mock_h2o_frame):
         """
         Test Scenario 3: 2/5 HUMAN, 3/5 AI (AI wins)
@@ -172,7 +174,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         """
         print("\n=== Scenario 3: AI Wins (2/5 HUMAN, 3/5 AI) ===")
 
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: 2 HUMAN, 3 AI
         predictor = self.create_mock_predictor({
@@ -196,7 +198,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         predictor.models['GLM'].predict = MagicMock(return_value=mock_h2o_ai)
 
         predictor.tfidf_vectorizer.transform = MagicMock(
-            return_value=MagicMock(toarray=lambda: np.array([[0.1, 0.2]]))
+            return_value=sp.csr_matrix(np.array([[0.1, 0.2]]))
         )
 
         mock_h2o_frame.return_value = MagicMock()
@@ -213,7 +215,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         print(f"✅ Vote Count: {ensemble['vote_count']}/5 HUMAN")
         print(f"✅ Ensemble: {ensemble['label']} (AI wins)")
 
-    @patch('app.h2o.H2OFrame')
+    @patch('ensemble.h2o.H2OFrame')
     def test_ensemble_unanimous_ai(self, mock_h2o_frame):
         """
         Test Scenario 4: 0/5 HUMAN, 5/5 AI (Unanimous AI)
@@ -221,7 +223,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         """
         print("\n=== Scenario 4: Unanimous AI (0/5) ===")
 
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: 0 HUMAN, 5 AI
         predictor = self.create_mock_predictor({
@@ -240,7 +242,7 @@ class TestEnsembleVotingLogic(unittest.TestCase):
         predictor.models['GLM'].predict = MagicMock(return_value=mock_h2o_ai)
 
         predictor.tfidf_vectorizer.transform = MagicMock(
-            return_value=MagicMock(toarray=lambda: np.array([[0.1, 0.2]]))
+            return_value=sp.csr_matrix(np.array([[0.1, 0.2]]))
         )
 
         mock_h2o_frame.return_value = MagicMock()
@@ -0,0 +1,131 @@
+"""
+WHITE BOX TEST CASE 19: Distilled Fast Tier Testing
+Test ID: WB-TC-019
+Risk Level: MEDIUM
+Test Type: Statement Coverage + Branch Coverage
+
+Tests:
+- HumanOrAIPredictor tiers: validation, loaders per tier, student-only scoring
+- /predict and /predict_batch: 'tier' field, disabled tier rejected
+- distillation.ensemble_soft_labels: mean HUMAN probability and majority label
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+from concurrent.futures import Future
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+class TestFastTier(unittest.TestCase):
+    """White Box Test Case 19: Fast tier"""
+
+    def test_unknown_tier_rejected(self):
+        from ensemble import HumanOrAIPredictor
+
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(tiers=('turbo',))
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(tiers=())
+
+    def test_fast_only_loads_the_student(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(tiers=('fast',))
+        with patch.object(predictor, '_load_student') as load_student, \
+                patch.object(predictor, '_load_bert') as load_bert, \
+                patch.object(predictor, '_load_h2o_models') as load_h2o, \
+                patch.object(predictor, '_compute_model_versions'):
+            predictor.initialize()
+
+        load_student.assert_called_once()
+        load_bert.assert_not_called()
+        load_h2o.assert_not_called()
+        self.assertEqual(predictor.default_tier, 'fast')
+
+    def test_fast_tier_scores_with_student_only(self):
+        """Hızlı katman sadece öğrenci modeli çalıştırmalı"""
+        from ensemble import HumanOrAIPredictor, MODEL_NAMES
+        from prediction_cache import PredictionCache
+
+        predictor = HumanOrAIPredictor(tiers=('full', 'fast'), cache=PredictionCache())
+        predictor.is_initialized = True
+        predictor._predict_transformer_batch = MagicMock(side_effect=lambda name, texts: [(0, 0.9)] * len(texts))
+        predictor._run_branches = MagicMock()
+
+        outputs = predictor.predict_all_batch(['one text', 'two text'], tier='fast')
+        again = predictor.predict_all('one text', tier='fast')
+
+        predictor._run_branches.assert_not_called()
+        predictor._predict_transformer_batch.assert_called_once_with('Student', ['one text', 'two text'])
+        self.assertEqual(again, outputs[0])
+        ensemble = outputs[0]['ensemble']
+        self.assertEqual((ensemble['label'], ensemble['confidence'], ensemble['tier']), ('AI', 90.0, 'fast'))
+        self.assertEqual(list(outputs[0]['individual_results']), ['Student'])
+        self.assertEqual(outputs[0]['skipped_models'], list(MODEL_NAMES))
+
+    def test_disabled_tier_is_a_client_error(self):
+        import app as app_module
+
+        client = app_module.app.test_client()
+        text = ' '.join(['tier'] * 60)
+
+        with patch.object(app_module.predictor, 'is_initialized', True):
+            single = client.post('/predict', json={'text': text, 'tier': 'fast'})
+            batch = client.post('/predict_batch', json={'texts': [text], 'tier': 'fast'})
+
+        self.assertEqual(single.status_code, 400)
+        self.assertIn("tier 'fast'", single.get_json()['error'])
+        self.assertEqual(batch.status_code, 400)
+
+    def test_fast_request_uses_fast_queue(self):
+        import app as app_module
+
+        client = app_module.app.test_client()
+        text = ' '.join(['tier'] * 60)
+        fast_batcher = MagicMock()
+        queued = Future()
+        queued.set_result({'ensemble': {'tier': 'fast'}})
+        fast_batcher.submit_many.return_value = [queued]
+
+        with patch.object(app_module.predictor, 'is_initialized', True), \
+                patch.object(app_module.predictor, 'tiers', ('full', 'fast')), \
+                patch.object(app_module, 'fast_batcher', fast_batcher), \
+                patch.dict(app_module.app.config, {'BATCH_WAIT_MS': 5}):
+            response = client.post('/predict', json={'text': text, 'tier': 'fast'})
+
+        self.assertEqual(response.status_code, 200)
+        fast_batcher.submit_many.assert_called_once_with([text])
+
+
+class TestSoftLabels(unittest.TestCase):
+
+    def test_mean_probability_and_majority(self):
+        from distillation import ensemble_soft_labels
+
+        predictor = MagicMock()
+        # Text 0: 3 of 5 models say HUMAN; text 1: all say AI
+        predictor._run_branches.return_value = {
+            'BERT': [(1, 0.9), (0, 0.8)],
+            'RoBERTa': [(1, 0.7), (0, 0.6)],
+            'DRF': [(1, 0.6), (0, 0.9)],
+            'GBM': [(0, 0.8), (0, 0.7)],
+            'GLM': [(0, 0.6), (0, 1.0)],
+        }
+
+        soft_labels, ensemble_labels = ensemble_soft_labels(predictor, ['a', 'b'], batch_size=2)
+
+        self.assertAlmostEqual(soft_labels[0], (0.9 + 0.7 + 0.6 + 0.2 + 0.4) / 5)
+        self.assertAlmostEqual(soft_labels[1], (0.2 + 0.4 + 0.1 + 0.3 + 0.0) / 5)
+        self.assertEqual(ensemble_labels, [1, 0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
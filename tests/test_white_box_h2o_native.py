@@ -0,0 +1,252 @@
+"""
+WHITE BOX TEST CASE 5: In-Process H2O Scoring Testing
+Test ID: WB-TC-005
+Risk Level: HIGH
+Test Type: Statement Coverage + Numerical Equivalence
+
+Tests:
+- h2o_native.NativeGLM: sigmoid(x . beta + intercept), threshold handling
+- h2o_native.NativeTreeEnsemble: tree walking for DRF (p0 average) and GBM (logit sum)
+- save / load_native_model round trip
+- bind_vocabulary: TF-IDF column reordering and missing feature check
+- CSR (sparse) input path
+- check_parity: native p0/p1 against H2O's p0/p1, tolerance; 'predict' labels must match
+- NativeTreeEnsemble batch walk: all trees and rows at once, same as walking one row at a time
+- NativeTreeEnsemble on CSR input: split values read from the non-zeros, rows never densified
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from h2o_native import (NativeGLM, NativeH2OModel, NativeTreeEnsemble, load_native_model, check_parity,
+                        parity_sample)
+
+
+def make_stump(feature, threshold, left_value, right_value):
+    """Tek split'li ağaç: feature < threshold ise sol yaprak"""
+    return {
+        'feature': np.array([feature, -1, -1]),
+        'threshold': np.array([threshold, np.nan, np.nan]),
+        'left': np.array([1, -1, -1]),
+        'right': np.array([2, -1, -1]),
+        'na_left': np.array([True, False, False]),
+        'value': np.array([np.nan, left_value, right_value]),
+    }
+
+
+class TestNativeH2OModels(unittest.TestCase):
+    """White Box Test Case 5: Native H2O evaluators"""
+
+    def test_glm_matches_closed_form(self):
+        glm = NativeGLM(['a', 'b'], threshold=0.5, coefficients=[2.0, -1.0], intercept=0.5)
+        X = np.array([[1.0, 0.0], [0.0, 3.0]])
+
+        predict, p0, p1 = glm.predict(X)
+
+        expected = 1.0 / (1.0 + np.exp(-np.array([2.5, -2.5])))
+        np.testing.assert_allclose(p1, expected)
+        np.testing.assert_allclose(p0, 1.0 - expected)
+        self.assertEqual(predict.tolist(), [1, 0])
+
+    def test_threshold_is_not_fixed_at_half(self):
+        """H2O 'predict' sütunu max-F1 eşiğini kullanır, 0.5'i değil"""
+        glm = NativeGLM(['a'], threshold=0.9, coefficients=[1.0], intercept=0.0)
+        predict, _, p1 = glm.predict(np.array([[1.0]]))
+
+        self.assertGreater(p1[0], 0.5)
+        self.assertEqual(predict[0], 0)
+
+    def test_drf_average_is_p0(self):
+        trees = [make_stump(0, 0.5, 0.8, 0.2), make_stump(1, 0.5, 0.6, 0.4)]
+        drf = NativeTreeEnsemble('drf', ['a', 'b'], 0.5, trees)
+
+        _, p0, p1 = drf.predict(np.array([[0.0, 0.0], [1.0, 1.0]]))
+
+        np.testing.assert_allclose(p0, [0.7, 0.3])
+        np.testing.assert_allclose(p1, [0.3, 0.7])
+
+    def test_gbm_sums_logits(self):
+        trees = [make_stump(0, 0.5, -1.0, 1.0), make_stump(0, 0.5, -0.5, 0.5)]
+        gbm = NativeTreeEnsemble('gbm', ['a'], 0.5, trees, init_f=0.25)
+
+        _, _, p1 = gbm.predict(np.array([[1.0], [0.0]]))
+
+        expected = 1.0 / (1.0 + np.exp(-np.array([1.75, -1.25])))
+        np.testing.assert_allclose(p1, expected)
+
+    def test_save_load_round_trip(self):
+        trees = [make_stump(0, 0.5, -1.0, 1.0), make_stump(1, 0.2, 0.3, -0.3)]
+        models = [
+            NativeTreeEnsemble('gbm', ['a', 'b'], 0.4, trees, init_f=0.1),
+            NativeGLM(['a', 'b'], 0.4, [0.5, 1.5], -0.2),
+        ]
+        X = np.array([[0.0, 0.0], [1.0, 0.1], [0.7, 0.9]])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, model in enumerate(models):
+                path = os.path.join(tmp, f'model_{i}.npz')
+                model.save(path)
+                loaded = load_native_model(path)
+
+                for original, restored in zip(model.predict(X), loaded.predict(X)):
+                    np.testing.assert_allclose(original, restored)
+
+    def test_base_class_needs_predict_p1(self):
+        with self.assertRaises(TypeError):
+            NativeH2OModel(['a'], 0.5)
+
+    def test_bind_vocabulary(self):
+        glm = NativeGLM(['b', 'a'], 0.5, [1.0, 0.0], 0.0)
+        glm.bind_vocabulary({'a': 0, 'b': 1, 'c': 2})
+
+        # Column 'b' is TF-IDF column 1
+        _, _, p1 = glm.predict(np.array([[0.0, 2.0, 5.0]]))
+        np.testing.assert_allclose(p1, [1.0 / (1.0 + np.exp(-2.0))])
+
+        with self.assertRaises(ValueError):
+            glm.bind_vocabulary({'a': 0})
+
+    def test_sparse_input_matches_dense(self):
+        """CSR girdi, dense girdi ile aynı sonucu vermeli"""
+        vocabulary = {'a': 2, 'b': 0, 'c': 1}
+        X_dense = np.array([[0.0, 0.0, 0.9], [0.4, 0.0, 0.0], [0.0, 0.3, 0.1]])
+        X_sparse = sp.csr_matrix(X_dense)
+
+        trees = [make_stump(0, 0.5, -1.0, 1.0), make_stump(1, 0.2, 0.3, -0.3)]
+        models = [
+            NativeTreeEnsemble('drf', ['a', 'b'], 0.5, [make_stump(0, 0.5, 0.9, 0.1)]),
+            NativeTreeEnsemble('gbm', ['a', 'b'], 0.5, trees),
+            NativeGLM(['a', 'b'], 0.5, [1.0, -2.0], 0.1),
+        ]
+
+        for model in models:
+            model.bind_vocabulary(vocabulary)
+            for dense, sparse in zip(model.predict(X_dense), model.predict(X_sparse)):
+                np.testing.assert_allclose(dense, sparse)
+
+        # Feature 'a' is TF-IDF column 2: only row 0 goes right in the DRF stump
+        _, p0, _ = models[0].predict(X_sparse)
+        np.testing.assert_allclose(p0, [0.1, 0.9, 0.9])
+
+
+class TestGLMParity(unittest.TestCase):
+    """Native p0/p1 against H2O's p0/p1 on TF-IDF shaped rows"""
+
+    def test_parity_sample_looks_like_tfidf(self):
+        X = parity_sample(500, n_rows=8, density=0.05)
+
+        self.assertEqual(X.format, 'csr')
+        self.assertTrue((X.data >= 0).all())
+        np.testing.assert_allclose(np.asarray(X.multiply(X).sum(axis=1)).ravel(), 1.0)
+
+    def test_check_parity(self):
+        import pandas as pd
+
+        glm = NativeGLM(['a', 'b'], 0.5, [2.0, -1.0], 0.1)
+        X = parity_sample(2, n_rows=6, density=0.5)
+        h2o_model = MagicMock()
+        predict, _, p1 = glm.predict(X)
+        frame = h2o_model.predict.return_value.as_data_frame
+
+        with patch.dict(sys.modules, {'h2o': MagicMock()}):
+            frame.return_value = pd.DataFrame({'predict': predict, 'p0': 1.0 - p1, 'p1': p1 + 1e-9})
+            self.assertLess(check_parity(glm, h2o_model, X), 1e-8)
+
+            frame.return_value = pd.DataFrame({'predict': predict, 'p0': 1.0 - p1 + 1e-3, 'p1': p1})
+            with self.assertRaises(ValueError):
+                check_parity(glm, h2o_model, X)
+
+    def test_check_parity_catches_a_wrong_threshold(self):
+        """p0/p1 aynı olsa da 'predict' etiketleri farklıysa (yanlış eşik) parity başarısız olmalı"""
+        import pandas as pd
+
+        glm = NativeGLM(['a', 'b'], 0.5, [2.0, -1.0], 0.1)
+        X = parity_sample(2, n_rows=6, density=0.5)
+        _, p0, p1 = glm.predict(X)
+        h2o_model = MagicMock()
+        h2o_model.predict.return_value.as_data_frame.return_value = pd.DataFrame(
+            {'predict': (p1 >= 1.1).astype(int), 'p0': p0, 'p1': p1})  # H2O: a threshold no row reaches
+
+        with patch.dict(sys.modules, {'h2o': MagicMock()}):
+            with self.assertRaisesRegex(ValueError, 'threshold 0.5'):
+                check_parity(glm, h2o_model, X)
+
+
+def make_random_tree(rng, n_features, depth):
+    """Full binary tree of the given depth with random splits and leaf values"""
+    n_inner = 2 ** depth - 1
+    n_nodes = 2 ** (depth + 1) - 1
+    nodes = np.arange(n_nodes)
+    inner = nodes < n_inner
+    return {
+        'feature': np.where(inner, rng.integers(0, n_features, n_nodes), -1),
+        'threshold': np.where(inner, rng.uniform(0.0, 0.3, n_nodes), np.nan),
+        'left': np.where(inner, 2 * nodes + 1, -1),
+        'right': np.where(inner, 2 * nodes + 2, -1),
+        'na_left': rng.random(n_nodes) < 0.5,
+        'value': np.where(inner, np.nan, rng.uniform(-1.0, 1.0, n_nodes)),
+    }
+
+
+def walk_tree(tree, row):
+    node = 0
+    while tree['left'][node] != -1:
+        value = row[tree['feature'][node]]
+        go_left = tree['na_left'][node] if np.isnan(value) else value < tree['threshold'][node]
+        node = tree['left'][node] if go_left else tree['right'][node]
+    return tree['value'][node]
+
+
+class TestVectorizedTrees(unittest.TestCase):
+    """Flat node table, every tree walked for every row at once"""
+
+    def test_batch_walk_matches_row_by_row(self):
+        rng = np.random.default_rng(7)
+        trees = [make_random_tree(rng, 40, depth) for depth in (1, 3, 5, 2, 4)]
+        X = parity_sample(40, n_rows=300, density=0.2, seed=3).toarray()
+        X[5, 3] = np.nan
+
+        gbm = NativeTreeEnsemble('gbm', [f'f{i}' for i in range(40)], 0.5, trees, init_f=0.1)
+        gbm.CHUNK_ROWS = 64  # several chunks
+
+        totals = np.array([sum(walk_tree(tree, row) for tree in trees) for row in X])
+        np.testing.assert_allclose(gbm.predict_p1(X), 1.0 / (1.0 + np.exp(-(totals + 0.1))))
+
+    def test_sparse_rows_are_never_densified(self):
+        """Ağaçlar CSR satırlarını yoğunlaştırmadan, sözlüğe bağlı sütunlardan okumalı"""
+        rng = np.random.default_rng(11)
+        names = [f'f{i}' for i in range(30)]
+        trees = [make_random_tree(rng, 30, depth) for depth in (2, 4, 6)]
+        drf = NativeTreeEnsemble('drf', names, 0.5, trees)
+        # TF-IDF vocabulary in another order, with columns no model uses
+        drf.bind_vocabulary({name: 2 * (29 - i) for i, name in enumerate(names)})
+
+        X = parity_sample(59, n_rows=40, density=0.3, seed=5)
+        X = sp.csr_matrix((np.concatenate([X.data, [0.1]]), np.concatenate([X.indices, [X.indices[0]]]),
+                           np.concatenate([X.indptr[:1], X.indptr[1:] + 1])), shape=X.shape)  # duplicate entry
+        dense = X.toarray()
+        expected = np.array([sum(walk_tree(tree, row[drf.feature_index]) for tree in trees) for row in dense])
+
+        with patch.object(sp.csr_matrix, 'toarray', side_effect=AssertionError('densified')):
+            p1 = drf.predict_p1(X)
+
+        np.testing.assert_allclose(p1, 1.0 - expected / len(trees))
+
+    def test_child_indices_are_global(self):
+        gbm = NativeTreeEnsemble('gbm', ['a', 'b'], 0.5,
+                                 [make_stump(0, 0.5, -1.0, 1.0), make_stump(1, 0.2, 0.3, -0.3)])
+
+        np.testing.assert_array_equal(gbm.tree_offsets, [0, 3, 6])
+        np.testing.assert_array_equal(gbm.nodes['left'], [1, -1, -1, 4, -1, -1])
+        np.testing.assert_array_equal(gbm.nodes['right'], [2, -1, -1, 5, -1, -1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+"""
+WHITE BOX TEST CASE 13: Length-Bucketed Batching Testing
+Test ID: WB-TC-013
+Risk Level: MEDIUM
+Test Type: Boundary Value Analysis
+
+Tests:
+- app._length_buckets: sorting by length, padding limit, bucket size limit
+- every index is scored exactly once
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+class TestLengthBuckets(unittest.TestCase):
+    """White Box Test Case 13: Length buckets"""
+
+    def test_similar_lengths_share_a_bucket(self):
+        from ensemble import _length_buckets
+
+        self.assertEqual(_length_buckets([100, 98, 102], 16, 0.25), [[1, 0, 2]])
+
+    def test_short_and_long_texts_are_split(self):
+        """Kısa metinler 512 token'a kadar doldurulmamalı"""
+        from ensemble import _length_buckets
+
+        lengths = [512, 40, 500, 45]
+        buckets = _length_buckets(lengths, 16, 0.25)
+
+        self.assertEqual(buckets, [[1, 3], [2, 0]])
+        for bucket in buckets:
+            padded = len(bucket) * max(lengths[i] for i in bucket)
+            self.assertLessEqual(padded, 1.25 * sum(lengths[i] for i in bucket))
+
+    def test_bucket_size_limit(self):
+        from ensemble import _length_buckets
+
+        buckets = _length_buckets([10] * 5, 2, 0.25)
+
+        self.assertEqual([len(bucket) for bucket in buckets], [2, 2, 1])
+
+    def test_every_index_once(self):
+        from ensemble import _length_buckets
+
+        lengths = [7, 300, 12, 512, 90, 91, 7, 260]
+        buckets = _length_buckets(lengths, 3, 0.1)
+
+        self.assertEqual(sorted(i for bucket in buckets for i in bucket), list(range(len(lengths))))
+        self.assertEqual(_length_buckets([], 16, 0.25), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
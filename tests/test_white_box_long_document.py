@@ -0,0 +1,55 @@
+"""
+WHITE BOX TEST CASE 8: Long-Document Window Planning Testing
+Test ID: WB-TC-008
+Risk Level: MEDIUM
+Test Type: Boundary Value Analysis
+
+Tests:
+- app._window_starts: single window, overlap, tail coverage, max_windows cap
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+class TestWindowStarts(unittest.TestCase):
+    """White Box Test Case 8: Sliding window offsets"""
+
+    def test_short_text_uses_one_window(self):
+        from ensemble import _window_starts
+
+        self.assertEqual(_window_starts(0, 510, 128, 8), [0])
+        self.assertEqual(_window_starts(510, 510, 128, 8), [0])
+
+    def test_windows_overlap_and_cover_tail(self):
+        from ensemble import _window_starts
+
+        starts = _window_starts(2000, 510, 128, 0)
+
+        self.assertEqual(starts[0], 0)
+        self.assertEqual(starts[-1] + 510, 2000, "Last window must end at the last token")
+        for previous, current in zip(starts, starts[1:]):
+            self.assertLessEqual(current - previous, 510 - 128, "Windows must overlap by at least 128 tokens")
+
+    def test_max_windows_cap(self):
+        from ensemble import _window_starts
+
+        starts = _window_starts(50000, 510, 128, 8)
+
+        self.assertEqual(len(starts), 8)
+        self.assertEqual(starts[0], 0)
+        self.assertEqual(starts[-1], 50000 - 510, "Capped windows still reach the end of the text")
+        self.assertEqual(starts, sorted(starts))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+"""
+WHITE BOX TEST CASE 15: Latency Metrics Testing
+Test ID: WB-TC-015
+Risk Level: LOW
+Test Type: Statement Coverage
+
+Tests:
+- metrics.Histogram: cumulative buckets, sum and count per label set
+- metrics.CallbackMetric: values read at scrape time, None leaves the metric out
+- /metrics endpoint: stage timings and request latency after a prediction
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from metrics import CallbackMetric, Histogram
+
+
+class TestMetrics(unittest.TestCase):
+    """White Box Test Case 15: Metrics"""
+
+    def test_histogram_buckets(self):
+        histogram = Histogram('test_seconds', 'Test', ('stage',), buckets=(0.1, 1.0))
+        histogram.observe(0.05, stage='a')
+        histogram.observe(0.1, stage='a')
+        histogram.observe(3.0, stage='a')
+
+        lines = histogram.collect()
+
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="1.0"} 2', lines)
+        self.assertIn('test_seconds_bucket{stage="a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_sum{stage="a"} 3.15', lines)
+        self.assertIn('test_seconds_count{stage="a"} 3', lines)
+
+    def test_callback_metric(self):
+        values = [7, None]
+        metric = CallbackMetric('test_depth', 'Test', lambda: values[0])
+
+        self.assertEqual(metric.collect()[-1], 'test_depth 7')
+        values[0] = None
+        self.assertEqual(metric.collect(), [])
+
+    def test_metrics_endpoint_after_prediction(self):
+        """Bir /predict çağrısından sonra aşama ve istek süreleri görünmeli"""
+        import app as app_module
+
+        client = app_module.app.test_client()
+        predictor = app_module.predictor
+
+        def fake_branch(texts, model_names):
+            return {name: [(1, 0.9)] * len(texts) for name in model_names}
+
+        text = ' '.join(['metrics'] * 60)
+        with patch.object(predictor, 'is_initialized', True), \
+                patch.object(predictor, '_predict_transformers', fake_branch), \
+                patch.object(predictor, '_predict_h2o', fake_branch), \
+                patch.dict(app_module.app.config, {'BATCH_WAIT_MS': 0}):
+            self.assertEqual(client.post('/predict', json={'text': text}).status_code, 200)
+            response = client.get('/metrics')
+
+        body = response.get_data(as_text=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('humanorai_stage_seconds_count{stage="ensemble",model=""}', body)
+        self.assertIn('humanorai_request_seconds_count{endpoint="predict"}', body)
+        self.assertIn('humanorai_batch_queue_depth 0', body)
+        self.assertIn('humanorai_process_resident_memory_bytes', body)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -10,7 +10,9 @@ Tests:
 - Line 44-52: RoBERTa model loading path
 - Line 57-64: TF-IDF pickle/joblib fallback
 - Line 66-79: H2O models loading
-- Line 82-88: Column names extraction
+- H2O input binding: TF-IDF column index per model column, fail fast on mismatch
+- Parallel artifact loading, per-artifact load times
+- /healthz and /readyz endpoints
 """
 
 import unittest
@@ -37,14 +39,14 @@ class TestModelInitializationCodePath(unittest.TestCase):
         self.torch_mock.device.return_value = 'cpu'
         self.torch_mock.cuda.is_available.return_value = False
 
-    @patch('app.h2o')
-    @patch('app.BertForSequenceClassification')
-    @patch('app.BertTokenizer')
-    @patch('app.RobertaForSequenceClassification')
-    @patch('app.RobertaTokenizer')
+    @patch('ensemble.h2o')
+    @patch('ensemble.BertForSequenceClassification')
+    @patch('ensemble.BertTokenizerFast')
+    @patch('ensemble.RobertaForSequenceClassification')
+    @patch('ensemble.RobertaTokenizerFast')
     @patch('builtins.open', new_callable=mock_open, read_data=b'tfidf_data')
     @patch('pickle.load')
-    @patch('app.torch')
+    @patch('ensemble.torch')
     def test_initialize_all_code_paths(self, mock_torch, mock_pickle,
                                        mock_file, mock_roberta_tok,
                                        mock_roberta_model, mock_bert_tok,
@@ -58,9 +60,9 @@ class TestModelInitializationCodePath(unittest.TestCase):
         - Line 44-52: RoBERTa loading path
         - Line 57-64: TF-IDF pickle/joblib fallback
         - Line 66-79: H2O models loading
-        - Line 82-88: Column names extraction
+        - H2O input binding: TF-IDF column index per model column, fail fast on mismatch
         """
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: Mock setup
         mock_torch.device.return_value = 'cpu'
@@ -84,12 +86,12 @@ class TestModelInitializationCodePath(unittest.TestCase):
 
         mock_h2o.init.return_value = None
 
-        # Mock H2O model with varimp
+        # Mock H2O model with its training columns
         mock_drf_model = MagicMock()
-        mock_varimp_df = MagicMock()
-        mock_varimp_df.tolist.return_value = ['col1', 'col2', 'col3']
-        mock_drf_model.varimp.return_value = {'variable': mock_varimp_df}
+        mock_drf_model._model_json = {'output': {'names': ['col1', 'col2', 'col3', 'Label'],
+                                                 'response_column_name': 'Label'}}
         mock_h2o.load_model.return_value = mock_drf_model
+        mock_pickle.return_value.vocabulary_ = {'col3': 0, 'col1': 1, 'col2': 2}
 
         predictor = HumanOrAIPredictor(models_dir='test_models')
 
@@ -105,6 +107,8 @@ class TestModelInitializationCodePath(unittest.TestCase):
         self.assertIn('DRF', predictor.models)     # Line 73 coverage
         self.assertIn('GBM', predictor.models)     # Line 76 coverage
         self.assertIn('GLM', predictor.models)     # Line 79 coverage
+        self.assertEqual(predictor.h2o_columns, ['col1', 'col2', 'col3'])
+        self.assertEqual(predictor.h2o_column_index.tolist(), [1, 2, 0])
 
         # Assert: Device selection (Line 25)
         self.assertEqual(predictor.device, 'cpu')
@@ -127,14 +131,14 @@ class TestModelInitializationCodePath(unittest.TestCase):
         print(f"   - H2O models loading path: OK")
         print(f"   - Early return on second call: OK")
 
-    @patch('app.h2o')
-    @patch('app.BertForSequenceClassification')
-    @patch('app.BertTokenizer')
-    @patch('app.RobertaForSequenceClassification')
-    @patch('app.RobertaTokenizer')
+    @patch('ensemble.h2o')
+    @patch('ensemble.BertForSequenceClassification')
+    @patch('ensemble.BertTokenizerFast')
+    @patch('ensemble.RobertaForSequenceClassification')
+    @patch('ensemble.RobertaTokenizerFast')
     @patch('builtins.open', new_callable=mock_open)
     @patch('pickle.load')
-    @patch('app.torch')
+    @patch('ensemble.torch')
     def test_tfidf_pickle_fallback_path(self, mock_torch, mock_pickle,
                                         mock_file, mock_roberta_tok,
                                         mock_roberta_model, mock_bert_tok,
@@ -142,7 +146,7 @@ class TestModelInitializationCodePath(unittest.TestCase):
         """
         Test Case 1.1: TF-IDF pickle failure -> joblib fallback (Line 60-64)
         """
-        from app import HumanOrAIPredictor
+        from ensemble import HumanOrAIPredictor
 
         # Arrange: Mock models
         mock_torch.device.return_value = 'cpu'
@@ -180,6 +184,108 @@ class TestModelInitializationCodePath(unittest.TestCase):
         mock_joblib_load.assert_called_once()
         print("\n[PASS] Pickle fallback path tested: joblib.load was called")
 
+    @patch('ensemble.h2o')
+    @patch('ensemble.BertForSequenceClassification')
+    @patch('ensemble.BertTokenizerFast')
+    @patch('ensemble.RobertaForSequenceClassification')
+    @patch('ensemble.RobertaTokenizerFast')
+    @patch('builtins.open', new_callable=mock_open, read_data=b'tfidf_data')
+    @patch('pickle.load')
+    @patch('ensemble.torch')
+    def test_parallel_load_records_load_times(self, mock_torch, mock_pickle,
+                                              mock_file, mock_roberta_tok,
+                                              mock_roberta_model, mock_bert_tok,
+                                              mock_bert_model, mock_h2o):
+        """
+        Test Case 1.2: Paralel yükleme tüm artifact'leri yüklemeli ve sürelerini kaydetmeli
+        """
+        from ensemble import HumanOrAIPredictor
+
+        mock_torch.device.return_value = 'cpu'
+        mock_pickle.return_value = MagicMock()
+        mock_h2o.load_model.return_value = MagicMock()
+
+        predictor = HumanOrAIPredictor(models_dir='test_models', parallel_load=True)
+        predictor.initialize()
+
+        self.assertTrue(predictor.is_initialized)
+        for artifact in ('BERT', 'RoBERTa', 'TF-IDF', 'H2O init', 'DRF', 'GBM', 'GLM', 'total'):
+            self.assertIn(artifact, predictor.load_times)
+        self.assertEqual(mock_h2o.load_model.call_count, 3)
+        print(f"\n[PASS] Load times: {predictor.load_times}")
+
+
+class TestReadinessEndpoints(unittest.TestCase):
+    """/healthz her zaman 200, /readyz modeller yüklenene kadar 503 döndürmeli"""
+
+    def test_readyz_follows_initialization(self):
+        import app as app_module
+
+        client = app_module.app.test_client()
+        predictor = app_module.predictor
+        was_initialized = predictor.is_initialized
+
+        try:
+            predictor.is_initialized = False
+            self.assertEqual(client.get('/healthz').status_code, 200)
+
+            response = client.get('/readyz')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.get_json()['status'], 'loading')
+
+            predictor.is_initialized = True
+            response = client.get('/readyz')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['status'], 'ready')
+        finally:
+            predictor.is_initialized = was_initialized
+
+
+def make_h2o_model(columns):
+    model = MagicMock()
+    model._model_json = {'output': {'names': columns + ['Label'], 'response_column_name': 'Label'}}
+    return model
+
+
+class TestH2OInputBinding(unittest.TestCase):
+    """Model sütunları yüklemede bir kez TF-IDF sütunlarına eşlenmeli"""
+
+    def make_predictor(self, columns_per_model, vocabulary):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(h2o_backend='cluster')
+        predictor.models = {name: make_h2o_model(columns) for name, columns in columns_per_model.items()}
+        predictor.tfidf_vectorizer = MagicMock(vocabulary_=vocabulary)
+        return predictor
+
+    def test_column_index_gathers_training_order(self):
+        import numpy as np
+        import scipy.sparse as sp
+
+        columns = ['zeta', 'alpha', 'mid']
+        predictor = self.make_predictor(dict.fromkeys(('DRF', 'GBM', 'GLM'), columns),
+                                        {'alpha': 0, 'mid': 1, 'zeta': 2, 'unused': 3})
+        predictor._bind_h2o_inputs()
+
+        tfidf = sp.csr_matrix(np.array([[0.1, 0.2, 0.3, 0.4]]))
+        self.assertEqual(tfidf[:, predictor.h2o_column_index].toarray().tolist(), [[0.3, 0.1, 0.2]])
+        self.assertEqual(predictor.h2o_columns, columns)
+
+    def test_missing_vocabulary_column_fails_fast(self):
+        predictor = self.make_predictor(dict.fromkeys(('DRF', 'GBM', 'GLM'), ['alpha', 'beta']), {'alpha': 0})
+
+        with self.assertRaises(ValueError) as ctx:
+            predictor._bind_h2o_inputs()
+        self.assertIn("'beta'", str(ctx.exception))
+
+    def test_model_with_other_columns_fails_fast(self):
+        predictor = self.make_predictor({'DRF': ['alpha'], 'GBM': ['alpha'], 'GLM': ['alpha', 'beta']},
+                                        {'alpha': 0, 'beta': 1})
+
+        with self.assertRaises(ValueError) as ctx:
+            predictor._bind_h2o_inputs()
+        self.assertIn('GLM', str(ctx.exception))
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,117 @@
+"""
+WHITE BOX TEST CASE 11: ONNX Runtime Transformer Backend Testing
+Test ID: WB-TC-011
+Risk Level: HIGH
+Test Type: Numerical Equivalence
+
+Tests:
+- onnx_backend.export_onnx: fused attention, logits match PyTorch for BERT and RoBERTa
+- HumanOrAIPredictor: backend validation and ONNX cache version
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import importlib.util
+import json
+import subprocess
+import sys
+import os
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+# torch/transformers are mocked in this process, so the parity check runs in a
+# fresh interpreter on tiny randomly initialised BERT and RoBERTa models
+PARITY_SCRIPT = r'''
+import json, os, string, sys
+from transformers import (BertConfig, BertForSequenceClassification, BertTokenizer,
+                          RobertaConfig, RobertaForSequenceClassification)
+from onnx_backend import check_parity, export_onnx
+
+tmp = sys.argv[1]
+vocab = os.path.join(tmp, 'vocab.txt')
+with open(vocab, 'w') as f:
+    f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(string.ascii_lowercase)))
+
+sizes = dict(hidden_size=32, num_hidden_layers=2, num_attention_heads=2, intermediate_size=64, num_labels=2)
+models = {
+    'BERT': (BertForSequenceClassification(BertConfig(vocab_size=31, **sizes)), {}),
+    'RoBERTa': (RobertaForSequenceClassification(RobertaConfig(vocab_size=31, pad_token_id=0, **sizes)),
+                {'model_input_names': ['input_ids', 'attention_mask']}),
+}
+report = {}
+for name, (model, tokenizer_kwargs) in models.items():
+    model_dir = os.path.join(tmp, name)
+    model.save_pretrained(model_dir)
+    BertTokenizer(vocab, **tokenizer_kwargs).save_pretrained(model_dir)
+    onnx_path = os.path.join(tmp, 'onnx', name + '.onnx')
+    fused = export_onnx(model_dir, onnx_path)
+    report[name] = dict(check_parity(model_dir, onnx_path), attention=fused.get('Attention', 0))
+print(json.dumps(report))
+'''
+
+
+@unittest.skipUnless(importlib.util.find_spec('onnxruntime') and importlib.util.find_spec('onnx'),
+                     'onnxruntime not installed')
+class TestOnnxParity(unittest.TestCase):
+    """White Box Test Case 11: ONNX export matches PyTorch logits"""
+
+    def test_logits_match_pytorch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            completed = subprocess.run(
+                [sys.executable, '-c', PARITY_SCRIPT, tmp],
+                cwd=ROOT, capture_output=True, text=True, timeout=600
+            )
+        self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        for model_name in ('BERT', 'RoBERTa'):
+            self.assertLess(report[model_name]['max_abs_logit_diff'], 1e-4, model_name)
+            self.assertEqual(report[model_name]['label_agreement'], 1.0, model_name)
+            self.assertGreater(report[model_name]['attention'], 0, f"{model_name}: attention was not fused")
+
+
+class TestOnnxBackendSelection(unittest.TestCase):
+    """White Box Test Case 11: transformer_backend switch"""
+
+    def test_unknown_backend_rejected(self):
+        from ensemble import HumanOrAIPredictor
+
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(transformer_backend='tensorrt')
+        with self.assertRaises(ValueError):
+            HumanOrAIPredictor(transformer_backend='onnx', quantize=True)
+
+    @patch('ensemble.OnnxSequenceClassifier')
+    @patch('ensemble.os.path.exists', return_value=True)
+    def test_onnx_backend_skips_pytorch_model(self, mock_exists, mock_session):
+        """ONNX modunda PyTorch modeli yüklenmemeli, tokenizer aynı kalmalı"""
+        from ensemble import HumanOrAIPredictor
+
+        model_class, tokenizer_class = MagicMock(), MagicMock()
+        predictor = HumanOrAIPredictor(transformer_backend='onnx')
+        predictor._load_transformer('BERT', model_class, tokenizer_class, 'bert_model')
+
+        model_class.from_pretrained.assert_not_called()
+        self.assertIs(predictor.models['BERT']['model'], mock_session.return_value)
+        self.assertIs(predictor.models['BERT']['tokenizer'], tokenizer_class.from_pretrained.return_value)
+        mock_session.assert_called_once_with(os.path.join('models', 'onnx', 'bert_model.onnx'), threads=None)
+
+    @patch('ensemble.artifact_fingerprint', return_value='abc')
+    def test_cache_version_includes_backend(self, mock_fingerprint):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(transformer_backend='onnx')
+        predictor._compute_model_versions()
+
+        self.assertEqual(predictor.model_versions['BERT'], 'abc-onnx')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
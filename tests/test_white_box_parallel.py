@@ -0,0 +1,76 @@
+"""
+WHITE BOX TEST CASE 6: Parallel Branch Execution Testing
+Test ID: WB-TC-006
+Risk Level: MEDIUM
+Test Type: Concurrency Testing
+
+Tests:
+- HumanOrAIPredictor._run_branches: transformer and H2O branches overlap in parallel mode
+- predict_all result shape is unchanged in parallel mode
+"""
+
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+class TestParallelBranches(unittest.TestCase):
+    """White Box Test Case 6: predict_all parallel mode"""
+
+    def test_branches_run_concurrently(self):
+        """Transformer branch, H2O branch bitmeden tamamlanabilmeli (eşzamanlı çalışma)"""
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(parallel=True)
+        h2o_started = threading.Event()
+        transformers_done = threading.Event()
+
+        def transformer_branch(texts, model_names):
+            # Blocks until the H2O branch has started: deadlocks if run sequentially
+            self.assertTrue(h2o_started.wait(timeout=5), "H2O branch did not start concurrently")
+            transformers_done.set()
+            return {'BERT': [(1, 0.9)], 'RoBERTa': [(1, 0.8)]}
+
+        def h2o_branch(texts, model_names):
+            h2o_started.set()
+            self.assertTrue(transformers_done.wait(timeout=5))
+            return {'DRF': [(0, 0.7)], 'GBM': [(1, 0.6)], 'GLM': [(1, 0.55)]}
+
+        predictor._predict_transformers = transformer_branch
+        predictor._predict_h2o = h2o_branch
+
+        result = predictor.predict_all("parallel text")
+
+        self.assertEqual(list(result['individual_results']),
+                         ['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'])
+        self.assertEqual(result['ensemble']['vote_count'], 4)
+        self.assertEqual(result['ensemble']['label'], 'HUMAN')
+
+    def test_sequential_mode_is_default(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor()
+        order = []
+        predictor._predict_transformers = lambda texts, model_names: order.append('transformers') or {
+            'BERT': [(0, 0.9)], 'RoBERTa': [(0, 0.9)]}
+        predictor._predict_h2o = lambda texts, model_names: order.append('h2o') or {
+            'DRF': [(0, 0.9)], 'GBM': [(0, 0.9)], 'GLM': [(0, 0.9)]}
+
+        result = predictor.predict_all("sequential text")
+
+        self.assertEqual(order, ['transformers', 'h2o'])
+        self.assertIsNone(predictor._executor)
+        self.assertEqual(result['ensemble']['label'], 'AI')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,136 @@
+"""
+WHITE BOX TEST CASE 7: Prediction Cache Testing
+Test ID: WB-TC-007
+Risk Level: MEDIUM
+Test Type: Statement Coverage + Decision Coverage
+
+Tests:
+- prediction_cache.PredictionCache: LRU eviction, TTL expiry, hit/miss counters
+- SQLite disk tier: results survive a new cache instance, bulk trim keeps the newest rows,
+  a disk hit keeps its age (TTL counted from the original put)
+- HumanOrAIPredictor._run_branches: partial hits only run the missing models
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from prediction_cache import PredictionCache, SQLiteCacheStore, text_hash
+
+
+class TestPredictionCache(unittest.TestCase):
+    """White Box Test Case 7: PredictionCache"""
+
+    def test_lru_eviction(self):
+        cache = PredictionCache(max_entries=2, ttl_seconds=0)
+        cache.put('a', (1, 0.9))
+        cache.put('b', (0, 0.8))
+        cache.get('a')              # 'a' is now most recently used
+        cache.put('c', (1, 0.7))    # evicts 'b'
+
+        self.assertEqual(cache.get('a'), (1, 0.9))
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), (1, 0.7))
+
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 2)
+
+    @patch('prediction_cache.time.monotonic')
+    def test_ttl_expiry(self, mock_monotonic):
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        mock_monotonic.return_value = 1000.0
+        cache.put('a', (1, 0.9))
+
+        mock_monotonic.return_value = 1059.0
+        self.assertEqual(cache.get('a'), (1, 0.9))
+
+        mock_monotonic.return_value = 1061.0
+        self.assertIsNone(cache.get('a'))
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.sqlite')
+            PredictionCache(max_entries=10, disk_path=path).put('a', (0, 0.75))
+
+            # New instance = restarted process: memory tier is empty
+            cache = PredictionCache(max_entries=10, disk_path=path)
+            self.assertEqual(cache.get('a'), (0, 0.75))
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_disk_tier_trims_in_bulk(self):
+        """Fazla satırlar her put'ta değil, TRIM_INTERVAL put'ta bir silinir"""
+        with tempfile.TemporaryDirectory() as tmp, patch.object(SQLiteCacheStore, 'TRIM_INTERVAL', 4):
+            store = SQLiteCacheStore(os.path.join(tmp, 'cache.sqlite'), ttl_seconds=0, max_entries=2)
+            count = lambda: store._connection().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+            for key in 'abc':
+                store.put(key, (1, 0.9))
+            self.assertEqual(count(), 3)
+
+            store.put('a', (0, 0.6))  # replaced: 'a' is now the newest row
+            self.assertEqual(count(), 2)
+            self.assertIsNone(store.get('b'))
+            self.assertEqual(store.get('c')[0], (1, 0.9))
+            self.assertEqual(store.get('a')[0], (0, 0.6))
+
+    def test_disk_hit_keeps_its_age(self):
+        """Diskten gelen kayıt bellekte TTL'i baştan başlatmamalı"""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch('prediction_cache.time.time') as wall, \
+                patch('prediction_cache.time.monotonic') as mono:
+            path = os.path.join(tmp, 'cache.sqlite')
+            wall.return_value, mono.return_value = 10000.0, 500.0
+            PredictionCache(max_entries=10, ttl_seconds=60, disk_path=path).put('a', (1, 0.9))
+
+            # Another worker reads it 50 s later: 10 s of its lifetime are left
+            wall.return_value, mono.return_value = 10050.0, 700.0
+            cache = PredictionCache(max_entries=10, ttl_seconds=60, disk_path=path)
+            self.assertEqual(cache.get('a'), (1, 0.9))
+
+            wall.return_value, mono.return_value = 10059.0, 709.0
+            self.assertEqual(cache.get('a'), (1, 0.9))
+            wall.return_value, mono.return_value = 10061.0, 711.0
+            self.assertIsNone(cache.get('a'))
+
+    def test_partial_hit_runs_only_missing_models(self):
+        """Önbellekte BERT sonucu varsa yalnızca diğer modeller çalışmalı"""
+        from ensemble import HumanOrAIPredictor
+
+        cache = PredictionCache(max_entries=100)
+        predictor = HumanOrAIPredictor(cache=cache)
+        predictor.model_versions = {'BERT': 'v1'}
+
+        text = "cached essay text"
+        cache.put(PredictionCache.make_key(text_hash(text), 'BERT', 'v1'), (1, 0.95))
+
+        predictor._predict_transformers = MagicMock(return_value={'RoBERTa': [(1, 0.9)]})
+        predictor._predict_h2o = MagicMock(return_value={
+            'DRF': [(1, 0.8)], 'GBM': [(0, 0.7)], 'GLM': [(1, 0.6)]})
+
+        result = predictor.predict_all(text)
+
+        predictor._predict_transformers.assert_called_once_with([text], ('RoBERTa',))
+        self.assertEqual(result['individual_results']['BERT']['confidence'], 95.0)
+        self.assertEqual(result['ensemble']['vote_count'], 4)
+
+        # Second call: everything comes from the cache
+        predictor._predict_transformers.reset_mock()
+        predictor._predict_h2o.reset_mock()
+        self.assertEqual(predictor.predict_all(text), result)
+        predictor._predict_transformers.assert_not_called()
+        predictor._predict_h2o.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+"""
+WHITE BOX TEST CASE 17: Pre-Fork Serving Testing
+Test ID: WB-TC-017
+Risk Level: HIGH
+Test Type: Statement Coverage + Numerical Equivalence
+
+Tests:
+- prefork.mmap_model_weights: parameters backed by the safetensors file, same outputs
+- app.prepare_prefork / app.after_fork: load once, freeze the heap, reset per-worker state
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import importlib.util
+import json
+import subprocess
+import sys
+import os
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+# torch is mocked in this process, so the mmap check runs in a fresh interpreter
+MMAP_SCRIPT = r'''
+import json, os, sys
+import torch
+from safetensors.torch import save_file
+from prefork import mmap_model_weights
+
+torch.manual_seed(0)
+model = torch.nn.Sequential(torch.nn.Linear(8, 4), torch.nn.Linear(4, 2)).eval()
+save_file(model.state_dict(), os.path.join(sys.argv[1], 'model.safetensors'))
+x = torch.randn(3, 8)
+with torch.no_grad():
+    before = model(x)
+
+mapped = mmap_model_weights(model, sys.argv[1])
+with torch.no_grad():
+    after = model(x)
+
+child = os.fork()
+if child == 0:
+    with torch.no_grad():
+        os._exit(0 if torch.equal(model(x), before) else 1)
+_, status = os.waitpid(child, 0)
+
+print(json.dumps({
+    'mapped': mapped,
+    'equal': torch.equal(before, after),
+    'child_equal': status == 0,
+    'missing_file': mmap_model_weights(model, os.path.join(sys.argv[1], 'missing')),
+}))
+'''
+
+
+@unittest.skipUnless(importlib.util.find_spec('safetensors') and hasattr(os, 'fork'),
+                     'safetensors or fork not available')
+class TestMmapWeights(unittest.TestCase):
+    """White Box Test Case 17: mmapped safetensors weights"""
+
+    def test_mmapped_weights_match(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            completed = subprocess.run(
+                [sys.executable, '-c', MMAP_SCRIPT, tmp],
+                cwd=ROOT, capture_output=True, text=True, timeout=300
+            )
+        self.assertEqual(completed.returncode, 0, completed.stderr[-2000:])
+        report = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        self.assertEqual(report['mapped'], 4)
+        self.assertTrue(report['equal'])
+        self.assertTrue(report['child_equal'], "Forked worker saw different weights")
+        self.assertEqual(report['missing_file'], 0)
+
+
+class TestPreforkHooks(unittest.TestCase):
+    """Master yükler ve heap'i dondurur; worker kendi durumunu sıfırlar"""
+
+    @patch('app.gc')
+    def test_prepare_prefork(self, mock_gc):
+        import app as app_module
+
+        with patch.object(app_module.predictor, 'initialize') as mock_initialize:
+            app_module.prepare_prefork()
+
+        mock_initialize.assert_called_once()
+        mock_gc.freeze.assert_called_once()
+
+    @patch('app.torch')
+    def test_after_fork(self, mock_torch):
+        import app as app_module
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(h2o_backend='native')
+        predictor.is_initialized = True
+        predictor._executor = MagicMock()
+        cache = MagicMock()
+
+        with patch.object(app_module, 'predictor', predictor), \
+                patch.object(app_module, 'prediction_cache', cache), \
+                patch('app.os.cpu_count', return_value=8):
+            app_module.after_fork(workers=4)
+
+        mock_torch.set_num_threads.assert_called_once_with(2)
+        self.assertIsNone(predictor._executor)
+        cache.after_fork.assert_called_once()
+
+    @patch('ensemble.h2o')
+    def test_after_fork_reconnects_h2o_cluster(self, mock_h2o):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(h2o_backend='cluster')
+        predictor.is_initialized = True
+        mock_h2o.connection.return_value.base_url = 'http://localhost:54321'
+
+        predictor.after_fork()
+
+        mock_h2o.connect.assert_called_once_with(url='http://localhost:54321', verbose=False)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+"""
+WHITE BOX TEST CASE 20: Shared Preprocessing Testing
+Test ID: WB-TC-020
+Risk Level: HIGH
+Test Type: Statement Coverage + Equivalence
+
+Tests:
+- preprocessing.clean_text: same output as the training notebook's regex steps
+- TextPreprocessor: lemma table lookup, memoized WordNet fallback, no-nltk fallback
+- preprocess / preprocess_batch: lemmatize(clean_text(text)) for one text and a batch
+- lemma table save / load
+- HumanOrAIPredictor._tfidf: the vectorizer receives preprocessed texts
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import re
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from preprocessing import LEMMA_TABLE_FILE, TextPreprocessor, clean_text
+
+SAMPLES = [
+    "Visit https://example.com/a?b=1 or www.test.org NOW!!",
+    "<p>The <b>cats</b> were running</p>\n\n  across   2 fields.",
+    "Tabs\tand non-breaking spaces, İstanbul and café",
+    "",
+    "   ",
+]
+
+
+def notebook_clean_text(text):
+    """ModelEgitim.py'deki orijinal clean_text"""
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'<.*?>', '', text)
+    text = re.sub(r'[^a-z\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+
+class TestPreprocessing(unittest.TestCase):
+    """White Box Test Case 20: Training-equivalent preprocessing"""
+
+    def test_clean_text_matches_notebook(self):
+        for text in SAMPLES:
+            self.assertEqual(clean_text(text), notebook_clean_text(text))
+
+    def test_preprocess_is_lemmatize_of_clean_text(self):
+        preprocessor = TextPreprocessor({'cats': 'cat', 'were': 'were', 'fields': 'field'},
+                                        wordnet_fallback=False)
+
+        expected = [preprocessor.lemmatize(notebook_clean_text(text)) for text in SAMPLES]
+
+        self.assertEqual([preprocessor.preprocess(text) for text in SAMPLES], expected)
+        self.assertEqual(preprocessor.preprocess_batch(SAMPLES), expected)
+        self.assertEqual(expected[1], 'the cat were running across field')
+
+    def test_wordnet_fallback_is_memoized(self):
+        """Tabloda olmayan kelime WordNet'e bir kez sorulmalı"""
+        wordnet = MagicMock(side_effect=lambda word: word.rstrip('s'))
+        preprocessor = TextPreprocessor({'dogs': 'dog'})
+
+        with patch('preprocessing._wordnet_lemmatize', return_value=wordnet):
+            first = preprocessor.preprocess_batch(['dogs and birds', 'birds birds'])
+
+        self.assertEqual(first, ['dog and bird', 'bird bird'])
+        self.assertEqual(sorted(call.args[0] for call in wordnet.call_args_list), ['and', 'birds'])
+        self.assertEqual(preprocessor.lemmas['birds'], 'bird')
+
+    def test_without_wordnet_unknown_words_are_kept(self):
+        preprocessor = TextPreprocessor({'dogs': 'dog'})
+
+        with patch('preprocessing._wordnet_lemmatize', return_value=None):
+            self.assertEqual(preprocessor.preprocess('Dogs and birds'), 'dog and birds')
+        self.assertNotIn('birds', preprocessor.lemmas)
+
+    def test_table_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            TextPreprocessor({'cats': 'cat'}).save_table(os.path.join(tmp, LEMMA_TABLE_FILE))
+
+            self.assertEqual(TextPreprocessor.load(tmp).lemmas, {'cats': 'cat'})
+            self.assertEqual(TextPreprocessor.load(os.path.join(tmp, 'missing')).lemmas, {})
+
+
+class TestServingPreprocessing(unittest.TestCase):
+
+    def test_vectorizer_gets_preprocessed_texts(self):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor()
+        predictor.preprocessor = TextPreprocessor({'cats': 'cat'}, wordnet_fallback=False)
+        predictor.tfidf_vectorizer = MagicMock()
+
+        predictor._tfidf(['<b>Cats</b> at https://x.io', 'Two cats!'])
+
+        predictor.tfidf_vectorizer.transform.assert_called_once_with(['cat at', 'two cat'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
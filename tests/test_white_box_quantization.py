@@ -0,0 +1,65 @@
+"""
+WHITE BOX TEST CASE 10: INT8 Quantized Inference Mode Testing
+Test ID: WB-TC-010
+Risk Level: MEDIUM
+Test Type: Statement Coverage
+
+Tests:
+- HumanOrAIPredictor._load_transformer: quantize_transformer applied only when enabled
+- _compute_model_versions: quantized models get their own cache version
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+
+class TestQuantizedMode(unittest.TestCase):
+    """White Box Test Case 10: Dynamic INT8 quantization"""
+
+    @patch('ensemble.quantize_transformer')
+    def test_quantize_wraps_loaded_model(self, mock_quantize):
+        """quantize=True ise yüklenen model quantize edilmiş haliyle saklanmalı"""
+        from ensemble import HumanOrAIPredictor
+
+        model_class, tokenizer_class = MagicMock(), MagicMock()
+        predictor = HumanOrAIPredictor(quantize=True)
+        predictor._load_transformer('BERT', model_class, tokenizer_class, 'bert_model')
+
+        loaded = model_class.from_pretrained.return_value
+        mock_quantize.assert_called_once_with(loaded)
+        self.assertIs(predictor.models['BERT']['model'], mock_quantize.return_value)
+
+    @patch('ensemble.quantize_transformer')
+    def test_fp32_is_default(self, mock_quantize):
+        from ensemble import HumanOrAIPredictor
+
+        model_class = MagicMock()
+        predictor = HumanOrAIPredictor()
+        predictor._load_transformer('BERT', model_class, MagicMock(), 'bert_model')
+
+        mock_quantize.assert_not_called()
+        self.assertIs(predictor.models['BERT']['model'], model_class.from_pretrained.return_value)
+
+    @patch('ensemble.artifact_fingerprint', return_value='abc')
+    def test_cache_version_includes_int8(self, mock_fingerprint):
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor(quantize=True)
+        predictor._compute_model_versions()
+
+        self.assertEqual(predictor.model_versions['BERT'], 'abc-int8')
+        self.assertEqual(predictor.model_versions['RoBERTa'], 'abc-int8')
+        self.assertEqual(predictor.model_versions['GLM'], 'abc-abc-abc')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,270 @@
+"""
+WHITE BOX TEST CASE 22: Single-Flight Request Coalescing Testing
+Test ID: WB-TC-022
+Risk Level: HIGH
+Test Type: Statement Coverage + Concurrency
+
+Tests:
+- SingleFlight.submit_many: same key in flight -> one computation, shared result
+- duplicate texts inside one batch, new computation after completion
+- start failure (QueueFullError) and per-caller cancellation
+- FileLock: a forked worker on the same lock_dir waits for the leader of the same key only,
+  unrelated keys never wait, each key is unlocked as soon as its result is ready,
+  the wait ends with TimeoutError at the request deadline
+- /predict: concurrent identical requests run the models once
+- /predict_stream: concurrent identical streams run each stage once
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+from concurrent.futures import Future
+import sys
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from batching import QueueFullError
+from singleflight import SingleFlight
+
+
+class Starter:
+    """start_many stand-in: records the started items, futures resolved by the test"""
+
+    def __init__(self):
+        self.calls = []
+        self.futures = []
+
+    def __call__(self, items):
+        self.calls.append(list(items))
+        futures = [Future() for _ in items]
+        self.futures.extend(futures)
+        return futures
+
+
+class TestSingleFlight(unittest.TestCase):
+    """White Box Test Case 22: Single-flight coalescing"""
+
+    def test_identical_keys_share_one_computation(self):
+        flight, start = SingleFlight(), Starter()
+
+        first = flight.submit_many(['k'], ['text'], start)[0]
+        second = flight.submit_many(['k'], ['text'], start)[0]
+        start.futures[0].set_result({'label': 'AI'})
+
+        self.assertEqual(start.calls, [['text']])
+        self.assertEqual(first.result(timeout=1), {'label': 'AI'})
+        self.assertEqual(second.result(timeout=1), {'label': 'AI'})
+        self.assertEqual(flight.coalesced, 1)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_duplicates_in_one_batch_and_fresh_run_after_completion(self):
+        """Aynı batch içindeki tekrarlar tek sefer, bitmiş anahtar yeniden hesaplanır"""
+        flight, start = SingleFlight(), Starter()
+
+        futures = flight.submit_many(['a', 'b', 'a'], ['A', 'B', 'A'], start)
+        for future, result in zip(start.futures, ('ra', 'rb')):
+            future.set_result(result)
+        flight.submit_many(['a'], ['A'], start)
+
+        self.assertEqual([f.result(timeout=1) for f in futures], ['ra', 'rb', 'ra'])
+        self.assertEqual(start.calls, [['A', 'B'], ['A']])
+
+    def test_start_failure_is_raised_and_forgotten(self):
+        flight = SingleFlight()
+
+        with self.assertRaises(QueueFullError):
+            flight.submit_many(['k'], ['text'], MagicMock(side_effect=QueueFullError('full')))
+
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_cancel_drops_only_that_caller(self):
+        flight, start = SingleFlight(), Starter()
+        first = flight.submit_many(['k'], ['text'], start)[0]
+        second = flight.submit_many(['k'], ['text'], start)[0]
+
+        first.cancel()
+        self.assertFalse(start.futures[0].cancelled())
+
+        second.cancel()
+        self.assertTrue(start.futures[0].cancelled())
+        self.assertEqual(flight.in_flight(), 0)
+
+
+def other_worker(lock_dir, keys, started):
+    """Runs in a forked process: a second worker submitting keys on the same lock_dir"""
+    flight, start = SingleFlight(lock_dir, lock_timeout=5), Starter()
+    flight.submit_many(keys, keys, start)
+    started.put(len(start.calls[0]))
+    for future in start.futures:
+        future.set_result('done')
+
+
+def leading_worker(lock_dir, key, leading, release):
+    """Runs in a forked process: a worker leading key until release is set"""
+    flight, start = SingleFlight(lock_dir), Starter()
+    flight.submit_many([key], [key], start)
+    leading.set()
+    release.wait(5)
+    start.futures[0].set_result('done')
+
+
+@unittest.skipUnless(hasattr(os, 'fork'), 'record locks need a POSIX system')
+class TestCrossWorkerLock(unittest.TestCase):
+    """Kilitler süreç başınadır: ikinci işçi ayrı bir süreçte (fork) çalışır"""
+
+    def setUp(self):
+        self.lock_dir = tempfile.mkdtemp()
+        self.context = multiprocessing.get_context('fork')
+        self.started = self.context.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.lock_dir, ignore_errors=True)
+
+    def run_other_worker(self, keys):
+        worker = self.context.Process(target=other_worker, args=(self.lock_dir, keys, self.started))
+        worker.start()
+        self.addCleanup(worker.join, 5)
+        return worker
+
+    def test_other_worker_waits_for_the_leader(self):
+        flight, start = SingleFlight(self.lock_dir), Starter()
+        flight.submit_many(['k'], ['k'], start)
+
+        self.run_other_worker(['k'])
+        with self.assertRaises(queue.Empty):
+            self.started.get(timeout=0.3)  # blocked on the lock
+
+        start.futures[0].set_result('done')
+        self.assertEqual(self.started.get(timeout=5), 1)
+
+    def test_unrelated_keys_do_not_wait(self):
+        """Farklı metinler, kilit tutulurken bile beklemeden çalışmalı"""
+        flight, start = SingleFlight(self.lock_dir), Starter()
+        flight.submit_many([f'a{i}' for i in range(64)], [f'a{i}' for i in range(64)], start)
+
+        self.run_other_worker([f'b{i}' for i in range(64)])
+        self.assertEqual(self.started.get(timeout=2), 64)
+        for future in start.futures:
+            future.set_result('done')
+
+    def test_lock_wait_ends_at_the_request_deadline(self):
+        """Başka worker'ın kilidi, isteğin kendi süresinden uzun beklenmemeli"""
+        leading, release = self.context.Event(), self.context.Event()
+        worker = self.context.Process(target=leading_worker, args=(self.lock_dir, 'k', leading, release))
+        worker.start()
+        self.addCleanup(worker.join, 5)
+        self.addCleanup(release.set)
+        self.assertTrue(leading.wait(5))
+
+        flight, start = SingleFlight(self.lock_dir, lock_timeout=60), Starter()
+        began = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            flight.submit_many(['k', 'other'], ['k', 'other'], start, deadline=began + 0.2)
+
+        self.assertLess(time.monotonic() - began, 1)
+        self.assertEqual(start.calls, [])
+        self.assertEqual(flight.in_flight(), 0)
+        # The lock taken for 'other' was given back
+        self.assertEqual(flight.file_lock.acquire_all(['other'], deadline=time.monotonic()), {'other'})
+
+    def test_lock_released_per_key(self):
+        flight, start = SingleFlight(self.lock_dir), Starter()
+        flight.submit_many(['k', 'slow'], ['k', 'slow'], start)
+
+        start.futures[0].set_result('done')  # 'slow' is still running here
+        self.run_other_worker(['k'])
+        self.assertEqual(self.started.get(timeout=2), 1)
+        start.futures[1].set_result('done')
+
+
+class TestPredictCoalescing(unittest.TestCase):
+
+    def test_concurrent_identical_requests_run_once(self):
+        import app as app_module
+
+        client = app_module.app.test_client()
+        text = ' '.join(['viral'] * 60)
+        release = threading.Event()
+        calls = []
+
+        def slow_batch(texts, tier=None):
+            calls.append(list(texts))
+            release.wait(5)
+            return [{'ensemble': {'label': 'AI'}} for _ in texts]
+
+        responses = []
+
+        def post():
+            responses.append(client.post('/predict', json={'text': text}))
+
+        with patch.object(app_module.predictor, 'is_initialized', True), \
+                patch.object(app_module.predictor, 'predict_all_batch', side_effect=slow_batch), \
+                patch.object(app_module, 'single_flight', SingleFlight()), \
+                patch.dict(app_module.app.config, {'BATCH_WAIT_MS': 0}):
+            threads = [threading.Thread(target=post) for _ in range(3)]
+            threads[0].start()
+            time.sleep(0.1)  # the first request is now scoring
+            for thread in threads[1:]:
+                thread.start()
+            time.sleep(0.1)
+            release.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+            self.assertEqual(app_module.single_flight.coalesced, 2)
+
+        self.assertEqual(calls, [[text]])
+        self.assertEqual([response.status_code for response in responses], [200] * 3)
+
+    def test_concurrent_identical_streams_run_each_stage_once(self):
+        """Aynı metnin eşzamanlı akışları her aşamayı bir kez çalıştırmalı"""
+        import app as app_module
+        from ensemble import HumanOrAIPredictor
+
+        predictor = HumanOrAIPredictor()
+        predictor.is_initialized = True
+        calls = []
+
+        def slow_branch(texts, model_names):
+            calls.append(tuple(model_names))
+            time.sleep(0.1)
+            return {name: [(1, 0.9)] * len(texts) for name in model_names}
+
+        predictor._predict_h2o = predictor._predict_transformers = slow_branch
+        client = app_module.app.test_client()
+        text = ' '.join(['viral'] * 60)
+        bodies = []
+
+        def stream():
+            response = client.post('/predict_stream', json={'text': text})
+            bodies.append(response.get_data(as_text=True))
+            response.close()
+
+        with patch.object(app_module, 'predictor', predictor), \
+                patch.object(app_module, 'single_flight', SingleFlight()):
+            threads = [threading.Thread(target=stream) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+            self.assertGreater(app_module.single_flight.coalesced, 0)
+
+        self.assertEqual(sorted(calls), sorted([('DRF', 'GBM', 'GLM'), ('BERT',), ('RoBERTa',)]))
+        self.assertEqual(len(bodies), 3)
+        self.assertTrue(all('event: ensemble' in body for body in bodies))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
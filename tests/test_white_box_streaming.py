@@ -0,0 +1,258 @@
+"""
+WHITE BOX TEST CASE 18: Streaming Prediction Testing
+Test ID: WB-TC-018
+Risk Level: MEDIUM
+Test Type: Statement Coverage
+
+Tests:
+- HumanOrAIPredictor.iter_predictions: cheapest models first, ensemble last, early exit
+- /predict_stream endpoint: server-sent event order, validation, error event
+- /predict_stream load shedding: every stage is queued on the batcher (INFERENCE_WORKERS
+  cap), 503 + Retry-After when the queue is full, REQUEST_TIMEOUT_SECONDS, latency metric
+"""
+
+import unittest
+from unittest.mock import patch, MagicMock
+import sys
+import os
+import json
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Mock dependencies BEFORE importing app
+sys.modules['h2o'] = MagicMock()
+sys.modules['torch'] = MagicMock()
+sys.modules['transformers'] = MagicMock()
+
+from batching import QueueFullError
+
+
+def make_predictor(votes, early_exit=False):
+    """Predictor whose models return the given {model_name: prediction} votes"""
+    from ensemble import HumanOrAIPredictor
+
+    predictor = HumanOrAIPredictor(early_exit=early_exit)
+    predictor.is_initialized = True
+    calls = []
+
+    def fake_branch(texts, model_names):
+        calls.append(tuple(model_names))
+        return {name: [(votes[name], 0.8)] * len(texts) for name in model_names}
+
+    predictor._predict_transformers = fake_branch
+    predictor._predict_h2o = fake_branch
+    return predictor, calls
+
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.split('\n'))
+        events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+class TestIterPredictions(unittest.TestCase):
+    """White Box Test Case 18: Streaming"""
+
+    def test_cheapest_models_first_ensemble_last(self):
+        predictor, calls = make_predictor({'BERT': 1, 'RoBERTa': 1, 'DRF': 0, 'GBM': 1, 'GLM': 0})
+
+        events = list(predictor.iter_predictions('some text'))
+
+        self.assertEqual([data.get('model', event) for event, data in events],
+                         ['GLM', 'GBM', 'DRF', 'BERT', 'RoBERTa', 'ensemble'])
+        self.assertEqual(calls, [('DRF', 'GBM', 'GLM'), ('BERT',), ('RoBERTa',)])
+        self.assertEqual(events[0][1]['label'], 'AI')
+        ensemble = events[-1][1]
+        self.assertEqual(ensemble['ensemble']['label'], 'HUMAN')
+        self.assertEqual(ensemble['skipped_models'], [])
+
+    def test_early_exit_stops_after_majority(self):
+        """Erken çıkış modunda karar verildikten sonra transformer'lar çalışmamalı"""
+        predictor, calls = make_predictor(dict.fromkeys(['BERT', 'RoBERTa', 'DRF', 'GBM', 'GLM'], 0),
+                                          early_exit=True)
+
+        events = list(predictor.iter_predictions('some text'))
+
+        self.assertEqual(len(events), 4)
+        self.assertEqual(calls, [('DRF', 'GBM', 'GLM')])
+        self.assertEqual(events[-1][1]['skipped_models'], ['BERT', 'RoBERTa'])
+
+
+class TestPredictStreamEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        import app as app_module
+        self.app_module = app_module
+        self.client = app_module.app.test_client()
+        self.text = ' '.join(['stream'] * 60)
+
+    def test_event_stream(self):
+        predictor, _ = make_predictor({'BERT': 1, 'RoBERTa': 0, 'DRF': 1, 'GBM': 1, 'GLM': 1})
+
+        with patch.object(self.app_module, 'predictor', predictor):
+            response = self.client.post('/predict_stream', json={'text': self.text})
+            events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/event-stream'))
+        self.assertEqual([event for event, _ in events], ['model'] * 5 + ['ensemble'])
+        self.assertEqual(events[-1][1]['ensemble']['vote_count'], 4)
+
+    def test_short_text_rejected(self):
+        response = self.client.post('/predict_stream', json={'text': 'too short'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('50 words', response.get_json()['error'])
+
+    def test_model_failure_becomes_error_event(self):
+        predictor, _ = make_predictor({})
+        predictor._predict_h2o = MagicMock(side_effect=RuntimeError('H2O is down'))
+
+        with patch.object(self.app_module, 'predictor', predictor):
+            response = self.client.post('/predict_stream', json={'text': self.text})
+            events = parse_events(response.get_data(as_text=True))
+
+        self.assertEqual(events, [('error', {'error': 'H2O is down'})])
+
+
+class TestPredictStreamLoadShedding(unittest.TestCase):
+
+    def setUp(self):
+        import app as app_module
+        self.app_module = app_module
+        self.client = app_module.app.test_client()
+        self.text = ' '.join(['stream'] * 60)
+        self.predictor, _ = make_predictor({'BERT': 1, 'RoBERTa': 0, 'DRF': 1, 'GBM': 1, 'GLM': 1})
+
+    def post(self, text=None):
+        response = self.client.post('/predict_stream', json={'text': text or self.text})
+        body = response.get_data(as_text=True)
+        response.close()
+        return response, body
+
+    def serving_queue(self, workers=1):
+        """A fresh batcher for the full tier, recording each batch it scores"""
+        from batching import MicroBatcher
+
+        batches, running, peak = [], [0], [0]
+        lock = threading.Lock()
+
+        def batch_fn(items):
+            with lock:
+                batches.append(list(items))
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            try:
+                return self.app_module._run_batch(items, tier='full')
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        return MicroBatcher(batch_fn, max_wait_ms=1, workers=workers), batches, peak
+
+    def test_stages_run_on_the_serving_queue(self):
+        """Her aşama batcher kuyruğundan geçmeli, istek thread'inde çalışmamalı"""
+        queue, batches, _ = self.serving_queue()
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.object(self.app_module, 'batcher', queue):
+            response, body = self.post()
+
+        StageRequest = self.app_module.StageRequest
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parse_events(body)[-1][0], 'ensemble')
+        self.assertEqual(batches, [[StageRequest(self.text, ('GLM', 'GBM', 'DRF'))],
+                                   [StageRequest(self.text, ('BERT',))],
+                                   [StageRequest(self.text, ('RoBERTa',))]])
+
+    def test_worker_cap_applies_to_streams(self):
+        queue, batches, peak = self.serving_queue(workers=1)
+        texts = [' '.join([f'stream{i}'] * 60) for i in range(4)]
+        statuses = []
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.object(self.app_module, 'batcher', queue):
+            threads = [threading.Thread(target=lambda text=text: statuses.append(self.post(text)[0].status_code))
+                       for text in texts]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+
+        self.assertEqual(statuses, [200] * 4)
+        self.assertEqual(peak[0], 1)  # never more model runs than INFERENCE_WORKERS
+        self.assertEqual(sum(len(batch) for batch in batches), 4 * 3)
+
+    def test_full_inference_queue_is_503(self):
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.object(self.app_module.batcher, 'submit_many', side_effect=QueueFullError('full')), \
+                patch.dict(self.app_module.app.config, {'RETRY_AFTER_SECONDS': 7}):
+            response, _ = self.post()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '7')
+
+    def test_full_queue_at_a_later_stage_ends_the_stream(self):
+        start = self.app_module.batcher.submit_many
+        later_stages = [QueueFullError('full')]
+
+        def submit_many(items):
+            if items[0].model_names == ('BERT',):
+                raise later_stages[0]
+            return start(items)
+
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.object(self.app_module.batcher, 'submit_many', side_effect=submit_many):
+            response, body = self.post()
+
+        events = parse_events(body)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(events[-1], ('error', {'error': 'Server is busy, please retry later'}))
+        self.assertEqual([event for event, _ in events], ['model'] * 3 + ['error'])
+
+    def test_timeout_stops_before_the_next_stage(self):
+        slow = self.predictor._predict_transformers
+
+        def slow_transformers(texts, model_names):
+            time.sleep(0.2)
+            return slow(texts, model_names)
+
+        self.predictor._predict_transformers = MagicMock(side_effect=slow_transformers)
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.dict(self.app_module.app.config, {'REQUEST_TIMEOUT_SECONDS': 0.1}):
+            _, body = self.post()
+
+        events = parse_events(body)
+        self.assertEqual(events[-1], ('error', {'error': 'Prediction timed out'}))
+        self.assertNotIn('ensemble', [event for event, _ in events])
+        time.sleep(0.2)  # the BERT run finishes in the worker; RoBERTa never starts
+        self.assertEqual(self.predictor._predict_transformers.call_count, 1)
+
+    def test_timeout_in_the_first_stage_is_503(self):
+        slow = self.predictor._predict_h2o
+
+        def slow_h2o(texts, model_names):
+            time.sleep(0.1)
+            return slow(texts, model_names)
+
+        self.predictor._predict_h2o = slow_h2o
+        with patch.object(self.app_module, 'predictor', self.predictor), \
+                patch.dict(self.app_module.app.config, {'REQUEST_TIMEOUT_SECONDS': 0.02}):
+            response, _ = self.post()
+
+        self.assertEqual(response.status_code, 503)
+        time.sleep(0.1)
+
+    def test_stream_latency_is_recorded(self):
+        with patch.object(self.app_module, 'predictor', self.predictor):
+            self.post()
+            body = self.client.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('humanorai_request_seconds_count{endpoint="predict_stream"}', body)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)